@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+
+"""
+File: create_or_update_morrowind_alchemy_recipes.py
+
+Materialize every valid 2- and 3-ingredient Morrowind recipe into
+morrowind_alchemy_recipes so that "which recipes yield exactly {A, B}" is a
+single index probe instead of a self-join at query time.
+
+Tables
+------
+morrowind_alchemy_effect_bits     effect → bit position (stable across runs;
+                                  new effects are appended, never renumbered)
+morrowind_alchemy_recipes         one row per recipe: ingredient_1..3 (sorted,
+                                  ingredient_3 NULL for pairs), effect_mask
+                                  (lower-case hex of the effect bit set, no
+                                  leading zeros) and effect_count
+morrowind_alchemy_recipe_effects  normalized child table (recipe_id, effect)
+
+A pair is valid when the two ingredients share at least one effect.  A triple
+is valid only when every ingredient pulls its weight: removing any one of the
+three must lose at least one effect.  Triples whose third ingredient adds
+nothing are already covered by the pair row.
+
+Incremental runs
+----------------
+The alchemy SQL loaders git-rm their diff files once applied, so the touched
+ingredient names have to be captured before they run:
+
+  1. --snapshot   reads <stem>.upsert.json / <stem>.delete.json for the
+                  ingredients and effects JSON files and writes the union of
+                  ingredient names to morrowind_alchemy_recipes.touched.json
+  2. (SQL loaders run)
+  3. no flag      if the recipe tables are missing, build them in full;
+                  otherwise recompute only the recipes that involve a touched
+                  ingredient, then remove the touched file.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import os.path as op
+import sqlite3
+import sys
+import traceback
+from pathlib import Path
+
+GAME = 'morrowind'
+GAME_LABEL = 'Morrowind alchemy recipes'
+EFFECTS_TABLE = f'{GAME}_alchemy_effects'
+BITS_TABLE = f'{GAME}_alchemy_effect_bits'
+RECIPES_TABLE = f'{GAME}_alchemy_recipes'
+RECIPE_EFFECTS_TABLE = f'{GAME}_alchemy_recipe_effects'
+INDEX_PREFIX = 'm_ar'
+
+_SCRIPT_DIR = Path(__file__).parent.resolve()
+_FAMILY_ROOT = _SCRIPT_DIR.parent.parent.parent
+_JSON_DIR = _SCRIPT_DIR.parent / 'ingredients_json'
+_DIFF_STEMS = (f'{GAME}_all_ingredients', f'{GAME}_all_effects')
+_TOUCHED_FILE = str(_JSON_DIR / f'{RECIPES_TABLE}.touched.json')
+_DEFAULT_DB = str(_FAMILY_ROOT / 'database' / 'gametools.sqlite3')
+
+
+def load_diff_names(json_dir: Path, stems=_DIFF_STEMS) -> set:
+    """Return every ingredient name mentioned in the upsert/delete diff files."""
+    names: set = set()
+    for stem in stems:
+        for suffix in ('upsert', 'delete'):
+            path = Path(json_dir) / f'{stem}.{suffix}.json'
+            if not path.exists():
+                continue
+            with open(path) as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                continue
+            names.update(r['name'] for r in data if r.get('name'))
+    return names
+
+
+def write_touched_file(path: str, names: set) -> None:
+    """Merge names into the touched file (a run may be interrupted between stages)."""
+    existing: set = set()
+    if op.exists(path):
+        with open(path) as f:
+            existing = set(json.load(f))
+    with open(path, 'w') as f:
+        json.dump(sorted(existing | names), f, indent=2)
+
+
+def tables_exist(cur) -> bool:
+    found = {
+        r[0] for r in cur.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN (?, ?, ?)",
+            (BITS_TABLE, RECIPES_TABLE, RECIPE_EFFECTS_TABLE),
+        )
+    }
+    return len(found) == 3
+
+
+def create_tables(cur) -> None:
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {BITS_TABLE} ("
+                f"effect TEXT PRIMARY KEY, bit INTEGER NOT NULL UNIQUE)")
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {RECIPES_TABLE} ("
+                f"recipe_id INTEGER PRIMARY KEY, "
+                f"ingredient_1 TEXT NOT NULL, ingredient_2 TEXT NOT NULL, ingredient_3 TEXT, "
+                f"effect_mask TEXT NOT NULL, effect_count INTEGER NOT NULL)")
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {RECIPE_EFFECTS_TABLE} ("
+                f"recipe_id INTEGER NOT NULL, effect TEXT NOT NULL)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_PREFIX}_mask "
+                f"ON {RECIPES_TABLE} (effect_mask)")
+    for i in (1, 2, 3):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_PREFIX}_ing{i} "
+                    f"ON {RECIPES_TABLE} (ingredient_{i})")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_PREFIX}e_effect "
+                f"ON {RECIPE_EFFECTS_TABLE} (effect, recipe_id)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_PREFIX}e_recipe "
+                f"ON {RECIPE_EFFECTS_TABLE} (recipe_id)")
+
+
+def assign_effect_bits(cur, effects) -> dict:
+    """Return {effect: bit}, appending bits for effects not seen before."""
+    bits = dict(cur.execute(f"SELECT effect, bit FROM {BITS_TABLE}").fetchall())
+    next_bit = max(bits.values(), default=-1) + 1
+    for effect in sorted(set(effects) - set(bits)):
+        cur.execute(f"INSERT INTO {BITS_TABLE} (effect, bit) VALUES (?, ?)", (effect, next_bit))
+        bits[effect] = next_bit
+        next_bit += 1
+    return bits
+
+
+def load_ingredient_masks(cur, bits: dict | None = None) -> tuple:
+    """Return ({ingredient: mask}, bits) from the effects table."""
+    rows = cur.execute(
+        f"SELECT name, effect FROM {EFFECTS_TABLE} WHERE effect IS NOT NULL"
+    ).fetchall()
+    if bits is None:
+        bits = assign_effect_bits(cur, (e for _, e in rows))
+    masks: dict = {}
+    for name, effect in rows:
+        masks[name] = masks.get(name, 0) | (1 << bits[effect])
+    return masks, bits
+
+
+def compute_recipes(masks: dict, only: set | None = None):
+    """Yield (ingredients, mask) for every valid recipe.
+
+    only: when given, restrict output to recipes containing at least one of
+    these ingredient names (the incremental path).
+    """
+    names = sorted(masks)
+    for a, b in itertools.combinations(names, 2):
+        if only is not None and a not in only and b not in only:
+            continue
+        shared = masks[a] & masks[b]
+        if shared:
+            yield (a, b, None), shared
+    for a, b, c in itertools.combinations(names, 3):
+        if only is not None and a not in only and b not in only and c not in only:
+            continue
+        ma, mb, mc = masks[a], masks[b], masks[c]
+        ab, ac, bc = ma & mb, ma & mc, mb & mc
+        result = ab | ac | bc
+        # Every ingredient must contribute: dropping any one loses an effect.
+        if result and ab != result and ac != result and bc != result:
+            yield (a, b, c), result
+
+
+def insert_recipes(cur, recipes, bit_to_effect: dict) -> int:
+    """Bulk-insert recipes and their child effect rows; return the recipe count."""
+    next_id = cur.execute(f"SELECT COALESCE(MAX(recipe_id), 0) FROM {RECIPES_TABLE}").fetchone()[0]
+    recipe_rows, effect_rows = [], []
+    for (a, b, c), mask in recipes:
+        next_id += 1
+        recipe_rows.append((next_id, a, b, c, format(mask, 'x'), bin(mask).count('1')))
+        effect_rows.extend(
+            (next_id, bit_to_effect[bit])
+            for bit in range(mask.bit_length()) if mask >> bit & 1
+        )
+    cur.executemany(
+        f"INSERT INTO {RECIPES_TABLE} "
+        f"(recipe_id, ingredient_1, ingredient_2, ingredient_3, effect_mask, effect_count) "
+        f"VALUES (?, ?, ?, ?, ?, ?)",
+        recipe_rows,
+    )
+    cur.executemany(
+        f"INSERT INTO {RECIPE_EFFECTS_TABLE} (recipe_id, effect) VALUES (?, ?)",
+        effect_rows,
+    )
+    return len(recipe_rows)
+
+
+def delete_recipes_for(cur, names: set) -> None:
+    params = sorted(names)
+    ph = ', '.join('?' for _ in params)
+    where = f"ingredient_1 IN ({ph}) OR ingredient_2 IN ({ph}) OR ingredient_3 IN ({ph})"
+    cur.execute(
+        f"DELETE FROM {RECIPE_EFFECTS_TABLE} WHERE recipe_id IN "
+        f"(SELECT recipe_id FROM {RECIPES_TABLE} WHERE {where})",
+        params * 3,
+    )
+    cur.execute(f"DELETE FROM {RECIPES_TABLE} WHERE {where}", params * 3)
+
+
+def rebuild(conn) -> int:
+    """Drop and rebuild every recipe row from the effects table."""
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {RECIPE_EFFECTS_TABLE}")
+    cur.execute(f"DROP TABLE IF EXISTS {RECIPES_TABLE}")
+    create_tables(cur)
+    masks, bits = load_ingredient_masks(cur)
+    n = insert_recipes(cur, compute_recipes(masks), {v: k for k, v in bits.items()})
+    conn.commit()
+    return n
+
+
+def update_incremental(conn, touched: set) -> int:
+    """Recompute only the recipes that involve a touched ingredient."""
+    cur = conn.cursor()
+    masks, bits = load_ingredient_masks(cur)
+    delete_recipes_for(cur, touched)
+    n = insert_recipes(cur, compute_recipes(masks, only=touched), {v: k for k, v in bits.items()})
+    conn.commit()
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description=f"Materialize {RECIPES_TABLE}")
+    ap.add_argument('db', nargs='?', default=_DEFAULT_DB,
+                    help=f"SQLite database path (default: {_DEFAULT_DB})")
+    ap.add_argument('--json-dir', default=str(_JSON_DIR),
+                    help="directory holding the ingredients/effects diff files")
+    ap.add_argument('--touched-file', default=_TOUCHED_FILE,
+                    help="where --snapshot records touched ingredient names")
+    ap.add_argument('--snapshot', action='store_true',
+                    help="record ingredient names from pending diff files, then exit")
+    ap.add_argument('-v', '--verbose', action='store_true')
+    args = ap.parse_args()
+
+    if args.snapshot:
+        names = load_diff_names(Path(args.json_dir))
+        if names:
+            write_touched_file(args.touched_file, names)
+        print(f"{GAME_LABEL}: {len(names)} touched ingredient(s) recorded")
+        return
+
+    print(f"Starting database update for {GAME_LABEL}")
+    conn = sqlite3.connect(args.db)
+    try:
+        if not tables_exist(conn.cursor()):
+            n = rebuild(conn)
+            print(f"created {RECIPES_TABLE}: {n} recipes")
+        elif op.exists(args.touched_file):
+            with open(args.touched_file) as f:
+                touched = set(json.load(f))
+            n = update_incremental(conn, touched) if touched else 0
+            print(f"updated {RECIPES_TABLE}: {n} recipes recomputed "
+                  f"for {len(touched)} touched ingredient(s)")
+        else:
+            print(f"No touched ingredients for {RECIPES_TABLE}. No database changes to apply.")
+    except Exception as e:
+        print(f"Database error updating {RECIPES_TABLE}: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    conn.close()
+
+    if op.exists(args.touched_file):
+        os.remove(args.touched_file)
+    print(f"Database update complete for {GAME_LABEL}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+
+"""
+File: create_or_update_tes_answer_tables.py
+
+Precompute answer tables for the parameterizable question classes in
+TES/showcase/*.md, so a question that used to take several tool rounds
+(calculator → soul gem lookup → perk lookup) is one indexed lookup.
+
+Tables
+------
+skyrim_enchant_charge_grid
+    one row per enchantment × skill (15..100 step 5) × Enchanter rank × soul gem
+    × patched, in the order skyrim_enchant_calculator(effect) returns it: the
+    magnitude multiplier and, for weapon enchantments, charges per use and uses
+    per soul.  Unreachable skill/rank pairs are omitted.
+oblivion_potion_strength
+    one row per alchemy effect × apparatus tier × mastery rank: magnitude,
+    duration and price of a potion (or poison, for negative effects) brewed with
+    a Mortar and Pestle, Calcinator and Retort of that tier at the rank's skill
+    floor and Luck 50 (oblivion_alchemy.md, "Potion Strength Calculation").
+skyrim_smithing_set_totals
+    one row per material perk × improvement quality: the skyrim_smithing_plan
+    result for every craftable piece under that perk, as JSON.
+
+The Skyrim tables are produced by the calculator functions in
+TES/executables/src/tools.py, so a table row and a live tool call never
+disagree.  Every run drops and rebuilds all three tables.
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import sqlite3
+import sys
+import traceback
+from pathlib import Path
+
+CHARGE_TABLE = 'skyrim_enchant_charge_grid'
+POTION_TABLE = 'oblivion_potion_strength'
+SET_TABLE = 'skyrim_smithing_set_totals'
+
+_SCRIPT_DIR = Path(__file__).parent.resolve()
+_FAMILY_ROOT = _SCRIPT_DIR.parent.parent
+_TOOLS_PATH = _FAMILY_ROOT / 'executables' / 'src' / 'tools.py'
+_DEFAULT_DB = str(_FAMILY_ROOT / 'database' / 'gametools.sqlite3')
+
+# Oblivion apparatus grades and mastery ranks (oblivion_alchemy.md).
+APPARATUS_TIERS = (('Novice', 0.10), ('Apprentice', 0.25), ('Journeyman', 0.50),
+                   ('Expert', 0.75), ('Master', 1.00))
+MASTERY_RANKS = (('Novice', 0), ('Apprentice', 25), ('Journeyman', 50),
+                 ('Expert', 75), ('Master', 100))
+DURATION_ONLY = {'Invisibility', 'Night-Eye', 'Paralyze', 'Silence', 'Water Breathing',
+                 'Water Walking'}
+MAGNITUDE_ONLY = {'Dispel'}
+NO_STRENGTH = {'Cure Disease', 'Cure Paralysis', 'Cure Poison'}
+NEGATIVE_PREFIXES = ('Damage ', 'Drain ', 'Weakness to ')
+NEGATIVE_EFFECTS = {'Burden', 'Fire Damage', 'Frost Damage', 'Shock Damage',
+                    'Lightning Damage', 'Paralyze', 'Silence'}
+
+
+def load_tools(db: str):
+    """Load the standalone tools module pointed at db."""
+    spec = importlib.util.spec_from_file_location('tes_answer_tools', _TOOLS_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    mod.DB_PATH = Path(db)
+    return mod
+
+
+def _round(x: float) -> int:
+    """Oblivion rounding: 0.5 rounds up, minimum 1."""
+    return max(1, math.floor(x + 0.5))
+
+
+def ob_potion_strength(effect: str, base_cost: float, tier: float, skill: float) -> dict:
+    """Magnitude, duration and price for one effect with a full apparatus kit of one tier."""
+    negative = effect in NEGATIVE_EFFECTS or effect.startswith(NEGATIVE_PREFIXES)
+    cost = skill + 25 * tier
+    price = math.floor(cost * 0.45)
+    c = r = tier
+    if effect in NO_STRENGTH:
+        return {'kind': 'potion', 'magnitude': None, 'duration': None, 'price': price}
+    if negative:
+        r = 0.0   # the Retort never helps negative effects
+    if effect in DURATION_ONLY:
+        mag, dur = 1.0, cost / (base_cost / 10) * (1 + 0.25 * c + 0.35 * r)
+    elif effect in MAGNITUDE_ONLY:
+        factor = 1 + 0.15 * c * r if c and r else 1 + 0.3 * c + 0.5 * r
+        mag, dur = (cost / (base_cost / 10)) ** (1 / 1.28) * factor, 1.0
+    else:
+        base = (cost / (base_cost / 10 * 4)) ** (1 / 2.28)
+        if negative:
+            mag, dur = base * (1 + 0.35 * c), 4 * base * (1 + 0.35 * c)
+        else:
+            mag = base * (1 + (1.4 if r else 0.35) * c + 0.5 * r)
+            dur = 4 * base * (1 + 0.35 * c + r)
+    return {'kind': 'poison' if negative else 'potion',
+            'magnitude': _round(mag), 'duration': _round(dur), 'price': price}
+
+
+def charge_rows(tools) -> list:
+    rows = []
+    names = [r['name'] for r in tools._query("SELECT name FROM skyrim_enchant_weapons ORDER BY name")]
+    names += [r['name'] for r in tools._query(
+        "SELECT enchantment AS name FROM skyrim_enchant_apparel ORDER BY enchantment")]
+    for name in names:
+        out = tools.skyrim_enchant_calculator(name)
+        if 'error' in out:
+            continue   # e.g. weapon enchantments with no base_cost
+        cols = out['columns']
+        for vals in out['rows']:
+            r = dict(zip(cols, vals))
+            rows.append((out['effect'], out['type'], out['base_cost'],
+                         r['skill'], r['enchanter_rank'], r['soul_gem'],
+                         int(r['patched']), r['magnitude_multiplier'],
+                         r.get('charges_per_use'), r.get('uses')))
+    return rows
+
+
+def potion_rows(cur) -> list:
+    rows = []
+    for effect, base_cost in cur.execute(
+            "SELECT effect, MAX(base_cost) FROM oblivion_alchemy_effects "
+            "WHERE effect IS NOT NULL AND base_cost IS NOT NULL GROUP BY effect ORDER BY effect").fetchall():
+        for tier_name, tier in APPARATUS_TIERS:
+            for rank, skill in MASTERY_RANKS:
+                s = ob_potion_strength(effect, base_cost, tier, skill)
+                rows.append((effect, tier_name, rank, skill, s['kind'],
+                             s['magnitude'], s['duration'], s['price']))
+    return rows
+
+
+def set_rows(tools) -> list:
+    perks = [r['material_perk'] for r in tools._query(
+        "SELECT material_perk FROM skyrim_smithing_armor WHERE material_perk IS NOT NULL "
+        "UNION SELECT material_perk FROM skyrim_smithing_weapons WHERE material_perk IS NOT NULL "
+        "ORDER BY 1")]
+    qualities = [r['quality'] for r in tools._query(
+        "SELECT quality FROM skyrim_smithing_improvement ORDER BY skill_without_perk")]
+    rows = []
+    for perk in perks:
+        for quality in qualities:
+            plan = tools.skyrim_smithing_plan(perk=perk, quality=quality)
+            if 'error' not in plan:
+                rows.append((perk, quality, len(plan['pieces']), json.dumps(plan)))
+    return rows
+
+
+def create_tables(cur) -> None:
+    cur.execute(f"CREATE TABLE {CHARGE_TABLE} ("
+                f"effect TEXT NOT NULL, type TEXT NOT NULL, base_cost INTEGER, skill INTEGER NOT NULL, "
+                f"enchanter_rank INTEGER NOT NULL, soul_gem TEXT NOT NULL, patched INTEGER NOT NULL, "
+                f"magnitude_multiplier REAL, charges_per_use REAL, uses INTEGER, "
+                f"PRIMARY KEY (effect, skill, enchanter_rank, soul_gem, patched))")
+    cur.execute(f"CREATE TABLE {POTION_TABLE} ("
+                f"effect TEXT NOT NULL, apparatus_tier TEXT NOT NULL, mastery TEXT NOT NULL, "
+                f"effective_alchemy INTEGER NOT NULL, kind TEXT NOT NULL, "
+                f"magnitude INTEGER, duration INTEGER, price INTEGER, "
+                f"PRIMARY KEY (effect, apparatus_tier, mastery))")
+    cur.execute(f"CREATE TABLE {SET_TABLE} ("
+                f"material_perk TEXT NOT NULL, quality TEXT NOT NULL, piece_count INTEGER NOT NULL, "
+                f"plan TEXT NOT NULL, PRIMARY KEY (material_perk, quality))")
+
+
+def rebuild(conn, db: str) -> dict:
+    """Drop and rebuild all answer tables; return {table: row count}."""
+    tools = load_tools(db)
+    cur = conn.cursor()
+    built = {CHARGE_TABLE: charge_rows(tools), POTION_TABLE: potion_rows(cur), SET_TABLE: set_rows(tools)}
+    for table in built:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+    create_tables(cur)
+    for table, rows in built.items():
+        if rows:
+            cur.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(rows[0]))})", rows)
+    conn.commit()
+    return {table: len(rows) for table, rows in built.items()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the precomputed TES answer tables")
+    ap.add_argument('db', nargs='?', default=_DEFAULT_DB,
+                    help=f"SQLite database path (default: {_DEFAULT_DB})")
+    args = ap.parse_args()
+
+    print("Starting database update for TES answer tables")
+    conn = sqlite3.connect(args.db)
+    try:
+        counts = rebuild(conn, args.db)
+    except Exception as e:
+        print(f"Database error updating answer tables: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    conn.close()
+    for table, n in counts.items():
+        print(f"created {table}: {n} rows")
+    print("Database update complete for TES answer tables.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+
+"""
+File: create_or_update_tes_effect_graph.py
+
+Build the cross-game effect graph so that "what is Oblivion's equivalent of
+Skyrim's Fortify Smithing?" is one indexed lookup instead of a list-and-search
+round per game.
+
+Tables
+------
+tes_effect_graph    one row per (family, game, effect, kind, qualifier):
+                    family     canonical cross-game effect name ("fortify armorer")
+                    game       morrowind | oblivion | skyrim
+                    effect     the effect as that game's table names it
+                    kind       alchemy | enchant | magic_effect
+                    code       Oblivion MGEF code or Morrowind magic effect ID
+                    qualifier  attribute/skill of a generic effect
+                               ("Fortify Skill" + "Armorer"), else NULL
+tes_effect_aliases  normalized name → family (an alias may name several
+                    families, e.g. "fortify one handed" → blade, blunt)
+
+Sources: the alchemy effect tables of all three games, the Morrowind magic
+effects, oblivion_enchant_effects plus the MGEF table in
+Oblivion/enchanting/enchant_parse/MGEF.py, and the Skyrim weapon and apparel
+enchantment tables.  Morrowind and Oblivion fold attributes and skills into
+generic effects (Fortify Attribute, Drain Skill, ...); those are expanded into
+one row per attribute/skill so they join the specific alchemy effects.
+
+Names are normalized (lower case, punctuation and parentheticals dropped) and
+then mapped through the synonym tables below: renamed skills (Smithing →
+Armorer), Stamina ↔ Fatigue, Magic ↔ Magicka, Paralyze ↔ Paralysis, ...
+
+The graph is small, so every run drops and rebuilds it from the source tables.
+"""
+
+import argparse
+import importlib.util
+import re
+import sqlite3
+import sys
+import traceback
+from pathlib import Path
+
+GRAPH_TABLE = 'tes_effect_graph'
+ALIAS_TABLE = 'tes_effect_aliases'
+
+_SCRIPT_DIR = Path(__file__).parent.resolve()
+_FAMILY_ROOT = _SCRIPT_DIR.parent.parent
+_MGEF_PATH = _FAMILY_ROOT / 'Oblivion' / 'enchanting' / 'enchant_parse' / 'MGEF.py'
+_DEFAULT_DB = str(_FAMILY_ROOT / 'database' / 'gametools.sqlite3')
+
+ATTRIBUTES = ('Strength', 'Intelligence', 'Willpower', 'Agility', 'Speed', 'Endurance',
+              'Personality', 'Luck')
+SKILLS = {
+    'oblivion': ('Armorer', 'Athletics', 'Blade', 'Block', 'Blunt', 'Hand to Hand',
+                 'Heavy Armor', 'Alchemy', 'Alteration', 'Conjuration', 'Destruction',
+                 'Illusion', 'Mysticism', 'Restoration', 'Acrobatics', 'Light Armor',
+                 'Marksman', 'Mercantile', 'Security', 'Sneak', 'Speechcraft'),
+    'morrowind': ('Armorer', 'Athletics', 'Axe', 'Block', 'Blunt Weapon', 'Heavy Armor',
+                  'Long Blade', 'Medium Armor', 'Spear', 'Alchemy', 'Alteration',
+                  'Conjuration', 'Destruction', 'Enchant', 'Illusion', 'Mysticism',
+                  'Restoration', 'Unarmored', 'Acrobatics', 'Hand-to-hand', 'Light Armor',
+                  'Marksman', 'Mercantile', 'Security', 'Short Blade', 'Sneak', 'Speechcraft'),
+}
+GENERIC_VERBS = ('fortify', 'drain', 'damage', 'restore', 'absorb')
+
+# Skill names across games, mapped to the Oblivion skill(s) that cover them.
+SKILL_SYNONYMS = {
+    'smithing': ('armorer',),
+    'one handed': ('blade', 'blunt'),
+    'two handed': ('blade', 'blunt'),
+    'archery': ('marksman',),
+    'lockpicking': ('security',),
+    'pickpocket': ('sneak',),
+    'barter': ('mercantile',),
+    'persuasion': ('speechcraft',),
+    'speech': ('speechcraft',),
+    'enchanting': ('enchant',),
+    'unarmed': ('hand to hand',),
+    'long blade': ('blade',),
+    'short blade': ('blade',),
+    'blunt weapon': ('blunt',),
+    'axe': ('blunt',),
+}
+WORD_SYNONYMS = {
+    'stamina': 'fatigue',
+    'lightning': 'shock',
+    'paralyze': 'paralysis',
+    'paralyzation': 'paralysis',
+    'waterbreathing': 'water breathing',
+}
+PHRASE_SYNONYMS = {
+    'resist magic': 'resist magicka',
+    'weakness to magic': 'weakness to magicka',
+    'reflect': 'reflect spell',
+    'fortify magicka multiplier': 'fortify maximum magicka',
+    'cure common disease': 'cure disease',
+    'resist common disease': 'resist disease',
+    'weakness to common disease': 'weakness to disease',
+    'weakness to fire damage': 'weakness to fire',
+    'magicka damage': 'damage magicka',
+    'fatigue damage': 'damage fatigue',
+    'fortify carry weight': 'feather',
+    'fortify healing rate': 'regenerate health',
+    'fortify magicka regen': 'regenerate magicka',
+    'fortify fatigue regen': 'regenerate fatigue',
+    'calm humanoid': 'calm', 'calm creature': 'calm',
+    'frenzy humanoid': 'frenzy', 'frenzy creature': 'frenzy',
+    'demoralize humanoid': 'demoralize', 'demoralize creature': 'demoralize',
+    'rally humanoid': 'rally', 'rally creature': 'rally',
+    'fear': 'demoralize',
+    'detect animal': 'detect life',
+}
+# MGEF entries that are engine placeholders rather than player-facing effects.
+_MGEF_SKIP = re.compile(r'DO NOT USE|Info$|Extra \d+$|Order Weapon|Script Effect|Mehrunes Dagon')
+
+
+def normalize(name: str) -> str:
+    """'Fortify AlterationandMagicka Regen' → 'fortify alteration and magicka regen'."""
+    name = re.sub(r'\s*\(.*?\)', '', name)
+    name = re.sub(r'([a-z])and([A-Z])', r'\1 and \2', name)
+    name = name.replace('&', ' and ')
+    return re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def families(norm: str) -> list:
+    """Canonical family name(s) for a normalized effect name."""
+    if ' and ' in norm:
+        # Skyrim compound apparel enchantments: "fortify x and magicka regen".
+        verb = norm.split()[0]
+        out = []
+        for i, part in enumerate(norm.split(' and ')):
+            out += families(part if i == 0 else f'{verb} {part}')
+        return list(dict.fromkeys(out))
+    norm = ' '.join(WORD_SYNONYMS.get(w, w) for w in norm.split())
+    norm = PHRASE_SYNONYMS.get(norm, norm)
+    verb, _, target = norm.partition(' ')
+    if verb in GENERIC_VERBS and target in SKILL_SYNONYMS:
+        return [f'{verb} {t}' for t in SKILL_SYNONYMS[target]]
+    return [norm]
+
+
+def load_mgef(path: Path = _MGEF_PATH) -> dict:
+    """Return {name: code} from the Wrye Bash MGEF table."""
+    spec = importlib.util.spec_from_file_location('tes_mgef', path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return {v[1]: code for code, v in mod.MGEF.items() if not _MGEF_SKIP.search(v[1])}
+
+
+def _names(cur, sql: str) -> list:
+    return sorted({r[0] for r in cur.execute(sql) if r[0]})
+
+
+def collect(cur, mgef: dict) -> list:
+    """Return (game, effect, kind, code, qualifier) source rows."""
+    rows = []
+    attributes = {a.lower() for a in ATTRIBUTES}
+
+    # Morrowind
+    mw_ids = {name: str(i) for i, name in cur.execute(
+        "SELECT ID, Name FROM morrowind_enchant_magic_effects")}
+    for name in _names(cur, "SELECT effect FROM morrowind_alchemy_effects"):
+        if normalize(name) not in attributes:   # bare "Agility" etc. are parse leftovers
+            rows.append(('morrowind', re.sub(r'\s*\(.*?\)', '', name), 'alchemy', None, None))
+    for name, code in mw_ids.items():
+        rows.append(('morrowind', name, 'magic_effect', code, None))
+
+    # Oblivion
+    ob_codes = dict(cur.execute("SELECT name, effect_id FROM oblivion_enchant_effects"))
+    for name in _names(cur, "SELECT effect FROM oblivion_alchemy_effects"):
+        rows.append(('oblivion', re.sub(r'\s*\(.*?\)', '', name), 'alchemy', None, None))
+    for name, code in ob_codes.items():
+        rows.append(('oblivion', name, 'enchant', code, None))
+    for name, code in mgef.items():
+        if name not in ob_codes:
+            rows.append(('oblivion', name, 'magic_effect', code, None))
+
+    # Skyrim
+    for name in _names(cur, "SELECT effect FROM skyrim_alchemy_effects"):
+        rows.append(('skyrim', name, 'alchemy', None, None))
+    for sql in ("SELECT name FROM skyrim_enchant_weapons",
+                "SELECT enchantment FROM skyrim_enchant_apparel"):
+        for name in _names(cur, sql):
+            rows.append(('skyrim', name, 'enchant', None, None))
+
+    # Expand generic attribute/skill effects of Morrowind and Oblivion.
+    generic = [r for r in rows if r[0] in SKILLS and r[2] != 'alchemy'
+               and normalize(r[1]).split()[-1] in ('attribute', 'skill')
+               and normalize(r[1]).split()[0] in GENERIC_VERBS]
+    for game, name, kind, code, _ in generic:
+        quals = ATTRIBUTES if normalize(name).endswith('attribute') else SKILLS[game]
+        for q in quals:
+            rows.append((game, name, kind, code, q))
+    return rows
+
+
+def build(rows: list, mgef: dict) -> tuple:
+    """Return (graph rows, alias rows) from source rows."""
+    graph, aliases = set(), set()
+    code_by_norm = {normalize(n): c for n, c in mgef.items()}
+    for game, name, kind, code, qual in rows:
+        verb = normalize(name).split()[0]
+        norm = normalize(f'{verb} {qual}') if qual else normalize(name)
+        if qual is None and kind == 'alchemy' and game == 'oblivion':
+            code = code_by_norm.get(norm, code)
+        fams = families(norm)
+        for fam in fams:
+            graph.add((fam, game, name, kind, code, qual))
+            aliases.add((norm, fam))
+            aliases.add((fam, fam))
+            aliases.add((normalize(name), fam))
+    return sorted(graph, key=lambda r: tuple(x or '' for x in r)), sorted(aliases)
+
+
+def create_tables(cur) -> None:
+    cur.execute(f"CREATE TABLE {GRAPH_TABLE} ("
+                f"family TEXT NOT NULL, game TEXT NOT NULL, effect TEXT NOT NULL, "
+                f"kind TEXT NOT NULL, code TEXT, qualifier TEXT)")
+    cur.execute(f"CREATE TABLE {ALIAS_TABLE} ("
+                f"alias TEXT NOT NULL, family TEXT NOT NULL, PRIMARY KEY (alias, family))")
+    cur.execute(f"CREATE INDEX tes_eg_family ON {GRAPH_TABLE} (family, game)")
+
+
+def rebuild(conn, mgef: dict | None = None) -> int:
+    """Drop and rebuild both tables; return the graph row count."""
+    cur = conn.cursor()
+    if mgef is None:
+        mgef = load_mgef()
+    graph, aliases = build(collect(cur, mgef), mgef)
+    cur.execute(f"DROP TABLE IF EXISTS {GRAPH_TABLE}")
+    cur.execute(f"DROP TABLE IF EXISTS {ALIAS_TABLE}")
+    create_tables(cur)
+    cur.executemany(f"INSERT INTO {GRAPH_TABLE} VALUES (?, ?, ?, ?, ?, ?)", graph)
+    cur.executemany(f"INSERT INTO {ALIAS_TABLE} VALUES (?, ?)", aliases)
+    conn.commit()
+    return len(graph)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=f"Build {GRAPH_TABLE} and {ALIAS_TABLE}")
+    ap.add_argument('db', nargs='?', default=_DEFAULT_DB,
+                    help=f"SQLite database path (default: {_DEFAULT_DB})")
+    args = ap.parse_args()
+
+    print(f"Starting database update for {GRAPH_TABLE}")
+    conn = sqlite3.connect(args.db)
+    try:
+        n = rebuild(conn)
+    except Exception as e:
+        print(f"Database error updating {GRAPH_TABLE}: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    conn.close()
+    print(f"created {GRAPH_TABLE}: {n} rows")
+    print(f"Database update complete for {GRAPH_TABLE}.")
+
+
+if __name__ == '__main__':
+    main()
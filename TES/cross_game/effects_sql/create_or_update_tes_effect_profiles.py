@@ -0,0 +1,314 @@
+#!/usr/bin/python3
+
+"""
+File: create_or_update_tes_effect_profiles.py
+
+Build one denormalized effect profile table per game so that "everything about
+Fortify Health in Skyrim" is a single primary-key lookup instead of one call
+(and one table scan) per alchemy, enchanting and perk table.
+
+Tables
+------
+morrowind_effect_profile, oblivion_effect_profile, skyrim_effect_profile
+    effect_key     normalized effect name (see create_or_update_tes_effect_graph.normalize)
+    effect         display name as the game's tables spell it
+    ingredients    JSON list of ingredients carrying the effect, with their
+                   per-ingredient stats
+    base           JSON object of effect base stats (school, base cost, ...);
+                   Morrowind/Oblivion generic effects report the qualifier
+    enchant_slots  JSON list of Skyrim slots the enchantment can go on
+    disenchant     JSON list of Skyrim items that teach the enchantment
+    perks          JSON list of Skyrim alchemy/enchanting perks that modify it
+    sigil_stones   JSON list of Oblivion sigil stones granting the effect
+
+The JSON columns are NULL when the mechanic does not exist in that game (Morrowind
+has no sigil stones, only Skyrim has perks) and an empty list when it exists but
+nothing carries this effect, so the reader can tell the two absences apart.
+
+Every run drops and rebuilds the three tables from the source tables.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import traceback
+from pathlib import Path
+
+from create_or_update_tes_effect_graph import (ATTRIBUTES, SKILLS, GENERIC_VERBS, SKILL_SYNONYMS,
+                                               families, normalize)
+
+GAMES = ('morrowind', 'oblivion', 'skyrim')
+SIGIL_LEVELS = ('descendent', 'subjacent', 'latent', 'ascendent', 'transcendent')
+APPAREL_SLOTS = ('head', 'chest', 'hands', 'feet', 'shield', 'amulet', 'ring')
+
+# Skyrim effect classification (skyrim_alchemy.md, "Effect Classification").
+HARMFUL_PREFIXES = ('damage ', 'lingering damage ', 'ravage ', 'weakness to ')
+HARMFUL_EFFECTS = {'paralysis', 'fear', 'frenzy', 'slow'}
+PHYSICIAN_EFFECTS = {'restore health', 'restore magicka', 'restore stamina'}
+SKYRIM_SKILLS = {'alchemy', 'alteration', 'archery', 'block', 'conjuration', 'destruction',
+                 'enchanting', 'heavy armor', 'illusion', 'light armor', 'lockpicking',
+                 'one handed', 'pickpocket', 'restoration', 'smithing', 'sneak', 'speech',
+                 'two handed', 'barter', 'persuasion'}
+
+_SCRIPT_DIR = Path(__file__).parent.resolve()
+_FAMILY_ROOT = _SCRIPT_DIR.parent.parent
+_DEFAULT_DB = str(_FAMILY_ROOT / 'database' / 'gametools.sqlite3')
+
+
+def table_name(game: str) -> str:
+    return f'{game}_effect_profile'
+
+
+def is_harmful(key: str) -> bool:
+    return key in HARMFUL_EFFECTS or key.startswith(HARMFUL_PREFIXES)
+
+
+def generic_key(key: str, game: str) -> tuple:
+    """('fortify attribute', 'Strength') for 'fortify strength', else (key, None)."""
+    verb, _, target = key.partition(' ')
+    if verb in GENERIC_VERBS:
+        for qual in ATTRIBUTES:
+            if target == qual.lower():
+                return f'{verb} attribute', qual
+        for qual in SKILLS.get(game, ()):
+            if target == normalize(qual):
+                return f'{verb} skill', qual
+    return key, None
+
+
+def _rows(cur, sql: str) -> list:
+    cur.execute(sql)
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+class _Profiles:
+    """Accumulate profile columns keyed by normalized effect name."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.rows: dict = {}
+
+    def get(self, name: str) -> dict:
+        key = normalize(name)
+        if key not in self.rows:
+            self.rows[key] = {'effect': name.split(' (')[0].strip(),
+                              **{c: ([] if c != 'base' else {}) for c in self.columns}}
+        return self.rows[key]
+
+
+def _with_base(profiles: _Profiles, base: dict, game: str) -> None:
+    """Attach base stats, resolving specific names to Morrowind/Oblivion generic effects.
+
+    Every attribute/skill of a generic effect gets its own profile, so "Fortify Blunt
+    Weapon" resolves even where no ingredient carries it.
+    """
+    for verb in GENERIC_VERBS:
+        for suffix, quals in (('attribute', ATTRIBUTES), ('skill', SKILLS[game])):
+            if f'{verb} {suffix}' in base:
+                for qual in quals:
+                    profiles.get(f'{verb.title()} {qual}')
+    for key, prof in profiles.rows.items():
+        gkey, qual = generic_key(key, game)
+        stats = base.get(key) or base.get(gkey)
+        if stats:
+            prof['base'] = dict(stats, **({'generic_effect': stats['name'], 'qualifier': qual}
+                                          if key not in base and qual else {}))
+            prof['base'].pop('name', None)
+
+
+def morrowind(cur) -> dict:
+    p = _Profiles(('ingredients', 'base'))
+    for r in _rows(cur, "SELECT e.name, e.effect, i.weight, i.value FROM morrowind_alchemy_effects e "
+                        "JOIN morrowind_alchemy_ingredients i ON i.name = e.name "
+                        "WHERE e.effect IS NOT NULL ORDER BY e.name"):
+        if normalize(r['effect']) not in {a.lower() for a in ATTRIBUTES}:
+            p.get(r['effect'])['ingredients'].append(
+                {'name': r['name'], 'weight': r['weight'], 'value': r['value']})
+    schools = {r['ID']: r['Name'] for r in _rows(cur, "SELECT ID, Name FROM morrowind_enchant_magic_schools")}
+    base = {}
+    for r in _rows(cur, 'SELECT ID, Name, Description, School, "Base Cost" AS cost '
+                        'FROM morrowind_enchant_magic_effects'):
+        p.get(r['Name'])
+        base[normalize(r['Name'])] = {'name': r['Name'], 'id': int(r['ID']),
+                                      'school': schools.get(int(r['School'])),
+                                      'base_cost': float(r['cost']), 'description': r['Description']}
+    _with_base(p, base, 'morrowind')
+    return {k: dict(v, enchant_slots=None, disenchant=None, perks=None, sigil_stones=None)
+            for k, v in p.rows.items()}
+
+
+def oblivion(cur) -> dict:
+    p = _Profiles(('ingredients', 'base', 'sigil_stones'))
+    for r in _rows(cur, "SELECT e.name, e.effect, e.base_cost, i.weight, i.value "
+                        "FROM oblivion_alchemy_effects e JOIN oblivion_alchemy_ingredients i "
+                        "ON i.name = e.name WHERE e.effect IS NOT NULL ORDER BY e.name"):
+        p.get(r['effect'])['ingredients'].append(
+            {'name': r['name'], 'weight': r['weight'], 'value': r['value'], 'base_cost': r['base_cost']})
+    base = {}
+    for r in _rows(cur, "SELECT name, effect_id, base_cost, barter_factor, school, description "
+                        "FROM oblivion_enchant_effects"):
+        p.get(r['name'])
+        base[normalize(r['name'])] = dict(r)
+    mags = ', '.join(f'wm.{lv}_magnitude AS w_{lv}, wm.{lv}_charges AS c_{lv}, am.{lv}_magnitude AS a_{lv}'
+                     for lv in SIGIL_LEVELS)
+    for r in _rows(cur, f"SELECT s.form_id, s.weapon_effect, s.armor_effect, {mags} "
+                        f"FROM oblivion_sigil_stone s "
+                        f"JOIN oblivion_sigil_stone_weapon_magnitudes wm ON s.form_id = wm.form_id "
+                        f"JOIN oblivion_sigil_stone_armor_magnitudes am ON s.form_id = am.form_id "
+                        f"ORDER BY s.form_id"):
+        for lv in SIGIL_LEVELS:
+            if r[f'w_{lv}'] is not None and r['weapon_effect']:
+                p.get(r['weapon_effect'])['sigil_stones'].append(
+                    {'form_id': r['form_id'], 'slot': 'weapon', 'level': lv,
+                     'magnitude': r[f'w_{lv}'], 'charges': r[f'c_{lv}']})
+            if r[f'a_{lv}'] is not None and r['armor_effect']:
+                p.get(r['armor_effect'])['sigil_stones'].append(
+                    {'form_id': r['form_id'], 'slot': 'armor', 'level': lv, 'magnitude': r[f'a_{lv}']})
+    _with_base(p, base, 'oblivion')
+    return {k: dict(v, enchant_slots=None, disenchant=None, perks=None) for k, v in p.rows.items()}
+
+
+def _skyrim_perks(key: str, prof: dict, alchemy: list, enchant: list) -> list:
+    """Perks that modify this effect, from the rules in skyrim_alchemy.md / skyrim_enchanting.md."""
+    out = []
+    words = set(key.split())
+    if prof['ingredients']:
+        harmful = is_harmful(key)
+        for perk in alchemy:
+            n = perk['name']
+            if (n.startswith('Alchemist') or n == 'Purity'
+                    or (n == 'Physician' and key in PHYSICIAN_EFFECTS)
+                    or (n == 'Benefactor' and not harmful)
+                    or (n in ('Poisoner', 'Concentrated Poison') and harmful)):
+                out.append(dict(perk, tree='alchemy'))
+    if prof['enchant_slots']:
+        apparel = prof['enchant_slots'] != ['weapon']
+        verb, _, target = key.partition(' ')
+        rules = {
+            'Fire Enchanter': 'fire' in words, 'Augmented Flames': 'fire' in words,
+            'Frost Enchanter': 'frost' in words, 'Augmented Frost': 'frost' in words,
+            'Storm Enchanter': 'shock' in words, 'Augmented Shock': 'shock' in words,
+            'Insightful Enchanter': apparel and verb == 'fortify' and target in SKYRIM_SKILLS,
+            'Corpus Enchanter': apparel and bool(words & {'health', 'magicka', 'stamina'}),
+            'Master of the Mind': prof['base'].get('school') == 'Illusion',
+        }
+        for perk in enchant:
+            n = perk['name']
+            if (n.startswith('Enchanter') or n in ('Extra Effect', 'Necromage')
+                    or rules.get(n.split(' (')[0], False)):
+                out.append(dict(perk, tree='enchanting'))
+    return out
+
+
+def skyrim(cur) -> dict:
+    p = _Profiles(('ingredients', 'base', 'enchant_slots', 'disenchant'))
+    for r in _rows(cur, "SELECT e.name, e.effect, e.base_magnitude, e.base_cost, e.base_duration, "
+                        "i.weight, i.value FROM skyrim_alchemy_effects e "
+                        "JOIN skyrim_alchemy_ingredients i ON i.name = e.name ORDER BY e.name"):
+        prof = p.get(r['effect'])
+        prof['ingredients'].append({'name': r['name'], 'weight': r['weight'], 'value': r['value']})
+        prof['base'].setdefault('alchemy', {'base_magnitude': r['base_magnitude'],
+                                            'base_cost': r['base_cost'],
+                                            'base_duration': r['base_duration']})
+    for r in _rows(cur, "SELECT name, school, base_cost FROM skyrim_enchant_weapons"):
+        prof = p.get(r['name'])
+        prof['enchant_slots'] = ['weapon']
+        prof['base']['enchant'] = {'school': r['school'], 'base_cost': r['base_cost']}
+        prof['base']['school'] = r['school']
+    cols = ', '.join(APPAREL_SLOTS)
+    for r in _rows(cur, f"SELECT enchantment, {cols}, base_cost FROM skyrim_enchant_apparel"):
+        prof = p.get(r['enchantment'])
+        prof['enchant_slots'] = [s for s in APPAREL_SLOTS if r[s]]
+        prof['base']['enchant'] = {'base_cost': r['base_cost']}
+    for kind in ('apparel', 'weapons'):
+        for r in _rows(cur, f"SELECT effect, item, note FROM skyrim_enchant_disenchant_{kind} "
+                            f"ORDER BY effect, item"):
+            p.get(r['effect'])['disenchant'].append(
+                {'item': r['item'], 'type': kind.rstrip('s'), 'note': r['note']})
+    alchemy = _rows(cur, "SELECT name, skill_level, prerequisite, description FROM skyrim_alchemy_perks")
+    enchant = _rows(cur, "SELECT name, skill_level, prerequisite, description FROM skyrim_enchant_perks")
+    out = {}
+    for key, prof in p.rows.items():
+        prof['perks'] = _skyrim_perks(key, prof, alchemy, enchant)
+        prof['base'].pop('school', None)
+        out[key] = dict(prof, sigil_stones=None)
+    return out
+
+
+def merge_synonyms(profiles: dict) -> dict:
+    """Merge keys naming the same effect within one game (Paralyze/Paralysis).
+
+    Skill synonyms are cross-game only (Morrowind has both Axe and Blunt Weapon), so
+    skill effects are never merged.  The merged profile is stored under every name.
+    """
+    groups: dict = {}
+    for key in profiles:
+        verb, _, target = key.partition(' ')
+        fams = families(key)
+        skill = verb in GENERIC_VERBS and target in SKILL_SYNONYMS
+        groups.setdefault(fams[0] if len(fams) == 1 and not skill else key, []).append(key)
+    out = {}
+    for fam, keys in groups.items():
+        keys.sort(key=lambda k: (k != fam, not profiles[k]['ingredients'], k))
+        merged = dict(profiles[keys[0]])
+        for k in keys[1:]:
+            for col, val in profiles[k].items():
+                if isinstance(val, list) and isinstance(merged[col], list):
+                    merged[col] = merged[col] + [v for v in val if v not in merged[col]] \
+                        if col != 'enchant_slots' else (merged[col] or val)
+                elif isinstance(val, dict) and merged[col] is not None:
+                    merged[col] = {**val, **merged[col]}
+        for k in keys:
+            out[k] = merged
+    return out
+
+
+BUILDERS = {'morrowind': morrowind, 'oblivion': oblivion, 'skyrim': skyrim}
+COLUMNS = ('ingredients', 'base', 'enchant_slots', 'disenchant', 'perks', 'sigil_stones')
+
+
+def rebuild(conn, games=GAMES) -> dict:
+    """Drop and rebuild the per-game profile tables; return {game: row count}."""
+    cur = conn.cursor()
+    counts = {}
+    for game in games:
+        profiles = merge_synonyms(BUILDERS[game](cur))
+        table = table_name(game)
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute(f"CREATE TABLE {table} (effect_key TEXT PRIMARY KEY, effect TEXT NOT NULL, "
+                    + ", ".join(f"{c} TEXT" for c in COLUMNS) + ")")
+        cur.executemany(
+            f"INSERT INTO {table} VALUES (?, ?, {', '.join('?' for _ in COLUMNS)})",
+            [(key, prof['effect'], *(None if prof[c] is None else json.dumps(prof[c]) for c in COLUMNS))
+             for key, prof in sorted(profiles.items())],
+        )
+        counts[game] = len(profiles)
+    conn.commit()
+    return counts
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the <game>_effect_profile tables")
+    ap.add_argument('db', nargs='?', default=_DEFAULT_DB,
+                    help=f"SQLite database path (default: {_DEFAULT_DB})")
+    args = ap.parse_args()
+
+    print("Starting database update for <game>_effect_profile")
+    conn = sqlite3.connect(args.db)
+    try:
+        counts = rebuild(conn)
+    except Exception as e:
+        print(f"Database error updating effect profiles: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        conn.close()
+        sys.exit(1)
+    conn.close()
+    for game, n in counts.items():
+        print(f"created {table_name(game)}: {n} rows")
+    print("Database update complete for <game>_effect_profile.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+
+"""
+File: load_driver.py
+
+Measure end-to-end POST /api/chat latency (p50/p95/p99) and throughput as
+concurrency grows.
+
+By default the whole stack runs in this process on free localhost ports:
+the mock Messages API (mock_anthropic.py) and the GameTools server pointed
+at it with a placeholder API key, so no key or network is needed.  With
+--server the driver loads an already running server instead; that server
+needs an API key configured and, to use the mock, ANTHROPIC_BASE_URL set.
+
+Each concurrency level sends --requests chats, cycling through the
+scenarios.json questions, with at most that many in flight.
+
+Usage:
+    python load_driver.py [--levels 1,4,16,64] [--requests 64] [--latency-ms 400]
+                          [--jitter-ms 100] [--token-ms 15] [--server URL] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+import mock_anthropic
+
+_HERE = Path(__file__).parent.resolve()
+_SRC = _HERE.parent / 'src'
+_TES = _HERE.parent.parent
+
+_API_KEY = "loadtest-placeholder-key"
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile of values (need not be sorted)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _serve(app) -> tuple[str, callable]:
+    """Run app with uvicorn on a background thread; return (base URL, stop)."""
+    import uvicorn
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port,
+                                           log_level='warning', ws='none'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"server on port {port} failed to start")
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return f"http://127.0.0.1:{port}", stop
+
+
+def start_stack(latency: mock_anthropic.Latency) -> tuple[str, callable]:
+    """Start the mock API and the GameTools server in-process; return (server URL, stop)."""
+    mock_url, stop_mock = _serve(mock_anthropic.create_app(latency=latency))
+    sys.path.insert(0, str(_SRC))
+    import server
+    server.configure(ui_dir=_SRC / 'ui', db_path=_TES / 'database' / 'gametools.sqlite3',
+                     rag_dir=_TES / 'mcp', api_base_url=mock_url)
+    # The mock accepts any key; this keeps the OS credential store out of it.
+    server.credentials.get_api_key = lambda: _API_KEY
+    app_url, stop_app = _serve(server.app)
+
+    def stop():
+        stop_app()
+        stop_mock()
+    return app_url, stop
+
+
+async def run_level(client: httpx.AsyncClient, url: str, questions: list[str],
+                    concurrency: int, requests: int) -> dict:
+    """Send requests chats with at most concurrency in flight; return the level's stats."""
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        body = {"messages": [{"role": "user", "content": questions[i % len(questions)]}]}
+        async with gate:
+            start = time.perf_counter()
+            try:
+                resp = await client.post(f"{url}/api/chat", json=body)
+                ok = resp.status_code == 200 and not resp.json().get("error")
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "throughput_rps": round(requests / wall, 2),
+    }
+
+
+async def drive(url: str, levels: list[int], requests: int, questions: list[str]) -> list[dict]:
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        results = []
+        for level in levels:
+            results.append(await run_level(client, url, questions, level, requests))
+            print_row(results[-1])
+        return results
+
+
+def print_row(row: dict | None) -> None:
+    cols = ("concurrency", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+    if row is None:
+        print("  ".join(f"{c:>14}" for c in cols))
+    else:
+        print("  ".join(f"{row[c]:>14}" for c in cols))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test POST /api/chat against the mock Messages API")
+    ap.add_argument('--levels', default='1,4,16,64', help="comma-separated concurrency levels")
+    ap.add_argument('--requests', type=int, default=64, help="chats per level (default 64)")
+    ap.add_argument('--latency-ms', type=float, default=400.0)
+    ap.add_argument('--jitter-ms', type=float, default=100.0)
+    ap.add_argument('--token-ms', type=float, default=15.0)
+    ap.add_argument('--server', help="URL of a running GameTools server (default: start one)")
+    ap.add_argument('--json', help="also write the results to this file")
+    args = ap.parse_args()
+
+    levels = [int(x) for x in args.levels.split(',') if x.strip()]
+    questions = list(mock_anthropic.load_scenarios())
+    stop = None
+    url = args.server
+    if not url:
+        url, stop = start_stack(mock_anthropic.Latency(args.latency_ms, args.jitter_ms, args.token_ms))
+    print(f"Load test against {url}/api/chat — {args.requests} chats per level")
+    print_row(None)
+    try:
+        results = asyncio.run(drive(url, levels, args.requests, questions))
+    finally:
+        if stop:
+            stop()
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+"""
+File: mock_anthropic.py
+
+Local stand-in for the Anthropic Messages API, for load and latency testing
+of server.py + claude_client.py without an API key or network.
+
+POST /v1/messages answers like the real endpoint, as JSON or, when the
+request sets "stream", as Server-Sent Events.  Replies are scripted by
+scenarios.json: each entry is a question from TES/showcase/*.md with the
+tool-call rounds the model makes for it and the final answer.  The mock
+finds the scenario from the latest user question, counts the model rounds
+since it, and returns the next round's tool_use blocks (stop_reason
+"tool_use") or the answer (stop_reason "end_turn").  A question with no
+scenario gets a one-line answer and no tool calls.
+
+Latency per request is --latency-ms (plus up to --jitter-ms either way)
+before the first byte, then --token-ms per streamed text chunk; a JSON reply
+waits for the same total.
+
+Usage:
+    python mock_anthropic.py [--port 8788] [--latency-ms 400] [--jitter-ms 100] [--token-ms 15]
+
+Point the chat server at it with server.configure(..., api_base_url=...) or
+ANTHROPIC_BASE_URL=http://127.0.0.1:8788; any API key is accepted.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SCENARIOS_PATH = Path(__file__).parent / "scenarios.json"
+
+_WORDS_PER_CHUNK = 3
+
+
+@dataclass
+class Latency:
+    first_ms: float = 400.0     # before the first byte
+    jitter_ms: float = 100.0    # uniform, either way
+    token_ms: float = 15.0      # per streamed text chunk
+
+    def first(self) -> float:
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.first_ms + jitter) / 1000
+
+
+def load_scenarios(path: Path = SCENARIOS_PATH) -> dict[str, dict]:
+    """Scenarios keyed by question."""
+    return {s["question"]: s for s in json.loads(path.read_text(encoding="utf-8"))}
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return " ".join(b.get("text", "") for b in content if b.get("type") == "text")
+
+
+def _turn(messages: list[dict]) -> tuple[str, int]:
+    """The latest user question and how many model rounds have followed it."""
+    rounds = 0
+    for m in reversed(messages):
+        if m["role"] == "assistant":
+            rounds += 1
+        elif not any(isinstance(b, dict) and b.get("type") == "tool_result"
+                     for b in (m["content"] if isinstance(m["content"], list) else [])):
+            # Compaction may put a note paragraph in front of the question.
+            return _text(m["content"]).split("\n\n")[-1].strip(), rounds
+    return "", rounds
+
+
+def _reply(scenario: dict | None, rounds: int) -> tuple[list[dict], str]:
+    """Content blocks and stop reason for the next model round."""
+    if scenario and rounds < len(scenario["rounds"]):
+        blocks = [{"type": "tool_use", "id": f"toolu_mock_{uuid.uuid4().hex[:16]}",
+                   "name": call["name"], "input": call["input"]}
+                  for call in scenario["rounds"][rounds]]
+        return blocks, "tool_use"
+    answer = scenario["answer"] if scenario else "This is a scripted reply from the mock Messages API."
+    return [{"type": "text", "text": answer}], "end_turn"
+
+
+def _chunks(text: str) -> list[str]:
+    words = text.split(" ")
+    return [" ".join(words[i:i + _WORDS_PER_CHUNK]) + (" " if i + _WORDS_PER_CHUNK < len(words) else "")
+            for i in range(0, len(words), _WORDS_PER_CHUNK)]
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(message: dict, latency: Latency):
+    await asyncio.sleep(latency.first())
+    start = {**message, "content": [], "stop_reason": None,
+             "usage": {**message["usage"], "output_tokens": 1}}
+    yield _sse("message_start", {"type": "message_start", "message": start})
+    for i, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            yield _sse("content_block_start", {"type": "content_block_start", "index": i,
+                                               "content_block": {"type": "text", "text": ""}})
+            for chunk in _chunks(block["text"]):
+                await asyncio.sleep(latency.token_ms / 1000)
+                yield _sse("content_block_delta", {"type": "content_block_delta", "index": i,
+                                                   "delta": {"type": "text_delta", "text": chunk}})
+        else:
+            yield _sse("content_block_start", {"type": "content_block_start", "index": i,
+                                               "content_block": {**block, "input": {}}})
+            yield _sse("content_block_delta", {"type": "content_block_delta", "index": i,
+                                               "delta": {"type": "input_json_delta",
+                                                         "partial_json": json.dumps(block["input"])}})
+        yield _sse("content_block_stop", {"type": "content_block_stop", "index": i})
+    yield _sse("message_delta", {"type": "message_delta",
+                                 "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                 "usage": {"output_tokens": message["usage"]["output_tokens"]}})
+    yield _sse("message_stop", {"type": "message_stop"})
+
+
+def create_app(scenarios: dict[str, dict] | None = None, latency: Latency | None = None) -> FastAPI:
+    """The mock API as an ASGI app."""
+    scenarios = load_scenarios() if scenarios is None else scenarios
+    latency = latency or Latency()
+    app = FastAPI(title="Mock Anthropic Messages API", docs_url=None, redoc_url=None)
+    app.state.requests = 0
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        app.state.requests += 1
+        body = await request.json()
+        question, rounds = _turn(body["messages"])
+        content, stop_reason = _reply(scenarios.get(question), rounds)
+        output_chars = len(json.dumps(content))
+        message = {
+            "id": f"msg_mock_{uuid.uuid4().hex[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(await request.body()) // 4, "output_tokens": output_chars // 4,
+                      "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0},
+        }
+        if body.get("stream"):
+            return StreamingResponse(_stream(message, latency), media_type="text/event-stream")
+        text_chunks = sum(len(_chunks(b["text"])) for b in content if b["type"] == "text")
+        await asyncio.sleep(latency.first() + text_chunks * latency.token_ms / 1000)
+        return JSONResponse(message)
+
+    return app
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a mock Anthropic Messages API")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8788)
+    ap.add_argument('--latency-ms', type=float, default=400.0, help="time to first byte (default 400)")
+    ap.add_argument('--jitter-ms', type=float, default=100.0, help="uniform jitter on it (default 100)")
+    ap.add_argument('--token-ms', type=float, default=15.0, help="per streamed text chunk (default 15)")
+    args = ap.parse_args()
+
+    import uvicorn
+    latency = Latency(args.latency_ms, args.jitter_ms, args.token_ms)
+    print(f"Mock Messages API at http://{args.host}:{args.port}/v1/messages")
+    uvicorn.run(create_app(latency=latency), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""Answer cache for repeated first-turn chat questions.
+
+Many questions arrive again and again in slightly different words
+("What ingredients give Fortify Smithing?", "fortify smithing ingredients
+please"), and
+each would otherwise cost a full multi-round tool-use conversation.  The
+server asks this cache before calling the model and stores every
+successful answer afterwards.
+
+Only first-turn questions are cached (a single user message with no
+earlier conversation to depend on).  An entry is keyed by the normalized
+question, the game context, the model and the database build, so a rebuilt
+database or a different model never serves an old answer.
+
+A question is normalized to its content words: lower case, stopwords,
+plurals and asking words ("please", "give", "how many") dropped.  A lookup
+tries the exact normalized question first.  With similarity
+enabled it then compares a local embedding of the question (hashed word
+and character-trigram counts, no model download) against the entries with
+the same context, model and database, and accepts the closest one when
+its cosine similarity reaches the threshold and the two questions differ
+only by stopwords, plurals or typos: the remaining words must line up one
+for one in the same order, each with a close spelling of the other, and
+every number must match exactly in the same place.  So "Fortify Smithing"
+never matches "Fortify Sneak", "100 skill" never matches "50 skill", and
+"5 iron and 2 steel" never matches "2 iron and 5 steel" (the embedding
+alone cannot tell those apart, as it ignores word order).
+
+Entries expire after ttl seconds and the least recently used are evicted
+past max_entries.  With a path, entries persist in a small SQLite file and
+are reloaded on start.
+"""
+import difflib
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+import rag
+
+DEFAULT_TTL = 7 * 24 * 3600     # seconds
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_SIMILARITY = 0.8         # cosine threshold for a near match
+
+_DIM = 1024                      # hashed embedding width
+_WORD_MATCH = 0.8                # difflib ratio for two spellings of one word
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key          TEXT PRIMARY KEY,
+    question     TEXT NOT NULL,
+    game_context TEXT NOT NULL,
+    model        TEXT NOT NULL,
+    db_version   TEXT NOT NULL,
+    response     TEXT NOT NULL,
+    tool_calls   TEXT NOT NULL,
+    created      REAL NOT NULL,
+    last_used    REAL NOT NULL
+)
+"""
+
+# Words that change how a question is asked, not what it asks (after
+# rag.tokenize, so plurals are already folded).
+_FILLER = frozenset(
+    "get give got hey hi know list many much need ok please show tell thank want".split()
+)
+
+_db_versions: dict[tuple[str, int, int], str] = {}
+
+
+def normalize(question: str) -> str:
+    """Lower-case content words of a question (rag.tokenize, less filler), space-joined."""
+    return " ".join(t for t in rag.tokenize(question) if t not in _FILLER)
+
+
+def db_version(path: Path | None) -> str:
+    """Content hash of the database file; recomputed only when it changes on disk."""
+    if path is None:
+        return ""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return ""
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _db_versions:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _db_versions[key] = digest.hexdigest()[:16]
+    return _db_versions[key]
+
+
+def cacheable(messages: list[dict]) -> str | None:
+    """The question text if messages is a single first-turn user question, else None."""
+    if len(messages) != 1 or messages[0].get("role") != "user":
+        return None
+    content = messages[0].get("content")
+    if isinstance(content, list):
+        if not all(isinstance(b, dict) and b.get("type") == "text" for b in content):
+            return None
+        content = "\n".join(b.get("text", "") for b in content)
+    if not isinstance(content, str) or not normalize(content):
+        return None
+    return content
+
+
+def embed(text: str) -> np.ndarray:
+    """Unit vector of hashed word and character-trigram counts of normalized text."""
+    vec = np.zeros(_DIM, dtype=np.float32)
+    for word in normalize(text).split():
+        vec[zlib.crc32(word.encode()) % _DIM] += 2.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            vec[zlib.crc32(padded[i:i + 3].encode()) % _DIM] += 1.0
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def _same_words(a: str, b: str) -> bool:
+    """True if the normalized questions differ only by the spelling of non-numeric words."""
+    wa, wb = a.split(), b.split()
+    if len(wa) != len(wb):
+        return False
+    for x, y in zip(wa, wb):
+        if x == y:
+            continue
+        if x.isdigit() or y.isdigit() or difflib.SequenceMatcher(None, x, y).ratio() < _WORD_MATCH:
+            return False
+    return True
+
+
+@dataclass
+class _Entry:
+    question: str
+    normalized: str
+    scope: tuple[str, str, str]         # (game_context, model, db_version)
+    response: str
+    tool_calls: list[dict]
+    created: float
+    last_used: float
+    vector: np.ndarray
+
+
+class AnswerCache:
+    """LRU + TTL cache of chat answers, optionally backed by a SQLite file.
+
+    Thread-safe: the sync routes run in the server's thread pool.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        similarity: float | None = DEFAULT_SIMILARITY,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+            self._load()
+
+    @staticmethod
+    def _key(normalized: str, scope: tuple[str, str, str]) -> str:
+        return hashlib.sha256(json.dumps([normalized, *scope]).encode()).hexdigest()
+
+    def _load(self) -> None:
+        now = self._clock()
+        with self._conn:
+            self._conn.execute("DELETE FROM answers WHERE created <= ?", (now - self.ttl,))
+        rows = self._conn.execute(
+            "SELECT key, question, game_context, model, db_version, response, tool_calls, "
+            "created, last_used FROM answers ORDER BY last_used DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, question, ctx, model, version, response, tool_calls, created, last_used in reversed(rows):
+            self._entries[key] = _Entry(
+                question, normalize(question), (ctx, model, version), response,
+                json.loads(tool_calls), created, last_used, embed(question),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, keys: list[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+        if self._conn is not None and keys:
+            with self._conn:
+                self._conn.executemany("DELETE FROM answers WHERE key = ?", [(k,) for k in keys])
+
+    def _find(self, question: str, scope: tuple[str, str, str]) -> str | None:
+        normalized = normalize(question)
+        key = self._key(normalized, scope)
+        if key in self._entries:
+            return key
+        if self.similarity is None:
+            return None
+        candidates = [(k, e) for k, e in self._entries.items() if e.scope == scope]
+        if not candidates:
+            return None
+        scores = np.stack([e.vector for _, e in candidates]) @ embed(question)
+        for i in np.argsort(-scores):
+            if scores[i] < self.similarity:
+                break
+            if _same_words(normalized, candidates[i][1].normalized):
+                return candidates[i][0]
+        return None
+
+    def get(self, question: str, game_context: str, model: str, db_version: str) -> dict | None:
+        """The cached answer for question, as {"question", "response", "tool_calls"}, or None."""
+        scope = (game_context, model, db_version)
+        with self._lock:
+            now = self._clock()
+            self._drop([k for k, e in self._entries.items() if now - e.created >= self.ttl])
+            key = self._find(question, scope)
+            if key is None:
+                self.misses += 1
+                return None
+            entry = self._entries[key]
+            entry.last_used = now
+            self._entries.move_to_end(key)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return {"question": entry.question, "response": entry.response, "tool_calls": entry.tool_calls}
+
+    def put(
+        self,
+        question: str,
+        game_context: str,
+        model: str,
+        db_version: str,
+        response: str,
+        tool_calls: list[dict],
+    ) -> None:
+        """Store (or refresh) the answer to question."""
+        scope = (game_context, model, db_version)
+        normalized = normalize(question)
+        key = self._key(normalized, scope)
+        # Round-trip through JSON so the memory copy matches what a reload returns.
+        calls_json = json.dumps(tool_calls, default=str)
+        with self._lock:
+            now = self._clock()
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(
+                question, normalized, scope, response, json.loads(calls_json), now, now, embed(question),
+            )
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, question, *scope, response, calls_json, now, now),
+                    )
+            excess = len(self._entries) - self.max_entries
+            if excess > 0:
+                self._drop(list(self._entries)[:excess])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM answers")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
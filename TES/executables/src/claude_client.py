@@ -2,18 +2,67 @@
 
 Sends conversation to Claude, executes tool calls locally against the
 SQLite database, and continues until Claude stops with a text response.
+chat() returns the finished conversation; chat_stream() yields the same
+work as events (text deltas, tool start/finish) while it happens.
+
+When one model turn asks for several tools, they run concurrently on a small
+thread pool.  Each tools._query opens its own read-only SQLite connection, so
+workers never share a connection; results go back to the model in tool_use
+order regardless of which call finished first.
+
+Rules context comes from the RAG markdown documents.  By default only the
+general rules and the sections that instruct the assistant (rag "always"
+sections), plus the sections that rag.BM25Index ranks highest for the latest
+question (within the games in play), are sent, a seventh to a fifth of the full
+~100 KB dump; with set_rag_dir(..., retrieval=False), or when nothing
+matches, every document is sent as before.
+
+The rules prompt and the tool schemas do not change between the tool rounds
+of a turn, so they are sent with cache_control and billed at the cache-read
+rate after the first round; the per-game context goes in a separate uncached
+system block after them so it never invalidates the cached prefix.
+
+Tool results go back to the model in result_encoding's compact table form
+(the UI and tool_calls keep the plain result).  Before every API call the
+conversation goes through compaction.compact(),
+which keeps it under history_budget estimated tokens; the full history is
+still what the loop appends to.
+
+achat() is chat() for async callers (the /api/chat route): the API call is
+awaited on one long-lived AsyncAnthropic per API key, whose connection pool
+(HTTP/2 when the h2 package is installed) is reused across requests, and
+tool calls run on _TOOL_EXECUTOR, a thread pool shared and bounded across
+all chats.  A chat waiting on the model holds no thread.
 """
-import json
+import asyncio
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import anthropic
 
+import compaction
+import rag
+import result_encoding
 import tools as _tools
 
 # RAG docs loaded at startup — provide game rules context in the system prompt
 _RAG_DIR: Path | None = None
-_SYSTEM_PROMPT: str = ""
+_SYSTEM_PROMPT: str = ""        # full dump of every document (fallback)
+_RAG_INDEX: rag.BM25Index | None = None
+
+# Retrieved sections per request, on top of the always sections: at most
+# this many, and no more text than this once the first (best) section is in.
+_RAG_TOP_K = 8
+_RAG_CHAR_BUDGET = 12_000
+
+_PREAMBLE = (
+    "You are GameTools TES Assistant, an expert on The Elder Scrolls crafting systems "
+    "(Morrowind, Oblivion, Skyrim). You have access to a SQLite database via tools. "
+    "Use tools to answer questions precisely — never invent numbers.\n\n"
+)
 
 _CONTEXT_ALERTS = {
     "Morrowind": ["smithing", "creation club", "hearthfire", "sigil stone"],
@@ -21,21 +70,97 @@ _CONTEXT_ALERTS = {
     "Skyrim": [],  # all systems present
 }
 
+# Upper bound on tool calls from one model turn that run at the same time.
+_TOOL_WORKERS = 4
 
-def set_rag_dir(rag_dir: Path) -> None:
-    """Load RAG markdown docs and build the system prompt."""
-    global _RAG_DIR, _SYSTEM_PROMPT
+# Messages API base URL; None keeps the SDK default, which honours
+# ANTHROPIC_BASE_URL.  Point it at loadtest/mock_anthropic.py to benchmark
+# without an API key or network.
+_BASE_URL: str | None = None
+
+# Async chats: one client per API key (and base URL) for the life of the
+# process, and one executor bounding the tool calls of all of them together.
+_ASYNC_CLIENTS: dict[tuple[str, str | None], anthropic.AsyncAnthropic] = {}
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tes-tool")
+
+
+def set_rag_dir(rag_dir: Path, retrieval: bool = True) -> None:
+    """Load RAG markdown docs: build the full system prompt and, unless
+    retrieval is False, the section index used in its place."""
+    global _RAG_DIR, _SYSTEM_PROMPT, _RAG_INDEX
     _RAG_DIR = rag_dir
     docs = []
     for md_file in sorted(rag_dir.glob("*.md")):
         docs.append(f"## {md_file.stem}\n\n{md_file.read_text(encoding='utf-8')}")
     _SYSTEM_PROMPT = (
-        "You are GameTools TES Assistant, an expert on The Elder Scrolls crafting systems "
-        "(Morrowind, Oblivion, Skyrim). You have access to a SQLite database via tools. "
-        "Use tools to answer questions precisely — never invent numbers.\n\n"
-        "Rules and mechanics for each game are provided below.\n\n"
+        _PREAMBLE
+        + "Rules and mechanics for each game are provided below.\n\n"
         + "\n\n---\n\n".join(docs)
     )
+    index = rag.BM25Index.from_dir(rag_dir) if retrieval else None
+    _RAG_INDEX = index if index and index.sections else None
+
+
+def _query_text(messages: list[dict]) -> str:
+    """Text of the last two user messages: the question plus what it follows up on."""
+    texts = []
+    for m in reversed(messages):
+        if m["role"] != "user":
+            continue
+        content = m["content"]
+        if isinstance(content, list):
+            content = " ".join(b.get("text", "") for b in content if isinstance(b, dict))
+        texts.append(content)
+        if len(texts) == 2:
+            break
+    return "\n".join(reversed(texts))
+
+
+def _rag_games(query: str, game_context: str) -> set[str] | None:
+    """Games whose rules sections may be retrieved; None means all of them."""
+    if not game_context or game_context == "All Games":
+        return None
+    lower = query.lower()
+    # A system the current game lacks (smithing in Morrowind, …) triggers the
+    # context warning; the games that do have it are needed to answer.
+    if any(kw in lower for kw in _CONTEXT_ALERTS.get(game_context, [])):
+        return None
+    return {game_context} | {g for g in rag.GAMES if g.lower() in lower}
+
+
+def _retrieved_prompt(query: str, game_context: str) -> str | None:
+    """Rules prompt: the always sections (instructions and the general rules),
+    then the best-matching reference sections; None to send the full dump."""
+    if _RAG_INDEX is None:
+        return None
+    games = _rag_games(query, game_context)
+    picked, size = [], 0
+    for section in _RAG_INDEX.search(query, games, k=_RAG_TOP_K):
+        if picked and size + len(section.text) > _RAG_CHAR_BUDGET:
+            continue
+        picked.append(section)
+        size += len(section.text)
+    if not picked:
+        return None
+    return (
+        _PREAMBLE
+        + "The general rules, the instructions that always apply, and the rules sections "
+        "most relevant to this question are provided below; use the tools for anything "
+        "they do not cover.\n\n"
+        + "\n\n---\n\n".join(f"({s.doc})\n{s.text}" for s in _RAG_INDEX.always(games) + picked)
+    )
+
+
+def set_base_url(url: str | None) -> None:
+    """Send Messages API requests to url instead of the default endpoint."""
+    global _BASE_URL
+    _BASE_URL = url
+
+
+def _sync_client(api_key: str) -> anthropic.Anthropic:
+    if _BASE_URL is None:
+        return anthropic.Anthropic(api_key=api_key)
+    return anthropic.Anthropic(api_key=api_key, base_url=_BASE_URL)
 
 
 def _context_check(user_message: str, game_context: str) -> str | None:
@@ -55,12 +180,150 @@ def _context_check(user_message: str, game_context: str) -> str | None:
     return None
 
 
+def _system_prompt(game_context: str, query: str = "") -> list[dict]:
+    """System prompt blocks: the cached rules prompt, then the active game context, if set."""
+    system = []
+    rules = _retrieved_prompt(query, game_context) or _SYSTEM_PROMPT
+    if rules:
+        system.append({"type": "text", "text": rules, "cache_control": {"type": "ephemeral"}})
+    if game_context and game_context != "All Games":
+        system.append({"type": "text", "text": (
+            f"## Active Game Context\n\nThe user is currently playing **{game_context}**. "
+            f"Unless the question explicitly mentions another game, assume all queries refer to {game_context}."
+        )})
+    return system
+
+
+def _cached_tools() -> list[dict]:
+    """Tool schemas with a cache breakpoint on the last one, caching them all."""
+    if not _tools.TOOLS:
+        return []
+    return [*_tools.TOOLS[:-1], {**_tools.TOOLS[-1], "cache_control": {"type": "ephemeral"}}]
+
+
+_USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def _add_usage(total: dict, response: Any) -> None:
+    """Add one API response's token usage to the running total for a chat turn."""
+    usage = getattr(response, "usage", None)
+    for field in _USAGE_FIELDS:
+        total[field] += getattr(usage, field, None) or 0
+
+
+def _latest_warning(messages: list[dict], game_context: str) -> str | None:
+    """Context mismatch check on the latest user message."""
+    if not messages:
+        return None
+    last_user = next(
+        (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+    )
+    if isinstance(last_user, str):
+        return _context_check(last_user, game_context)
+    return None
+
+
+def _tool_arguments(block: Any) -> dict:
+    return block.input if isinstance(block.input, dict) else {}
+
+
+def _run_tool(block: Any) -> tuple[dict, dict]:
+    """Execute one tool_use block; return (log entry, tool_result content block)."""
+    arguments = _tool_arguments(block)
+    start = time.perf_counter()
+    result = _tools.call_tool(block.name, arguments)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    return (
+        {"name": block.name, "arguments": arguments, "result": result, "elapsed_ms": elapsed_ms},
+        {"type": "tool_result", "tool_use_id": block.id, "content": result_encoding.encode_result(result)},
+    )
+
+
+def _run_tools(blocks: list) -> Iterator[tuple[int, dict, dict]]:
+    """Execute one turn's tool_use blocks on a bounded thread pool.
+
+    Yields (position in blocks, log entry, tool_result) as each call finishes;
+    callers restore tool_use order by position.
+    """
+    if len(blocks) <= 1:
+        for i, block in enumerate(blocks):
+            yield (i, *_run_tool(block))
+        return
+    with ThreadPoolExecutor(max_workers=min(_TOOL_WORKERS, len(blocks))) as pool:
+        futures = {pool.submit(_run_tool, block): i for i, block in enumerate(blocks)}
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+
+
+class _Turn:
+    """One question's tool-use loop state and the steps chat(), achat() and
+    chat_stream() share; they differ only in how a round's API call is made
+    (blocking, awaited, streamed) and how its tool calls run."""
+
+    def __init__(self, messages: list[dict], game_context: str, model: str, history_budget: int | None):
+        self.model = model
+        self.history_budget = history_budget
+        self.system = _system_prompt(game_context, _query_text(messages))
+        self.warning = _latest_warning(messages, game_context)
+        self.tools = _cached_tools()
+        self.usage = dict.fromkeys(_USAGE_FIELDS, 0)
+        self.tool_calls: list[dict] = []
+        self.conv = list(messages)  # working copy
+
+    def request(self) -> dict:
+        """Keyword arguments for this round's messages.create() / messages.stream()."""
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": self.system,
+            "tools": self.tools,
+            "messages": compaction.compact(self.conv, self.history_budget),
+        }
+
+    def result(self, response: str, error: str | None = None) -> dict:
+        return {"response": response, "tool_calls": self.tool_calls,
+                "warning": self.warning, "usage": self.usage, "error": error}
+
+    def api_error(self, exc: anthropic.APIError) -> dict:
+        if isinstance(exc, anthropic.AuthenticationError):
+            return self.result("", "Invalid API key. Please update your credentials in Settings.")
+        return self.result("", f"API error: {exc}")
+
+    def answer(self, response: Any) -> dict | None:
+        """Count a round's usage; the final result, or None if the model asked for tools."""
+        _add_usage(self.usage, response)
+        if response.stop_reason == "tool_use":
+            return None
+        text = "".join(block.text for block in response.content if hasattr(block, "text"))
+        if response.stop_reason == "end_turn":
+            return self.result(text)
+        # Unexpected stop reason
+        return self.result(text or f"(Stopped: {response.stop_reason})")
+
+    def tool_uses(self, response: Any) -> list:
+        """Add the assistant message; return its tool_use blocks in order."""
+        self.conv.append({
+            "role": "assistant",
+            "content": [block.model_dump() for block in response.content],
+        })
+        return [block for block in response.content if block.type == "tool_use"]
+
+    def add_tool_results(self, finished: list[tuple[dict, dict]]) -> None:
+        """Log (entry, tool_result) pairs, in tool_use order, and send the results back."""
+        self.tool_calls.extend(entry for entry, _ in finished)
+        self.conv.append({"role": "user", "content": [tool_result for _, tool_result in finished]})
+
+    def out_of_rounds(self, max_tool_rounds: int) -> dict:
+        return self.result("", f"Reached maximum tool-use rounds ({max_tool_rounds}) without a final answer.")
+
+
 def chat(
     messages: list[dict],
     api_key: str,
     game_context: str = "",
     model: str = "claude-sonnet-5-20251101",
     max_tool_rounds: int = 15,
+    history_budget: int | None = compaction.DEFAULT_BUDGET,
 ) -> dict:
     """Run a full tool-use conversation loop.
 
@@ -76,116 +339,135 @@ def chat(
         Anthropic model ID to use.
     max_tool_rounds:
         Safety cap on tool-use iterations.
+    history_budget:
+        Estimated-token budget for the messages sent each round; older tool
+        results and turns are compacted to fit.  None only removes repeated
+        tool results.
 
     Returns
     -------
     dict with keys:
         "response"    → final assistant text
-        "tool_calls"  → list of {name, arguments, result} for each tool used
+        "tool_calls"  → list of {name, arguments, result, elapsed_ms} for each
+                        tool used, in the order the model asked for them
         "warning"     → context mismatch warning string or None
         "error"       → error string or None
+        "usage"       → token totals over all rounds: input_tokens, output_tokens,
+                        cache_creation_input_tokens, cache_read_input_tokens
     """
-    client = anthropic.Anthropic(api_key=api_key)
+    turn = _Turn(messages, game_context, model, history_budget)
+    client = _sync_client(api_key)
+    for _round in range(max_tool_rounds):
+        try:
+            response = client.messages.create(**turn.request())
+        except anthropic.APIError as exc:
+            return turn.api_error(exc)
+        final = turn.answer(response)
+        if final is not None:
+            return final
+        # Execute the tool calls (concurrently if several) in tool_use order
+        finished = sorted(_run_tools(turn.tool_uses(response)), key=lambda r: r[0])
+        turn.add_tool_results([(entry, tool_result) for _, entry, tool_result in finished])
+    return turn.out_of_rounds(max_tool_rounds)
 
-    # Build system prompt, injecting game context if set
-    system = _SYSTEM_PROMPT
-    if game_context and game_context != "All Games":
-        system += (
-            f"\n\n## Active Game Context\n\nThe user is currently playing **{game_context}**. "
-            f"Unless the question explicitly mentions another game, assume all queries refer to {game_context}."
-        )
 
-    # Context mismatch check on the latest user message
-    warning: str | None = None
-    if messages:
-        last_user = next(
-            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+def _async_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """The shared AsyncAnthropic for api_key, created on first use."""
+    key = (api_key, _BASE_URL)
+    client = _ASYNC_CLIENTS.get(key)
+    if client is None:
+        http2 = importlib.util.find_spec("h2") is not None
+        client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            base_url=_BASE_URL,
+            http_client=anthropic.DefaultAsyncHttpxClient(http2=http2),
         )
-        if isinstance(last_user, str):
-            warning = _context_check(last_user, game_context)
+        _ASYNC_CLIENTS[key] = client
+    return client
+
+
+async def _arun_tools(blocks: list) -> list[tuple[dict, dict]]:
+    """Execute one turn's tool_use blocks on _TOOL_EXECUTOR, results in tool_use order."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(_TOOL_EXECUTOR, _run_tool, b) for b in blocks))
 
-    tool_calls_log: list[dict] = []
-    conv = list(messages)  # working copy
 
+async def achat(
+    messages: list[dict],
+    api_key: str,
+    game_context: str = "",
+    model: str = "claude-sonnet-5-20251101",
+    max_tool_rounds: int = 15,
+    history_budget: int | None = compaction.DEFAULT_BUDGET,
+) -> dict:
+    """Async chat(): same parameters, same loop, same result dict."""
+    turn = _Turn(messages, game_context, model, history_budget)
+    client = _async_client(api_key)
     for _round in range(max_tool_rounds):
         try:
-            response = client.messages.create(
-                model=model,
-                max_tokens=4096,
-                system=system,
-                tools=_tools.TOOLS,
-                messages=conv,
-            )
-        except anthropic.AuthenticationError:
-            return {
-                "response": "",
-                "tool_calls": tool_calls_log,
-                "warning": warning,
-                "error": "Invalid API key. Please update your credentials in Settings.",
-            }
+            response = await client.messages.create(**turn.request())
         except anthropic.APIError as exc:
-            return {
-                "response": "",
-                "tool_calls": tool_calls_log,
-                "warning": warning,
-                "error": f"API error: {exc}",
-            }
+            return turn.api_error(exc)
+        final = turn.answer(response)
+        if final is not None:
+            return final
+        turn.add_tool_results(await _arun_tools(turn.tool_uses(response)))
+    return turn.out_of_rounds(max_tool_rounds)
 
-        if response.stop_reason == "end_turn":
-            text = "".join(
-                block.text for block in response.content
-                if hasattr(block, "text")
-            )
-            return {
-                "response": text,
-                "tool_calls": tool_calls_log,
-                "warning": warning,
-                "error": None,
-            }
 
-        if response.stop_reason == "tool_use":
-            # Add assistant message with all content blocks
-            conv.append({
-                "role": "assistant",
-                "content": [block.model_dump() for block in response.content],
-            })
-
-            # Execute each tool call and collect results
-            tool_results = []
-            for block in response.content:
-                if block.type != "tool_use":
-                    continue
-                tool_name = block.name
-                arguments = block.input if isinstance(block.input, dict) else {}
-                result = _tools.call_tool(tool_name, arguments)
-                tool_calls_log.append({
-                    "name": tool_name,
-                    "arguments": arguments,
-                    "result": result,
-                })
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": block.id,
-                    "content": json.dumps(result, default=str),
-                })
-
-            conv.append({"role": "user", "content": tool_results})
-            continue
+def chat_stream(
+    messages: list[dict],
+    api_key: str,
+    game_context: str = "",
+    model: str = "claude-sonnet-5-20251101",
+    max_tool_rounds: int = 15,
+    history_budget: int | None = compaction.DEFAULT_BUDGET,
+) -> Iterator[dict]:
+    """Run the same tool-use loop as chat(), yielding events as they happen.
 
-        # Unexpected stop reason
-        text = "".join(
-            block.text for block in response.content if hasattr(block, "text")
-        )
-        return {
-            "response": text or f"(Stopped: {response.stop_reason})",
-            "tool_calls": tool_calls_log,
-            "warning": warning,
-            "error": None,
-        }
+    Parameters are those of chat().  Text is relayed from the Anthropic
+    streaming API token by token, so the first event arrives with the first
+    token rather than after the last tool round.
+
+    Yields
+    ------
+    dicts with a "type" key:
+        "warning"     → {"warning"}: context mismatch, before any API call
+        "text"        → {"text"}: a text delta of the current round
+        "tool_start"  → {"id", "name", "arguments"}: a tool call is about to run
+        "tool_end"    → {"id", "name", "result", "elapsed_ms"}: that tool call
+                        finished (several calls of one turn finish in any order)
+        "done"        → the dict chat() would have returned; always last
+    """
+    turn = _Turn(messages, game_context, model, history_budget)
+    client = _sync_client(api_key)
+    if turn.warning:
+        yield {"type": "warning", "warning": turn.warning}
+
+    for _round in range(max_tool_rounds):
+        try:
+            with client.messages.stream(**turn.request()) as stream:
+                for text in stream.text_stream:
+                    yield {"type": "text", "text": text}
+                response = stream.get_final_message()
+        except anthropic.APIError as exc:
+            yield {"type": "done", **turn.api_error(exc)}
+            return
+        final = turn.answer(response)
+        if final is not None:
+            yield {"type": "done", **final}
+            return
+
+        blocks = turn.tool_uses(response)
+        for block in blocks:
+            yield {"type": "tool_start", "id": block.id, "name": block.name,
+                   "arguments": _tool_arguments(block)}
+        finished = []
+        for i, entry, tool_result in _run_tools(blocks):
+            finished.append((i, entry, tool_result))
+            yield {"type": "tool_end", "id": blocks[i].id, "name": blocks[i].name,
+                   "result": entry["result"], "elapsed_ms": entry["elapsed_ms"]}
+        finished.sort(key=lambda r: r[0])
+        turn.add_tool_results([(entry, tool_result) for _, entry, tool_result in finished])
 
-    return {
-        "response": "",
-        "tool_calls": tool_calls_log,
-        "warning": warning,
-        "error": f"Reached maximum tool-use rounds ({max_tool_rounds}) without a final answer.",
-    }
+    yield {"type": "done", **turn.out_of_rounds(max_tool_rounds)}
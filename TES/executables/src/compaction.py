@@ -0,0 +1,197 @@
+"""Conversation compaction before each Anthropic API call.
+
+Tool results are appended to the conversation as JSON and resent on every
+later round, so a long session pays again and again for full-table dumps
+the model has already read.  compact() returns a copy of the conversation
+that fits a token budget, applying three stages in order and stopping as
+soon as the estimate is under budget:
+
+1. repeated identical tool results → a reference to the latest copy
+   (always applied; it loses nothing)
+2. large tool results the model has already answered from → the first rows
+   and a note saying how to get the rest, oldest first
+3. whole older turns → dropped, oldest first, with a note on the first kept
+   user message; the current turn is never dropped
+
+The input list is never modified; callers keep the full history.
+"""
+import json
+import re
+from typing import Any
+
+DEFAULT_BUDGET = 40_000         # estimated input tokens for the message list
+RESULT_TOKENS = 600             # a consumed tool result is cut to about this size
+
+# BPE-style pieces: letters in runs of up to 8, digits in groups of up to 3,
+# each other visible character alone.  This follows how the tokenizer splits
+# JSON (punctuation and numbers, which a plain chars/4 estimate undercounts)
+# without a network round trip to the count_tokens endpoint.
+_PIECE_RE = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|[^\sA-Za-z\d]")
+_MESSAGE_OVERHEAD = 4            # role and framing tokens per message
+_BLOCK_OVERHEAD = 3              # framing tokens per content block
+_DEDUP_MIN_CHARS = 200           # smaller duplicates are not worth a reference
+
+
+def estimate_tokens(value: Any) -> int:
+    """Estimated token count of a string, or of any JSON-able value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(_PIECE_RE.findall(value))
+
+
+def _content_tokens(content: Any) -> int:
+    """Estimated tokens of message content: a string or a list of content blocks.
+
+    Block text is counted as the model sees it, not as escaped JSON.
+    """
+    if isinstance(content, str):
+        return estimate_tokens(content)
+    total = 0
+    for block in content:
+        if not isinstance(block, dict):
+            total += estimate_tokens(block)
+        elif block.get("type") == "text":
+            total += _BLOCK_OVERHEAD + estimate_tokens(block.get("text", ""))
+        elif block.get("type") == "tool_result":
+            total += _BLOCK_OVERHEAD + _content_tokens(block.get("content", ""))
+        elif block.get("type") == "tool_use":
+            total += _BLOCK_OVERHEAD + estimate_tokens(block.get("name", "")) + estimate_tokens(block.get("input", {}))
+        else:
+            total += _BLOCK_OVERHEAD + estimate_tokens(block)
+    return total
+
+
+def estimate_messages(messages: list[dict]) -> int:
+    """Estimated token count of a message list as sent to the API."""
+    return sum(_MESSAGE_OVERHEAD + _content_tokens(m["content"]) for m in messages)
+
+
+def _tool_results(messages: list[dict]) -> list[tuple[int, int, dict]]:
+    """(message index, block index, block) for every tool_result block, in order."""
+    found = []
+    for i, m in enumerate(messages):
+        if m["role"] == "user" and isinstance(m["content"], list):
+            for j, block in enumerate(m["content"]):
+                if isinstance(block, dict) and block.get("type") == "tool_result":
+                    found.append((i, j, block))
+    return found
+
+
+def _tool_names(messages: list[dict]) -> dict[str, str]:
+    """tool_use_id → tool name, from the assistant tool_use blocks."""
+    names = {}
+    for m in messages:
+        if m["role"] == "assistant" and isinstance(m["content"], list):
+            for block in m["content"]:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    names[block["id"]] = block["name"]
+    return names
+
+
+def _replace_block(messages: list[dict], i: int, j: int, content: str) -> None:
+    """Swap the content of tool_result j in message i, copying that message first."""
+    blocks = list(messages[i]["content"])
+    blocks[j] = {**blocks[j], "content": content}
+    messages[i] = {**messages[i], "content": blocks}
+
+
+def _shrink(content: str, tool: str, limit: int) -> str:
+    """A consumed tool result cut to about limit tokens, saying what was dropped."""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+    note = f"call {tool} again if the full result is needed"
+    rows = data if isinstance(data, list) else data.get("rows") if isinstance(data, dict) else None
+    if isinstance(rows, list):
+        kept, size = [], 0
+        for row in rows:
+            size += estimate_tokens(row)
+            if kept and size > limit:
+                break
+            kept.append(row)
+        elided = f"showing {len(kept)} of {len(rows)} rows; {note}"
+        if rows is data:
+            return json.dumps({"elided": elided, "rows": kept}, default=str)
+        # An encoded table (result_encoding): keep its header, cut its rows.
+        return json.dumps({**data, "rows": kept, "elided": elided}, default=str)
+    cut = content[:limit * 3]
+    return f"{cut}… [{len(content) - len(cut)} characters elided; {note}]"
+
+
+def _dedupe(messages: list[dict]) -> None:
+    """Replace earlier copies of an identical tool result with a reference to the latest."""
+    latest: dict[str, str] = {}
+    for i, j, block in reversed(_tool_results(messages)):
+        content = block.get("content")
+        if not isinstance(content, str) or len(content) < _DEDUP_MIN_CHARS:
+            continue
+        if content in latest:
+            _replace_block(messages, i, j, f"[identical to the later result for tool_use_id {latest[content]}]")
+        else:
+            latest[content] = block["tool_use_id"]
+
+
+def _shrink_consumed(messages: list[dict], budget: int, limit: int) -> int:
+    """Cut consumed tool results, oldest first, until under budget; return the new estimate."""
+    total = estimate_messages(messages)
+    last_assistant = max((i for i, m in enumerate(messages) if m["role"] == "assistant"), default=-1)
+    names = _tool_names(messages)
+    for i, j, block in _tool_results(messages):
+        if total <= budget:
+            break
+        content = block.get("content")
+        if i > last_assistant or not isinstance(content, str):
+            continue   # not read by the model yet
+        before = estimate_tokens(content)
+        if before <= limit * 2:
+            continue
+        short = _shrink(content, names.get(block["tool_use_id"], "the tool"), limit)
+        _replace_block(messages, i, j, short)
+        total += estimate_tokens(short) - before
+    return total
+
+
+def _turn_starts(messages: list[dict]) -> list[int]:
+    """Indexes of the user messages that start a turn (text, not tool results)."""
+    return [i for i, m in enumerate(messages)
+            if m["role"] == "user" and not _is_tool_results(m["content"])]
+
+
+def _is_tool_results(content: Any) -> bool:
+    return isinstance(content, list) and any(
+        isinstance(b, dict) and b.get("type") == "tool_result" for b in content)
+
+
+def _drop_old_turns(messages: list[dict], budget: int) -> list[dict]:
+    """Drop whole turns from the front until under budget, keeping the current turn."""
+    starts = _turn_starts(messages)
+    dropped = 0
+    while len(starts) > dropped + 1 and estimate_messages(messages[starts[dropped]:]) > budget:
+        dropped += 1
+    if not dropped:
+        return messages
+    kept = messages[starts[dropped]:]
+    note = f"[{dropped} earlier turn{'s' if dropped > 1 else ''} omitted to save context]"
+    first = kept[0]
+    if isinstance(first["content"], str):
+        content: Any = f"{note}\n\n{first['content']}"
+    else:
+        content = [{"type": "text", "text": note}, *first["content"]]
+    return [{**first, "content": content}, *kept[1:]]
+
+
+def compact(messages: list[dict], budget: int | None = DEFAULT_BUDGET,
+            result_tokens: int = RESULT_TOKENS) -> list[dict]:
+    """Copy of messages that fits budget estimated tokens (None: dedupe only).
+
+    See the module docstring for the stages.  The result can still exceed
+    budget if the current turn alone does.
+    """
+    out = list(messages)
+    _dedupe(out)
+    if budget is None or estimate_messages(out) <= budget:
+        return out
+    if _shrink_consumed(out, budget, result_tokens) <= budget:
+        return out
+    return _drop_old_turns(out, budget)
@@ -43,6 +43,21 @@ def _write_startup_log(content: str) -> None:
         pass
 
 
+def _setup_tool_log() -> None:
+    """Send slow tool calls and tool exceptions (see tools.py) to tools.log.  Never raises."""
+    try:
+        import logging
+        log_path = _log_dir() / 'tools.log'
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(log_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        logger = logging.getLogger('gametools')
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+    except Exception:
+        pass
+
+
 # ── Executable-directory detection ────────────────────────────────────────────
 
 def _exe_dir() -> Path:
@@ -136,7 +151,10 @@ def main() -> None:
         _write_startup_log(msg)
         sys.exit(1)
 
-    server.configure(ui_dir=ui_dir, db_path=db_path, rag_dir=rag_dir)
+    # Answers to repeated first-turn questions persist next to the startup log.
+    server.configure(ui_dir=ui_dir, db_path=db_path, rag_dir=rag_dir,
+                     answer_cache_path=_log_dir() / 'answer_cache.sqlite3')
+    _setup_tool_log()
 
     port = _free_port()
     url  = f"http://127.0.0.1:{port}"
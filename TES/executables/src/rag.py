@@ -0,0 +1,144 @@
+"""Local retrieval over the RAG rules documents.
+
+Each markdown file is split into sections at its headings and indexed with
+BM25 in memory.  claude_client asks the index for the sections that best
+match the current question, restricted to the games in play, instead of
+sending every document on every request.
+
+Sections are tagged with the game named by their file's prefix
+(morrowind_*, oblivion_*, skyrim_*); tes_* files cover all games and are
+never filtered out.
+
+Some sections tell the assistant what to do rather than describe the game
+("ask whether they have the patch", "always disclose the quality number").
+They must apply whatever the question's wording, so they are not left to
+ranking: every tes_* section and every section marked with an
+``<!-- rag: always -->`` line is "always", returned by always() for the
+games in play and never by search().
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+GAMES = ("Morrowind", "Oblivion", "Skyrim")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^(#{1,3})\s+(.*\S)\s*$")
+ALWAYS_MARKER = "<!-- rag: always -->"
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in into is it its "
+    "me my of on or so than that the their them then there these this to was what "
+    "when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens without stopwords; a plural 's' is dropped."""
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if tok in _STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+@dataclass
+class Section:
+    doc: str            # file stem, e.g. "skyrim_smithing"
+    game: str | None    # "Morrowind" | "Oblivion" | "Skyrim", or None for all games
+    title: str          # heading path, e.g. "Skyrim Smithing — Rules and Mechanics > Quality Levels"
+    text: str           # the section's markdown, heading line included
+    always: bool = False  # sent with every question instead of retrieved
+
+
+def split_sections(doc: str, markdown: str) -> list[Section]:
+    """Split one document at its #, ## and ### headings (not inside code fences)."""
+    prefix = doc.split("_", 1)[0].capitalize()
+    game = prefix if prefix in GAMES else None
+    sections: list[Section] = []
+    path: list[str] = []
+    lines: list[str] = []
+    in_fence = False
+
+    def flush() -> None:
+        marked = ALWAYS_MARKER in lines
+        body = "\n".join(lines).replace(f"\n\n{ALWAYS_MARKER}\n", "\n").strip()
+        if body:
+            sections.append(Section(doc, game, " > ".join(path) or doc, body, game is None or marked))
+
+    for line in markdown.splitlines():
+        if line.startswith("```"):
+            in_fence = not in_fence
+        m = None if in_fence else _HEADING_RE.match(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            path[level - 1:] = [m.group(2)]
+            lines = [line]
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def _in_play(section: Section, games: set[str] | None) -> bool:
+    return games is None or section.game is None or section.game in games
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of sections."""
+
+    def __init__(self, sections: list[Section], k1: float = 1.5, b: float = 0.75):
+        self.sections = sections
+        self.k1 = k1
+        self.b = b
+        # The heading path counts as part of the text, so "soul gem" finds a
+        # "Soul Gems" section even where the body says "gem".
+        self._tf = [Counter(tokenize(f"{s.title}\n{s.text}")) for s in sections]
+        self._len = [sum(tf.values()) for tf in self._tf]
+        self._avg_len = sum(self._len) / len(self._len) if sections else 0.0
+        df = Counter(tok for tf in self._tf for tok in tf)
+        n = len(sections)
+        self._idf = {tok: math.log(1 + (n - d + 0.5) / (d + 0.5)) for tok, d in df.items()}
+
+    @classmethod
+    def from_dir(cls, rag_dir: Path) -> "BM25Index":
+        sections = []
+        for md_file in sorted(rag_dir.glob("*.md")):
+            sections += split_sections(md_file.stem, md_file.read_text(encoding="utf-8"))
+        return cls(sections)
+
+    def score(self, i: int, query_tokens: list[str]) -> float:
+        tf, norm = self._tf[i], self.k1 * (1 - self.b + self.b * self._len[i] / self._avg_len)
+        total = 0.0
+        for tok in query_tokens:
+            f = tf.get(tok)
+            if f:
+                total += self._idf[tok] * f * (self.k1 + 1) / (f + norm)
+        return total
+
+    def always(self, games: set[str] | None = None) -> list[Section]:
+        """The always sections of those games plus the all-games documents, in file order."""
+        return [s for s in self.sections if s.always and _in_play(s, games)]
+
+    def search(self, query: str, games: set[str] | None = None, k: int = 8) -> list[Section]:
+        """The k best-scoring sections for query, best first.
+
+        games restricts results to sections of those games plus the all-games
+        documents; None searches everything.  Always sections and sections
+        that share no term with the query are never returned.
+        """
+        query_tokens = tokenize(query)
+        scored = []
+        for i, s in enumerate(self.sections):
+            if s.always or not _in_play(s, games):
+                continue
+            score = self.score(i, query_tokens)
+            if score > 0:
+                scored.append((score, i))
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        return [self.sections[i] for _, i in scored[:k]]
@@ -0,0 +1,161 @@
+"""Compact encoding of tool results sent back to the model.
+
+Most tools return lists of row dicts, and json.dumps repeats every key on
+every row.  encode_result() rewrites each such list as a table:
+
+    {"row_count": 2,
+     "same_for_all_rows": {"material_perk": "Steel Smithing"},
+     "flag_columns": ["head", "hands", "ring"],
+     "columns": ["enchantment", "base_cost", "flags"],
+     "rows": [["Fortify Alchemy", 167, "head,hands,ring"], ...]}
+
+- columns that are null in every row are left out
+- columns with one value in every row (0, false, a shared material…) are
+  given once in same_for_all_rows
+- when two or more columns hold only 0/1 (slot flags, one-ingot material
+  counts), they are folded into one "flags" column naming those that are 1
+- likewise, integer columns that are zero in most rows (material counts) are
+  folded into one "counts" column of name:value pairs for the nonzero ones
+
+The result is cut to max_chars by dropping rows from the end of the largest
+tables; a cut table carries rows_shown next to row_count, and the result
+gets a hint asking the model to narrow the query.  The encoding loses
+nothing else, so the model reads the same facts in fewer tokens.
+"""
+import json
+from typing import Any
+
+MAX_RESULT_CHARS = 20_000
+
+HINT = ("Result truncated to fit; narrow the query (a more specific name, "
+        "game, slot or filter) to see the remaining rows.")
+
+_META_CHARS = 60    # room for the truncated/rows_shown keys of one table
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(r, dict) for r in value)
+
+
+def _is_flag(value: Any) -> bool:
+    return type(value) in (int, bool) and value in (0, 1)
+
+
+def _is_sparse(values: list) -> bool:
+    """Integers only, zero in at least half the rows."""
+    return (all(type(v) is int for v in values)
+            and sum(v == 0 for v in values) * 2 >= len(values))
+
+
+def _same(values: list) -> bool:
+    first = values[0]
+    return all(v == first and type(v) is type(first) for v in values)
+
+
+def encode_table(rows: list[dict]) -> dict:
+    """One list of row dicts as a header-plus-row-arrays table."""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    constant: dict = {}
+    flags: list[str] = []
+    counts: list[str] = []
+    kept: list[str] = []
+    for col in columns:
+        values = [row.get(col) for row in rows]
+        if all(v is None for v in values):
+            continue
+        if len(rows) > 1 and _same(values):
+            constant[col] = _encode(values[0])
+        elif all(_is_flag(v) for v in values):
+            flags.append(col)
+        elif _is_sparse(values):
+            counts.append(col)
+        else:
+            kept.append(col)
+    # A fold only pays off for two or more columns.
+    if len(flags) < 2:
+        kept += flags
+        flags = []
+    if len(counts) < 2:
+        kept += counts
+        counts = []
+    kept.sort(key=columns.index)
+
+    table: dict = {"row_count": len(rows)}
+    if constant:
+        table["same_for_all_rows"] = constant
+    if flags:
+        table["flag_columns"] = flags
+    if counts:
+        table["count_columns"] = counts
+    table["columns"] = kept + (["flags"] if flags else []) + (["counts"] if counts else [])
+    table["rows"] = [
+        [_encode(row.get(col)) for col in kept]
+        + ([",".join(f for f in flags if row.get(f))] if flags else [])
+        + ([",".join(f"{c}:{row[c]}" for c in counts if row.get(c))] if counts else [])
+        for row in rows
+    ]
+    return table
+
+
+def _encode(value: Any) -> Any:
+    if _is_table(value):
+        return encode_table(value)
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _tables(value: Any) -> list[dict]:
+    """Every encoded table inside value, outermost first."""
+    found = []
+    if isinstance(value, dict):
+        if "row_count" in value and isinstance(value.get("rows"), list):
+            found.append(value)
+        for v in value.values():
+            found += _tables(v)
+    elif isinstance(value, list):
+        for v in value:
+            found += _tables(v)
+    return found
+
+
+def _cut(encoded: Any, max_chars: int) -> bool:
+    """Drop rows from the largest tables until encoded fits; True if any were dropped."""
+    size = len(_dumps(encoded))
+    cut = False
+    for table in sorted(_tables(encoded), key=lambda t: len(_dumps(t["rows"])), reverse=True):
+        if size <= max_chars:
+            break
+        rows = table["rows"]
+        keep = len(rows)
+        excess = size - max_chars + _META_CHARS + len(HINT)
+        while keep and excess > 0:
+            keep -= 1
+            excess -= len(_dumps(rows[keep])) + 1
+        table["rows"] = rows[:keep]
+        table["rows_shown"] = keep
+        table["truncated"] = True
+        size = len(_dumps(encoded))
+        cut = True
+    return cut
+
+
+def encode_result(result: Any, max_chars: int = MAX_RESULT_CHARS) -> str:
+    """Tool result as compact JSON text of at most about max_chars characters."""
+    encoded = _encode(result)
+    if len(_dumps(encoded)) > max_chars and _cut(encoded, max_chars):
+        if isinstance(encoded, dict):
+            encoded["hint"] = HINT
+        else:
+            encoded = {"result": encoded, "hint": HINT}
+    text = _dumps(encoded)
+    if len(text) > max_chars:
+        # Nothing left to drop row by row (one huge value): cut the text itself.
+        text = _dumps({"partial_result": text[:max_chars], "hint": HINT})
+    return text
@@ -2,21 +2,28 @@
 
 Serves the browser UI and provides REST endpoints for:
   POST /api/chat          — send a message, get a response
+  POST /api/chat/stream   — same, streamed as Server-Sent Events while it runs
+                            (first-turn questions may be answered from the
+                            answer cache; see answer_cache.py)
   GET/POST /api/settings  — manage API key and preferences
   GET /api/status         — health check / configuration status
+  GET /api/metrics        — tool and answer-cache metrics, Prometheus text format
 """
 import json
 import mimetypes
 import os
+import sqlite3
 import sys
 import traceback
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
+import answer_cache
 import claude_client
 import credentials
 import tools as _tools
@@ -25,15 +32,38 @@ app = FastAPI(title="GameTools TES", docs_url=None, redoc_url=None)
 
 _UI_DIR: Path | None = None
 
+# None disables answer caching (tests, load runs).
+_ANSWER_CACHE: answer_cache.AnswerCache | None = None
+
 VALID_CONTEXTS = ["All Games", "Morrowind", "Oblivion", "Skyrim"]
 
 
-def configure(ui_dir: Path, db_path: Path, rag_dir: Path) -> None:
-    """Called by main.py before starting uvicorn."""
-    global _UI_DIR
+def configure(
+    ui_dir: Path,
+    db_path: Path,
+    rag_dir: Path,
+    api_base_url: str | None = None,
+    answer_cache_path: Path | None = None,
+) -> None:
+    """Called by main.py before starting uvicorn.
+
+    api_base_url: see claude_client.set_base_url.  answer_cache_path: SQLite
+    file that enables and persists the answer cache; None leaves it off.
+    """
+    global _UI_DIR, _ANSWER_CACHE
     _UI_DIR = ui_dir
     _tools.DB_PATH = db_path
+    _tools.refresh_tools()
     claude_client.set_rag_dir(rag_dir)
+    claude_client.set_base_url(api_base_url)
+    if _ANSWER_CACHE is not None:
+        _ANSWER_CACHE.close()
+        _ANSWER_CACHE = None
+    if answer_cache_path is not None:
+        try:
+            _ANSWER_CACHE = answer_cache.AnswerCache(answer_cache_path)
+        except (OSError, sqlite3.Error):
+            _log_request_error("CONFIGURE", str(answer_cache_path), traceback.format_exc())
 
 
 # ── Request error logging ─────────────────────────────────────────────────────
@@ -78,6 +108,7 @@ class ChatRequest(BaseModel):
     messages: list[dict]          # full conversation history in Anthropic format
     game_context: str = ""        # "Morrowind" | "Oblivion" | "Skyrim" | ""
     model: str = "claude-sonnet-5-20251101"
+    bypass_cache: bool = False    # ask the model even if a cached answer exists
 
 
 class ChatResponse(BaseModel):
@@ -85,6 +116,8 @@ class ChatResponse(BaseModel):
     tool_calls: list[dict]
     warning: str | None
     error: str | None
+    usage: dict[str, int] = {}    # token totals, incl. cache reads/writes
+    cached: bool = False          # answered from the answer cache, no API call
 
 
 class SettingsGet(BaseModel):
@@ -125,6 +158,22 @@ def get_status() -> StatusResponse:
     )
 
 
+@app.get("/api/metrics")
+def get_metrics() -> Response:
+    text = _tools.render_metrics()
+    if _ANSWER_CACHE is not None:
+        for name, kind, help_text, value in (
+            ("gametools_answer_cache_hits_total", "counter",
+             "Chat questions answered from the answer cache.", _ANSWER_CACHE.hits),
+            ("gametools_answer_cache_misses_total", "counter",
+             "Cacheable chat questions sent to the model.", _ANSWER_CACHE.misses),
+            ("gametools_answer_cache_entries", "gauge",
+             "Answers held in the answer cache.", len(_ANSWER_CACHE)),
+        ):
+            text += f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n{name} {value}\n"
+    return Response(content=text, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/api/settings", response_model=SettingsGet)
 def get_settings() -> SettingsGet:
     return SettingsGet(
@@ -147,23 +196,112 @@ def post_settings(body: SettingsSet) -> dict:
     return {"ok": True, "message": "No changes made."}
 
 
+def _cache_scope(body: ChatRequest) -> tuple[str, str] | None:
+    """(question, db version) if this request may use the answer cache, else None."""
+    if _ANSWER_CACHE is None:
+        return None
+    question = answer_cache.cacheable(body.messages)
+    if question is None:
+        return None
+    return question, answer_cache.db_version(_tools.DB_PATH)
+
+
+def _cache_lookup(body: ChatRequest, scope: tuple[str, str] | None) -> dict | None:
+    """A cached answer in chat() result form, or None on a miss or bypass."""
+    if scope is None or body.bypass_cache:
+        return None
+    hit = _ANSWER_CACHE.get(scope[0], body.game_context, body.model, scope[1])
+    if hit is None:
+        return None
+    return {
+        "response": hit["response"],
+        "tool_calls": hit["tool_calls"],
+        "warning": claude_client._latest_warning(body.messages, body.game_context),
+        "error": None,
+        "usage": {},
+        "cached": True,
+    }
+
+
+def _cache_store(body: ChatRequest, scope: tuple[str, str] | None, result: dict) -> None:
+    """Remember a successful answer (a bypass refreshes the entry)."""
+    if scope is None or result.get("error") or not result.get("response"):
+        return
+    _ANSWER_CACHE.put(scope[0], body.game_context, body.model, scope[1],
+                      result["response"], result["tool_calls"])
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-def post_chat(body: ChatRequest) -> ChatResponse:
-    api_key = credentials.get_api_key()
+async def post_chat(body: ChatRequest) -> ChatResponse:
+    # Async so a chat waiting on the model holds no threadpool worker; the
+    # keyring lookup may block, so it still goes through the threadpool.
+    api_key = await run_in_threadpool(credentials.get_api_key)
     if not api_key:
         raise HTTPException(
             status_code=401,
             detail="API key not configured. Open Settings to add your Anthropic API key.",
         )
-    result = claude_client.chat(
+    # The cache reads and writes SQLite, so it also goes through the threadpool.
+    scope = await run_in_threadpool(_cache_scope, body)
+    cached = await run_in_threadpool(_cache_lookup, body, scope)
+    if cached is not None:
+        return ChatResponse(**cached)
+    result = await claude_client.achat(
         messages=body.messages,
         api_key=api_key,
         game_context=body.game_context,
         model=body.model,
     )
+    await run_in_threadpool(_cache_store, body, scope, result)
     return ChatResponse(**result)
 
 
+def _sse(event: dict) -> str:
+    """Format one claude_client.chat_stream event as a Server-Sent Events frame."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def _stored(body: ChatRequest, scope: tuple[str, str] | None, events: Iterator[dict]) -> Iterator[dict]:
+    """Pass chat_stream events through, caching the answer of the final done event."""
+    for event in events:
+        if event["type"] == "done":
+            _cache_store(body, scope, event)
+        yield event
+
+
+@app.post("/api/chat/stream")
+def post_chat_stream(body: ChatRequest) -> StreamingResponse:
+    # SSE is plain chunked HTTP, so this works with uvicorn's ws="none".  The
+    # generator is synchronous; Starlette iterates it in its thread pool, the
+    # same way the sync routes above run.
+    api_key = credentials.get_api_key()
+    if not api_key:
+        raise HTTPException(
+            status_code=401,
+            detail="API key not configured. Open Settings to add your Anthropic API key.",
+        )
+    scope = _cache_scope(body)
+    cached = _cache_lookup(body, scope)
+    if cached is not None:
+        # Replay the answer as one text event, then done, as a live run would.
+        events = iter(
+            ([{"type": "warning", "warning": cached["warning"]}] if cached["warning"] else [])
+            + [{"type": "text", "text": cached["response"]}, {"type": "done", **cached}]
+        )
+    else:
+        events = _stored(body, scope, claude_client.chat_stream(
+            messages=body.messages,
+            api_key=api_key,
+            game_context=body.game_context,
+            model=body.model,
+        ))
+    return StreamingResponse(
+        (_sse(e) for e in events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ─── Static file serving ─────────────────────────────────────────────────────
 # FileResponse (async streaming) deadlocks on Windows with SelectorEventLoop.
 # These routes run in FastAPI's sync thread pool; synchronous read_bytes() is
@@ -3,15 +3,215 @@
 Mirrors all tools in TES/mcp/tes_mcp_server.py using sqlite3 directly
 (no SQLAlchemy dependency).  Set DB_PATH before calling any tool.
 """
+import json
+import logging
 import math
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+import numpy as np
 
 # Set by main.py / server.py at startup
 DB_PATH: Path | None = None
 
 
+# ─── tool metrics ───────────────────────────────────────────────────────────
+# call_tool runs every tool inside _tool_call(), which records calls,
+# errors, slow calls, wall time, SQL time and query count, rows returned,
+# result bytes and lookup-cache hits/misses per tool.  server.py serves
+# render_metrics() as Prometheus text at GET /api/metrics.
+# Calls slower than GAMETOOLS_SLOW_TOOL_MS (default 250) are logged as
+# warnings on the "gametools.tools" logger, tool exceptions with traceback.
+
+_SLOW_TOOL_MS = float(os.environ.get("GAMETOOLS_SLOW_TOOL_MS", "250"))
+
+_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_log = logging.getLogger("gametools.tools")
+
+
+class _Histogram:
+    """Cumulative-bucket histogram as Prometheus exposes it."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+
+
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    errors: int = 0
+    slow: int = 0
+    sql_queries: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    duration: _Histogram = field(default_factory=lambda: _Histogram(_SECONDS_BUCKETS))
+    sql: _Histogram = field(default_factory=lambda: _Histogram(_SECONDS_BUCKETS))
+    rows: _Histogram = field(default_factory=lambda: _Histogram(_ROWS_BUCKETS))
+    result_bytes: _Histogram = field(default_factory=lambda: _Histogram(_BYTES_BUCKETS))
+
+
+@dataclass
+class _ToolCall:
+    name: str
+    arguments: dict
+    result: Any = None
+    sql_seconds: float = 0.0
+    sql_queries: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+_metrics_lock = threading.Lock()
+_tool_stats: dict[str, _ToolStats] = {}
+_current_call: ContextVar[_ToolCall | None] = ContextVar("gametools_tool_call", default=None)
+
+
+@contextmanager
+def _sql_timed() -> Iterator[None]:
+    """Add the enclosed query's time to the running tool call."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        call = _current_call.get()
+        if call is not None:
+            call.sql_seconds += time.perf_counter() - start
+            call.sql_queries += 1
+
+
+def _cache_hit(cache: dict, key: Any) -> bool:
+    """key in cache, counted as a lookup-cache hit or miss for the running tool call."""
+    hit = key in cache
+    call = _current_call.get()
+    if call is not None:
+        if hit:
+            call.cache_hits += 1
+        else:
+            call.cache_misses += 1
+    return hit
+
+
+def _is_error(result: Any) -> bool:
+    if isinstance(result, list) and result:
+        result = result[0]
+    return isinstance(result, dict) and "error" in result
+
+
+def _row_count(result: Any) -> int:
+    """Rows in a tool result: list length, or the summed lists of a dict result."""
+    if _is_error(result) or result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        lists = [v for v in result.values() if isinstance(v, list)]
+        return sum(len(v) for v in lists) if lists else 1
+    return 1
+
+
+def _args_text(arguments: dict) -> str:
+    return json.dumps(arguments, default=str)[:500]
+
+
+@contextmanager
+def _tool_call(name: str, arguments: dict) -> Iterator[_ToolCall]:
+    """Time one tool call; the caller stores its return value in call.result."""
+    call = _ToolCall(name, arguments)
+    token = _current_call.set(call)
+    failed = False
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        failed = True
+        _log.exception("tool %s raised; arguments=%s", name, _args_text(arguments))
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        _current_call.reset(token)
+        rows = 0 if failed else _row_count(call.result)
+        size = 0 if failed else len(json.dumps(call.result, default=str).encode())
+        slow = wall * 1000 >= _SLOW_TOOL_MS
+        with _metrics_lock:
+            stats = _tool_stats.setdefault(name, _ToolStats())
+            stats.calls += 1
+            stats.errors += failed or _is_error(call.result)
+            stats.slow += slow
+            stats.sql_queries += call.sql_queries
+            stats.cache_hits += call.cache_hits
+            stats.cache_misses += call.cache_misses
+            stats.duration.observe(wall)
+            stats.sql.observe(call.sql_seconds)
+            stats.rows.observe(rows)
+            stats.result_bytes.observe(size)
+        if slow:
+            _log.warning(
+                "slow tool call: %s took %.1f ms (SQL %.1f ms in %d queries, %d rows, %d bytes); arguments=%s",
+                name, wall * 1000, call.sql_seconds * 1000, call.sql_queries, rows, size,
+                _args_text(arguments),
+            )
+
+
+def _metric_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics() -> str:
+    """All tool metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+    with _metrics_lock:
+        tools = sorted(_tool_stats.items())
+        for attr, name, help_text in (
+            ("calls", "gametools_tool_calls_total", "Tool calls."),
+            ("errors", "gametools_tool_errors_total", "Tool calls that raised or returned an error."),
+            ("slow", "gametools_tool_slow_calls_total", f"Tool calls slower than {_SLOW_TOOL_MS:g} ms."),
+            ("sql_queries", "gametools_tool_sql_queries_total", "SQL queries run by tools."),
+            ("cache_hits", "gametools_tool_cache_hits_total", "Tool lookup-cache hits."),
+            ("cache_misses", "gametools_tool_cache_misses_total", "Tool lookup-cache misses."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{tool="{_metric_label(t)}"}} {getattr(s, attr)}' for t, s in tools]
+        for attr, name, help_text in (
+            ("duration", "gametools_tool_duration_seconds", "Tool call wall time."),
+            ("sql", "gametools_tool_sql_seconds", "SQL time per tool call."),
+            ("rows", "gametools_tool_rows", "Rows returned per tool call."),
+            ("result_bytes", "gametools_tool_result_bytes", "JSON size of each tool result."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for t, s in tools:
+                h, t = getattr(s, attr), _metric_label(t)
+                lines += [f'{name}_bucket{{tool="{t}",le="{upper}"}} {count}'
+                          for upper, count in zip(h.buckets, h.counts)]
+                lines += [f'{name}_bucket{{tool="{t}",le="+Inf"}} {h.count}',
+                          f'{name}_sum{{tool="{t}"}} {_metric_number(h.sum)}',
+                          f'{name}_count{{tool="{t}"}} {h.count}']
+    return "\n".join(lines) + "\n"
+
+
 # ─── DB helpers ─────────────────────────────────────────────────────────────
 
 def _conn() -> sqlite3.Connection:
@@ -23,7 +223,7 @@ def _conn() -> sqlite3.Connection:
 
 
 def _query(sql: str, params: dict | None = None) -> list[dict]:
-    with _conn() as conn:
+    with _sql_timed(), _conn() as conn:
         cur = conn.execute(sql, params or {})
         return [dict(r) for r in cur.fetchall()]
 
@@ -39,6 +239,197 @@ def _query_list(sql: str, key: str, values: list, extra_params: dict | None = No
     return _query(expanded, params)
 
 
+def _alchemy_recipes(game: str, effects: list[str], exact: bool, limit: int) -> list[dict]:
+    """Look up materialized recipes in <game>_alchemy_recipes (built by update_tes.py)."""
+    bits_table = f"{game}_alchemy_effect_bits"
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = :t", {"t": bits_table}):
+        return [{"error": f"{game}_alchemy_recipes has not been built — run update_tes.py"}]
+    if not effects:
+        return [{"error": "at least one effect is required"}]
+    bits = {r["effect"]: r["bit"] for r in _query(f"SELECT effect, bit FROM {bits_table}")}
+    by_lower = {e.lower(): e for e in bits}
+    unknown = [e for e in effects if e.lower() not in by_lower]
+    if unknown:
+        return [{"error": f"unknown {game} effect(s): {', '.join(unknown)}"}]
+    wanted = sorted({by_lower[e.lower()] for e in effects})
+    params: dict = {"limit": max(1, int(limit))}
+    if exact:
+        mask = 0
+        for e in wanted:
+            mask |= 1 << bits[e]
+        params["mask"] = format(mask, "x")
+        where = "r.effect_mask = :mask"
+    else:
+        ph = ", ".join(f":e{i}" for i in range(len(wanted)))
+        params.update({f"e{i}": e for i, e in enumerate(wanted)})
+        params["n"] = len(wanted)
+        where = (
+            f"r.recipe_id IN (SELECT recipe_id FROM {game}_alchemy_recipe_effects "
+            f"WHERE effect IN ({ph}) GROUP BY recipe_id HAVING COUNT(*) = :n)"
+        )
+    rows = _query(
+        f"SELECT r.ingredient_1, r.ingredient_2, r.ingredient_3, r.effect_mask "
+        f"FROM {game}_alchemy_recipes r WHERE {where} "
+        f"ORDER BY r.effect_count, (r.ingredient_3 IS NOT NULL), "
+        f"r.ingredient_1, r.ingredient_2, r.ingredient_3 LIMIT :limit",
+        params,
+    )
+    bit_to_effect = {b: e for e, b in bits.items()}
+    out = []
+    for r in rows:
+        mask = int(r["effect_mask"], 16)
+        out.append({
+            "ingredients": [i for i in (r["ingredient_1"], r["ingredient_2"], r["ingredient_3"]) if i],
+            "effects": sorted(bit_to_effect[b] for b in range(mask.bit_length()) if mask >> b & 1),
+        })
+    return out
+
+
+_soul_gem_cache: dict = {}
+# Soul gems that survive use; Azura's Star exists in all three games.
+_REUSABLE_SOUL_GEMS = {"Azura's Star", "The Black Star"}
+# skyrim_enchant_soulgems.trappable_souls of gems that only recharge items and
+# never hold a soul (Wylandriah's Soul Gem).
+_SK_RECHARGE_ONLY = "%can only be used for recharging%"
+# Souls that only gems accepting humanoid souls can hold.
+_BLACK_SOULS = {
+    'skyrim': {'NPC'},
+    'oblivion': {'NPC(any race)', 'Vampire', 'Dremora'},
+    'morrowind': set(),
+}
+
+
+def _soul_gem_types(game: str) -> tuple[list[dict], np.ndarray]:
+    """Gem types sorted by (capacity, holds black souls, reusable) plus the capacity array."""
+    key = (str(DB_PATH), game)
+    if not _cache_hit(_soul_gem_cache, key):
+        if game == 'skyrim':
+            rows = _query(
+                "SELECT name, capacity, trappable_souls FROM skyrim_enchant_soulgems "
+                "WHERE capacity > 0 AND trappable_souls NOT LIKE :p", {"p": _SK_RECHARGE_ONLY}
+            )
+            gems = [
+                {"gem": r['name'], "capacity": r['capacity'],
+                 "black": 'humanoids' in r['trappable_souls'] and 'excluding' not in r['trappable_souls']}
+                for r in rows
+            ]
+        elif game == 'oblivion':
+            # oblivion_enchant_soul_gems has no capacity column; gems hold their soul level's power.
+            gems = [{"gem": f"{n} Soul Gem", "capacity": p, "black": False}
+                    for n, p in zip(_OB_SOUL_NAMES, _OB_SOUL_POWER)]
+            gems += [{"gem": "Black Soul Gem", "capacity": _OB_SOUL_POWER[-1], "black": True},
+                     {"gem": "Azura's Star", "capacity": _OB_SOUL_POWER[-1], "black": False}]
+        else:
+            rows = _query("SELECT Name AS name, Capacity AS capacity FROM morrowind_enchant_soul_gems")
+            gems = [{"gem": r['name'], "capacity": r['capacity'], "black": False} for r in rows]
+        for g in gems:
+            g['reusable'] = g['gem'] in _REUSABLE_SOUL_GEMS
+        gems.sort(key=lambda g: (g['capacity'], g['black'], g['reusable'], g['gem']))
+        _soul_gem_cache[key] = (gems, np.array([g['capacity'] for g in gems]))
+    return _soul_gem_cache[key]
+
+
+def _soul_gem_allocation(game: str, souls: dict, gems: dict) -> dict:
+    """Assign souls to gems, keeping the most charge and wasting the least capacity.
+
+    Souls are placed largest first (black before white at equal size) into the
+    smallest gem type that can hold them. Among equal capacities, gems that cannot
+    hold black souls go first, then consumable gems. Which gems fit a soul only
+    grows as the soul shrinks, so serving the most constrained soul with the
+    tightest fit is optimal. Souls and gems are handled as counts, so hundreds of
+    souls cost no more than a handful.
+    """
+    negative = [f"{k}: {n}" for k, n in (*souls.items(), *gems.items()) if int(n) < 0]
+    if negative:
+        return {"error": f"Soul and gem counts cannot be negative ({', '.join(negative)})"}
+    souls = {k: n for k, n in souls.items() if int(n)}
+    types, caps = _soul_gem_types(game)
+    by_gem = {g['gem'].lower(): i for i, g in enumerate(types)}
+    unknown = [name for name in gems if name.strip().lower() not in by_gem]
+    if unknown and game == 'skyrim':
+        recharge_only = {r['name'].lower() for r in _query(
+            "SELECT name FROM skyrim_enchant_soulgems WHERE trappable_souls LIKE :p", {"p": _SK_RECHARGE_ONLY})}
+        cannot_trap = [name for name in unknown if name.strip().lower() in recharge_only]
+        if cannot_trap:
+            return {"error": f"Soul gem(s) that only recharge items and cannot trap souls: {', '.join(cannot_trap)}"}
+    if unknown:
+        return {"error": f"Unknown {game} soul gem(s): {', '.join(unknown)}; "
+                         f"expected one of: {', '.join(g['gem'] for g in types)}"}
+    stock = np.zeros(len(types), dtype=np.int64)
+    for name, n in gems.items():
+        stock[by_gem[name.strip().lower()]] += int(n)
+    owned = stock > 0
+
+    sizes: dict[str, list[tuple[str, int]]] = {}
+    for r in _query(f"SELECT name, soul_size FROM {game}_enchant_souls"):
+        sizes.setdefault(r['name'].lower(), []).append((r['name'], r['soul_size']))
+    groups, missing = [], []
+    for key, n in souls.items():
+        k = key.strip()
+        if k.isdigit():
+            groups.append({"soul": f"soul {k}", "size": int(k), "black": False, "count": int(n)})
+            continue
+        # "Grizzly Bear (100)" picks one of several same-named table rows.
+        name, want = k, None
+        if k.endswith(')') and ' (' in k and k[:-1].rpartition(' (')[2].isdigit():
+            name, _, size = k[:-1].rpartition(' (')
+            want = int(size)
+        found = [f for f in sizes.get(name.lower(), []) if want is None or f[1] == want]
+        if not found:
+            missing.append(key)
+            continue
+        if len({s for _, s in found}) > 1:
+            return {"error": f"{found[0][0]} has several soul sizes "
+                             f"({', '.join(str(s) for _, s in sorted(found, key=lambda f: f[1]))}); "
+                             f"pass e.g. \"{found[0][0]} ({found[0][1]})\""}
+        soul, size = found[0]
+        groups.append({"soul": soul if want is None else f"{soul} ({size})", "size": size,
+                       "black": soul in _BLACK_SOULS[game], "count": int(n)})
+    if missing:
+        return {"error": f"Unknown {game} soul(s): {', '.join(missing)}"}
+
+    assignments, unassigned = [], []
+    for grp in sorted(groups, key=lambda g: (-g['size'], not g['black'], g['soul'])):
+        left = grp['count']
+        fits = False
+        for i in range(int(np.searchsorted(caps, grp['size'])), len(types)):
+            if grp['black'] and not types[i]['black']:
+                continue
+            fits = fits or bool(owned[i])
+            take = int(min(left, stock[i]))
+            if take:
+                stock[i] -= take
+                left -= take
+                assignments.append({
+                    "soul": grp['soul'], "soul_size": grp['size'], "gem": types[i]['gem'],
+                    "count": take, "capacity": int(caps[i]), "waste_each": int(caps[i]) - grp['size'],
+                    "reusable": types[i]['reusable'],
+                })
+            if not left:
+                break
+        if left:
+            if fits:
+                reason = "all fitting gems used"
+            elif grp['black']:
+                reason = "black soul: no gem that holds humanoid souls"
+            else:
+                reason = "no gem large enough"
+            unassigned.append({"soul": grp['soul'], "soul_size": grp['size'], "count": left, "reason": reason})
+
+    result = {
+        "game": game,
+        "assignments": assignments,
+        "total_charge": sum(a['soul_size'] * a['count'] for a in assignments),
+        "total_waste": sum(a['waste_each'] * a['count'] for a in assignments),
+        "unused_gems": {types[i]['gem']: int(n) for i, n in enumerate(stock) if n},
+    }
+    if game == 'morrowind':
+        result["ce_eligible"] = sum(a['count'] for a in assignments if a['soul_size'] >= _MW_CE_MIN_SOUL)
+    if unassigned:
+        result["unassigned"] = unassigned
+    return result
+
+
 # ─── utility ────────────────────────────────────────────────────────────────
 
 def list_tables() -> list[str]:
@@ -46,6 +437,56 @@ def list_tables() -> list[str]:
     return [r['name'] for r in rows]
 
 
+def _effect_norm(name: str) -> str:
+    name = name.split('(')[0].replace('&', ' and ').lower()
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in name).split())
+
+
+def tes_effect_equivalents(effect: str, game: str | None = None) -> dict:
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = 'tes_effect_graph'"):
+        return {"error": "tes_effect_graph has not been built — run update_tes.py"}
+    params = {"alias": _effect_norm(effect)}
+    where = "a.alias = :alias"
+    if game:
+        params["game"] = game.lower()
+        where += " AND g.game = :game"
+    rows = _query(
+        "SELECT g.family, g.game, g.effect, g.kind, g.code, g.qualifier "
+        "FROM tes_effect_aliases a JOIN tes_effect_graph g ON g.family = a.family "
+        f"WHERE {where} ORDER BY g.family, g.game, g.kind, g.effect, g.qualifier",
+        params,
+    )
+    if not rows:
+        return {"error": f"no cross-game equivalent found for '{effect}'"}
+    families: dict = {}
+    for r in rows:
+        games = families.setdefault(r["family"], {})
+        games.setdefault(r["game"], []).append(
+            {"effect": r["effect"], "kind": r["kind"], "code": r["code"], "qualifier": r["qualifier"]})
+    return {"effect": effect,
+            "matches": [{"family": f, "games": g} for f, g in families.items()]}
+
+
+_EFFECT_PROFILE_GAMES = ('morrowind', 'oblivion', 'skyrim')
+_EFFECT_PROFILE_COLUMNS = ('ingredients', 'base', 'enchant_slots', 'disenchant', 'perks', 'sigil_stones')
+
+
+def effect_profile(game: str, effect: str) -> dict:
+    game = game.lower()
+    if game not in _EFFECT_PROFILE_GAMES:
+        return {"error": f"Unknown game '{game}'. Choose from: {', '.join(_EFFECT_PROFILE_GAMES)}"}
+    table = f"{game}_effect_profile"
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = :t", {"t": table}):
+        return {"error": f"{table} has not been built — run update_tes.py"}
+    rows = _query(f"SELECT * FROM {table} WHERE effect_key = :key", {"key": _effect_norm(effect)})
+    if not rows:
+        return {"error": f"No {game} effect named '{effect}'"}
+    out = {"game": game, "effect": rows[0]["effect"]}
+    for col in _EFFECT_PROFILE_COLUMNS:
+        out[col] = None if rows[0][col] is None else json.loads(rows[0][col])
+    return out
+
+
 # ─── Skyrim alchemy ─────────────────────────────────────────────────────────
 
 def skyrim_alchemy_ingredient(name: str) -> dict | None:
@@ -112,6 +553,10 @@ def skyrim_alchemy_perks() -> list[dict]:
     )
 
 
+def skyrim_alchemy_recipes(effects: list[str], exact: bool = True, limit: int = 50) -> list[dict]:
+    return _alchemy_recipes('skyrim', effects, exact, limit)
+
+
 # ─── Oblivion alchemy ───────────────────────────────────────────────────────
 
 def oblivion_alchemy_ingredient(name: str) -> dict | None:
@@ -186,6 +631,42 @@ def oblivion_alchemy_apparatus(apparatus_type: str | None = None) -> list[dict]:
     )
 
 
+def oblivion_alchemy_recipes(effects: list[str], exact: bool = True, limit: int = 50) -> list[dict]:
+    return _alchemy_recipes('oblivion', effects, exact, limit)
+
+
+_OB_POTION_TIERS = ('Novice', 'Apprentice', 'Journeyman', 'Expert', 'Master')
+
+
+def oblivion_potion_strength(
+    effect: str,
+    apparatus_tier: str | None = None,
+    mastery: str | None = None,
+) -> list[dict]:
+    for label, val in (("apparatus_tier", apparatus_tier), ("mastery", mastery)):
+        if val and val.title() not in _OB_POTION_TIERS:
+            return [{"error": f"Unknown {label} '{val}'. Choose from: {', '.join(_OB_POTION_TIERS)}"}]
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = 'oblivion_potion_strength'"):
+        return [{"error": "oblivion_potion_strength has not been built — run update_tes.py"}]
+    where = ["LOWER(effect) = LOWER(:effect)"]
+    params: dict = {"effect": effect}
+    if apparatus_tier:
+        where.append("apparatus_tier = :tier")
+        params["tier"] = apparatus_tier.title()
+    if mastery:
+        where.append("mastery = :mastery")
+        params["mastery"] = mastery.title()
+    rows = _query(
+        "SELECT effect, apparatus_tier, mastery, effective_alchemy, kind, magnitude, duration, price "
+        f"FROM oblivion_potion_strength WHERE {' AND '.join(where)}",
+        params,
+    )
+    if not rows:
+        return [{"error": f"No Oblivion alchemy effect named '{effect}'"}]
+    rank = {t: i for i, t in enumerate(_OB_POTION_TIERS)}
+    return sorted(rows, key=lambda r: (rank[r["apparatus_tier"]], r["effective_alchemy"]))
+
+
 # ─── Morrowind alchemy ──────────────────────────────────────────────────────
 
 def morrowind_alchemy_ingredient(name: str) -> dict | None:
@@ -260,6 +741,161 @@ def morrowind_alchemy_apparatus(apparatus_type: str | None = None) -> list[dict]
     )
 
 
+def morrowind_alchemy_recipes(effects: list[str], exact: bool = True, limit: int = 50) -> list[dict]:
+    return _alchemy_recipes('morrowind', effects, exact, limit)
+
+
+# Alchemy-enchant loop (morrowind_enchanting.md). Potion strength uses current
+# (fortified) Intelligence, so each batch of Fortify Intelligence potions makes
+# the next one stronger, and the raised Intelligence makes a larger Constant
+# Effect self-enchantment safe. Each round brews and drinks a batch, then may
+# enchant one gear piece with Fortify Alchemy or Fortify Intelligence. With the
+# gear fixed, a round is linear in Intelligence, so the limit is closed-form;
+# the iteration applies the game's rounding.
+
+_MW_LOOP_DEFAULTS = {
+    "alchemy": 100, "intelligence": 100, "luck": 50, "enchant": 100, "mortar_quality": 1.5,
+    "retort_quality": 0.0, "calcinator_quality": 0.0, "potions_per_round": 5,
+    "fortified_intelligence": 0, "gear_item": "Exquisite Ring", "gear_slots": 2,
+    "soul_size": 400, "min_success": 100,
+}
+# Self-enchanting at full Fatigue (×1.25) a Constant Effect (×0.5).
+_MW_CE_SUCCESS_MULT = 1.25 * 0.5
+
+
+def _mw_loop_batch(p: dict, cap: np.ndarray, attribute_cost: float, skill_cost: float,
+                   max_iterations: int) -> dict:
+    """Run the loop for every profile at once; p maps profile keys to arrays."""
+    qr, qc = p["retort_quality"], p["calcinator_quality"]
+    adj = np.where((qr > 0) & (qc > 0), qc + 2 * qr, qr + qc)   # positive-effect apparatus
+    scale = p["mortar_quality"] / (3 * attribute_cost)
+    k = p["potions_per_round"]
+    slope = k * scale / 10
+    # A point of Fortify Alchemy gear adds k × scale Intelligence a round, a point
+    # of Fortify Intelligence gear adds 1; both then compound by 1 / (1 − slope).
+    alchemy_gear = k * scale > 1
+    gear_cost = np.where(alchemy_gear, skill_cost, attribute_cost)
+    base = p["intelligence"] + p["fortified_intelligence"]
+    gear_alch, gear_int, pieces = np.zeros_like(base), np.zeros_like(base), np.zeros_like(base)
+    intel = base.copy()
+    prev_mag = np.zeros_like(base)
+    steps = []
+    converged_at = np.zeros(base.shape, dtype=int)
+    for i in range(1, max_iterations + 1):
+        s = np.floor((p["alchemy"] + gear_alch + intel / 10 + p["luck"] / 10) * scale + adj + 0.5)
+        new_intel = base + gear_int + k * s
+        # Largest CE magnitude whose cost (5 × base cost per point) fits the item and
+        # the soul and whose success chance reaches min_success at this Intelligence.
+        safe = np.floor((p["enchant"] + new_intel / 5 + p["luck"] / 10
+                         - p["min_success"] / _MW_CE_SUCCESS_MULT) / 3)
+        points = np.minimum(cap, safe)
+        mag = np.maximum(0, np.ceil((points + 1 - 0.025 * gear_cost) / (5 * gear_cost)) - 1)
+        # Enchant once the magnitude is as large as it will get: capped by the item,
+        # or no larger than last round's.
+        full = mag == np.ceil((cap + 1 - 0.025 * gear_cost) / (5 * gear_cost)) - 1
+        enchant = (pieces < p["gear_slots"]) & (mag >= 1) & (full | (mag <= prev_mag))
+        placed = np.where(enchant, mag, 0)
+        prev_mag = mag
+        gear_alch = gear_alch + np.where(alchemy_gear, placed, 0)
+        gear_int = gear_int + np.where(alchemy_gear, 0, placed)
+        new_intel = new_intel + np.where(alchemy_gear, 0, placed)
+        pieces = pieces + enchant
+        steps.append((s, new_intel, placed))
+        stable = (new_intel == intel) & ~enchant
+        converged_at = np.where((converged_at == 0) & stable, max(1, i - 1), converged_at)
+        intel = new_intel
+        if (converged_at > 0).all():
+            break
+
+    # With the gear so far: I = base + gear_int + k × ((A + gear_alch + L/10) × scale + adj) + slope × I
+    with np.errstate(divide="ignore"):
+        analytic = np.where(
+            slope < 1,
+            (base + gear_int + k * ((p["alchemy"] + gear_alch + p["luck"] / 10) * scale + adj)) / (1 - slope),
+            np.inf,
+        )
+    return {"steps": steps, "converged_at": converged_at, "analytic": analytic, "slope": slope,
+            "alchemy_gear": alchemy_gear, "gear_alchemy": gear_alch, "gear_intelligence": gear_int,
+            "pieces": pieces}
+
+
+def morrowind_alchemy_enchant_loop(profiles: list[dict], max_iterations: int = 20) -> dict:
+    if not profiles:
+        return {"error": "at least one profile is required"}
+    unknown = sorted({k for pr in profiles for k in pr} - set(_MW_LOOP_DEFAULTS))
+    if unknown:
+        return {"error": f"Unknown profile key(s): {', '.join(unknown)}. "
+                         f"Valid keys: {', '.join(_MW_LOOP_DEFAULTS)}"}
+    filled = [{**_MW_LOOP_DEFAULTS, **pr} for pr in profiles]
+    p = {k: np.array([pr[k] for pr in filled], dtype=float)
+         for k in _MW_LOOP_DEFAULTS if k != "gear_item"}
+    if (p["mortar_quality"] <= 0).any():
+        return {"error": "mortar_quality must be positive (a Mortar and Pestle is required)"}
+    if (p["gear_slots"] < 0).any():
+        return {"error": "gear_slots cannot be negative"}
+    if ((p["soul_size"] < _MW_CE_MIN_SOUL) & (p["gear_slots"] > 0)).any():
+        return {"error": f"Constant Effect needs a soul of at least {_MW_CE_MIN_SOUL}"}
+
+    capacity = {}
+    for item in {pr["gear_item"] for pr in filled}:
+        rows = _query(
+            " UNION ALL ".join(f"SELECT CAST(Enchantment AS REAL)/10 AS enchant_pts FROM {t} "
+                               f"WHERE LOWER(Name) = LOWER(:n)" for t in _MW_ITEM_TABLES.values()),
+            {"n": item},
+        )
+        if not rows:
+            return {"error": f"Unknown Morrowind item '{item}'; look it up with morrowind_enchant_item"}
+        capacity[item] = max(r["enchant_pts"] for r in rows)
+    cap = np.minimum([capacity[pr["gear_item"]] for pr in filled], p["soul_size"])
+
+    base_costs = {r["name"]: float(r["base_cost"]) for r in _query(
+        "SELECT Name AS name, [Base Cost] AS base_cost FROM morrowind_enchant_magic_effects "
+        "WHERE Name IN ('Fortify Attribute', 'Fortify Skill')"
+    )}
+    attribute_cost = base_costs.get("Fortify Attribute", 1.0)
+    skill_cost = base_costs.get("Fortify Skill", 1.0)
+    out = _mw_loop_batch(p, cap, attribute_cost, skill_cost, max(1, max_iterations))
+    gear_effects = np.where(out["alchemy_gear"], "Fortify Alchemy", "Fortify Intelligence")
+    gear_total = out["gear_alchemy"] + out["gear_intelligence"]
+
+    def _num(v):
+        return None if np.isinf(v) else round(float(v), 2)
+
+    s_last, intel_last, _ = out["steps"][-1]
+    if len(filled) > 1:
+        keys = list(_MW_LOOP_DEFAULTS)
+        return {
+            "columns": keys + ["gear_effect", "gear_pieces", "gear_magnitude", "potion_strength",
+                               "intelligence_after", "converged_at", "growth_per_round",
+                               "analytic_limit"],
+            "rows": [
+                [pr[key] for key in keys]
+                + [str(gear_effects[i]), int(out["pieces"][i]), int(gear_total[i]), int(s_last[i]),
+                   int(intel_last[i]), int(out["converged_at"][i]) or None,
+                   round(float(out["slope"][i]), 4), _num(out["analytic"][i])]
+                for i, pr in enumerate(filled)
+            ],
+        }
+    effect = str(gear_effects[0])
+    cost = skill_cost if effect == "Fortify Alchemy" else attribute_cost
+    return {
+        "profile": filled[0],
+        "gear_effect": effect,
+        "item_capacity": float(cap[0]),
+        "iterations": [
+            {"iteration": n, "potion_strength": int(s[0]), "intelligence": int(a[0]),
+             "enchanted": {"magnitude": int(m[0]), "points": int(_mw_effect_cost(cost, m[0], 100, 0, False))}
+             if m[0] else None}
+            for n, (s, a, m) in enumerate(out["steps"], 1)
+        ],
+        "limit": {"potion_strength": int(s_last[0]), "intelligence": int(intel_last[0]),
+                  "gear_pieces": int(out["pieces"][0]), "gear_magnitude": int(gear_total[0])},
+        "converged_at": int(out["converged_at"][0]) or None,
+        "growth_per_round": round(float(out["slope"][0]), 4),
+        "analytic_limit": _num(out["analytic"][0]),
+    }
+
+
 # ─── Morrowind enchanting ───────────────────────────────────────────────────
 
 _MW_SCHOOLS = ('Alteration', 'Conjuration', 'Destruction', 'Illusion', 'Mysticism', 'Restoration')
@@ -317,6 +953,10 @@ def morrowind_enchant_soul_gems() -> list[dict]:
     )
 
 
+def morrowind_soul_gem_allocation(souls: dict, gems: dict) -> dict:
+    return _soul_gem_allocation('morrowind', souls, gems)
+
+
 def morrowind_enchant_item(
     name: str | None = None,
     item_type: str | None = None,
@@ -364,6 +1004,219 @@ def morrowind_enchant_item(
     return _query(sql, params)
 
 
+# Multi-effect enchantment optimizer. Effect costs compound by list position
+# (first of n costs n×), so the cheapest-first order is always optimal for a
+# fixed set of magnitudes. The solver is an exact DP over (effects placed,
+# points used), which covers every order without enumerating permutations.
+
+_MW_ENCHANT_TYPES = {
+    'constant': 'constant', 'ce': 'constant', 'constant effect': 'constant',
+    'cast_when_used': 'cast_when_used', 'cwu': 'cast_when_used', 'cast when used': 'cast_when_used',
+    'cast_when_strikes': 'cast_when_strikes', 'cws': 'cast_when_strikes',
+    'cast when strikes': 'cast_when_strikes',
+}
+_MW_ITEM_TABLES = {
+    'weapon': 'morrowind_enchant_weapons',
+    'armor': 'morrowind_enchant_armor',
+    'clothing': 'morrowind_enchant_clothing',
+}
+_MW_CE_MIN_SOUL = 400
+_MW_OBJECTIVES = ('total', 'balanced', 'min_points')
+
+
+def _mw_effect_cost(base_cost: float, magnitude, duration: int, area: int, target: bool):
+    """Single-effect enchantment points, truncated (broadcasts over magnitude)."""
+    c = np.maximum(1, np.asarray(magnitude) * 0.05 * base_cost * duration
+                   + 0.025 * max(1, area) * base_cost)
+    return np.floor(c * (1.5 if target else 1.0)).astype(int)
+
+
+def _mw_allocate(specs: list[dict], cap: int, objective: str):
+    """Return (value, points, [(spec index, magnitude, cost)] in placement order) or None."""
+    n = len(specs)
+    points = np.arange(cap + 1)
+    start = 0.0 if objective != 'balanced' else np.inf
+    layer = {0: (np.where(points == 0, start, -np.inf), None, None)}
+    store: dict = {}
+    for k in range(n):
+        weight = n - k
+        nxt: dict = {}
+        for used, (best, _, _) in layer.items():
+            for i, sp in enumerate(specs):
+                if used >> i & 1:
+                    continue
+                wc = weight * sp["costs"]
+                idx = points[None, :] - wc[:, None]
+                gathered = np.where(idx >= 0, best[np.clip(idx, 0, None)], -np.inf)
+                if objective == 'balanced':
+                    cand = np.minimum(gathered, sp["values"][:, None])
+                else:
+                    cand = gathered + sp["values"][:, None]
+                m_idx = cand.argmax(axis=0)
+                val = cand[m_idx, points]
+                key = used | 1 << i
+                if key not in nxt:
+                    nxt[key] = (val, np.full(cap + 1, used), m_idx)
+                else:
+                    cur, prev, mi = nxt[key]
+                    better = val > cur
+                    nxt[key] = (np.where(better, val, cur), np.where(better, used, prev),
+                                np.where(better, m_idx, mi))
+        store.update(nxt)
+        layer = nxt
+    final = layer[(1 << n) - 1][0]
+    if not np.isfinite(final).any():
+        return None
+    p = int(np.flatnonzero(final == final.max())[0])   # fewest points among the best
+    value = float(final[p])
+    placed = []
+    key = (1 << n) - 1
+    for k in range(n - 1, -1, -1):
+        _, prev, mi = store[key]
+        used, m_i = int(prev[p]), int(mi[p])
+        i = (key ^ used).bit_length() - 1
+        sp = specs[i]
+        placed.append((i, int(sp["mags"][m_i]), int(sp["costs"][m_i])))
+        p -= (n - k) * int(sp["costs"][m_i])
+        key = used
+    placed.reverse()
+    return value, sum((n - k) * c for k, (_, _, c) in enumerate(placed)), placed
+
+
+def morrowind_enchant_optimize(
+    effects: list[dict],
+    enchant_type: str,
+    item: str | None = None,
+    category: str | None = None,
+    item_type: str | None = None,
+    soul: str | None = None,
+    soul_size: int | None = None,
+    objective: str = 'total',
+) -> dict:
+    etype = _MW_ENCHANT_TYPES.get(enchant_type.strip().lower())
+    if not etype:
+        return {"error": f"Unknown enchant_type '{enchant_type}'. Use constant, cast_when_used, or cast_when_strikes"}
+    if objective not in _MW_OBJECTIVES:
+        return {"error": f"Unknown objective '{objective}'. Choose from: {', '.join(_MW_OBJECTIVES)}"}
+    if not effects or len(effects) > 8:
+        return {"error": "Provide between 1 and 8 effects"}
+    if bool(item) == bool(category):
+        return {"error": "Provide exactly one of item (a named item) or category (weapon, armor, clothing)"}
+
+    # Soul constraint.
+    if soul:
+        souls = _query(
+            "SELECT name, soul_size FROM morrowind_enchant_souls WHERE LOWER(name) = LOWER(:n)",
+            {"n": soul},
+        )
+        sizes = sorted({r["soul_size"] for r in souls})
+        if not sizes:
+            return {"error": f"Unknown Morrowind creature soul '{soul}'"}
+        if len(sizes) > 1:
+            return {"error": f"'{soul}' has several soul sizes ({', '.join(map(str, sizes))}); pass soul_size instead"}
+        soul_size = sizes[0]
+    if etype == 'constant' and soul_size is not None and soul_size < _MW_CE_MIN_SOUL:
+        return {"error": f"Constant Effect needs a soul of at least {_MW_CE_MIN_SOUL}; {soul_size} is too small"}
+
+    # Effect specs with every candidate magnitude and its cost.
+    base_costs = {
+        r["name"].lower(): (r["name"], float(r["base_cost"]))
+        for r in _query("SELECT Name AS name, [Base Cost] AS base_cost FROM morrowind_enchant_magic_effects")
+    }
+    specs = []
+    for e in effects:
+        found = base_costs.get(str(e.get("effect", "")).lower())
+        if not found:
+            return {"error": f"Unknown Morrowind magic effect '{e.get('effect')}'"}
+        rng = str(e.get("range", "touch" if etype == 'cast_when_strikes' else "self")).lower()
+        if rng not in ("self", "touch", "target"):
+            return {"error": f"range must be self, touch, or target (got '{rng}')"}
+        if etype == 'constant' and rng != "self":
+            return {"error": "Constant Effect enchantments may only have Self-range effects"}
+        lo = max(1, int(e.get("min_magnitude", 1)))
+        hi = int(e.get("max_magnitude", lo))
+        if hi < lo:
+            return {"error": f"{found[0]}: max_magnitude is below min_magnitude"}
+        duration = 100 if etype == 'constant' else max(1, int(e.get("duration", 1)))
+        area = int(e.get("area", 0))
+        mags = np.arange(lo, hi + 1)
+        costs = _mw_effect_cost(found[1], mags, duration, area, rng == "target")
+        if objective == 'min_points':
+            mags, costs = mags[:1], costs[:1]
+            values = np.zeros(1)
+        elif objective == 'balanced':
+            values = (mags - lo) / (hi - lo) if hi > lo else np.ones(len(mags))
+        else:
+            values = float(e.get("weight", 1.0)) * mags
+        specs.append({"effect": found[0], "base_cost": found[1], "range": rng, "duration": duration,
+                      "area": area, "mags": mags, "costs": costs, "values": values})
+
+    # Cheapest-first at minimum magnitudes is the least any host must hold.
+    floor_costs = sorted(int(sp["costs"][0]) for sp in specs)
+    n = len(specs)
+    min_points = sum((n - k) * c for k, c in enumerate(floor_costs))
+    if etype != 'constant' and soul_size is not None and min_points > soul_size:
+        return {"error": f"The effects need at least {min_points} points; a {soul_size} soul cannot hold them"}
+
+    # Host item(s).
+    excluded = ['Arrow', 'Bolt'] + (['MarksmanBow', 'MarksmanCrossbow'] if etype == 'cast_when_strikes' else [])
+    tables = (_MW_ITEM_TABLES if item else
+              {category.lower(): _MW_ITEM_TABLES.get(category.lower())})
+    if None in tables.values():
+        return {"error": f"Unknown category '{category}'. Choose from: {', '.join(_MW_ITEM_TABLES)}"}
+    if etype == 'cast_when_strikes' and 'weapon' not in tables:
+        return {"error": "Cast When Strikes can only be placed on weapons"}
+    params: dict = {"minraw": min_points * 10}
+    where = ["CAST(Enchantment AS REAL) >= :minraw"]
+    if item:
+        where.append("LOWER(Name) = LOWER(:item)")
+        params["item"] = item
+    if item_type:
+        where.append("LOWER(Type) LIKE LOWER(:itype)")
+        params["itype"] = f"%{item_type}%"
+    for i, t in enumerate(excluded):
+        where.append(f"Type != :x{i}")
+        params[f"x{i}"] = t
+    sql = " UNION ALL ".join(
+        f"SELECT Name AS name, '{cat}' AS category, Type AS item_type, "
+        f"CAST(Value AS INTEGER) AS value, CAST(Enchantment AS REAL)/10 AS enchant_pts "
+        f"FROM {table} WHERE {' AND '.join(where)}"
+        for cat, table in tables.items()
+        if cat == 'weapon' or etype != 'cast_when_strikes'
+    )
+    # Value-0 items are unique or quest items that cannot be bought: last resort only.
+    hosts = _query(f"SELECT * FROM ({sql}) ORDER BY value = 0, value, enchant_pts DESC, name", params)
+    if not hosts:
+        who = f"'{item}' cannot" if item else f"No {category.lower()} item can"
+        return {"error": f"{who} hold these effects as {etype} "
+                         f"(they need at least {min_points} points)"}
+    host = hosts[0]
+
+    cap = int(host["enchant_pts"])
+    if etype != 'constant' and soul_size is not None:
+        cap = min(cap, soul_size)
+    result = _mw_allocate(specs, cap, objective)
+    if result is None:
+        return {"error": "No allocation fits the capacity"}
+    value, used, placed = result
+    return {
+        "item": host,
+        "enchant_type": etype,
+        "objective": objective,
+        "objective_value": round(value, 4),
+        "points_used": used,
+        "capacity": host["enchant_pts"],
+        "soul_required": _MW_CE_MIN_SOUL if etype == 'constant' else used,
+        "effects": [
+            {"position": k + 1, "effect": specs[i]["effect"], "magnitude": m,
+             "range": specs[i]["range"], "duration": specs[i]["duration"], "area": specs[i]["area"],
+             "cost": c, "multiplier": n - k, "points": (n - k) * c}
+            for k, (i, m, c) in enumerate(placed)
+        ],
+        "other_hosts": hosts[1:6],
+    }
+
+
 # ─── Oblivion enchanting ────────────────────────────────────────────────────
 
 _OB_SCHOOLS = ('Alteration', 'Conjuration', 'Destruction', 'Illusion', 'Mysticism', 'Restoration')
@@ -406,6 +1259,10 @@ def oblivion_enchant_souls(name: str | None = None) -> list[dict]:
     return _query("SELECT name, soul_size FROM oblivion_enchant_souls ORDER BY soul_size, name")
 
 
+def oblivion_soul_gem_allocation(souls: dict, gems: dict) -> dict:
+    return _soul_gem_allocation('oblivion', souls, gems)
+
+
 def oblivion_sigil_stone(
     weapon_effect: str | None = None,
     armor_effect: str | None = None,
@@ -448,6 +1305,188 @@ def oblivion_sigil_stone(
     )
 
 
+_OB_ATTRIBUTES = ('Strength', 'Intelligence', 'Willpower', 'Agility', 'Speed', 'Endurance', 'Personality', 'Luck')
+_OB_SKILLS = (
+    'Acrobatics', 'Alchemy', 'Alteration', 'Armorer', 'Athletics', 'Blade', 'Block', 'Blunt',
+    'Conjuration', 'Destruction', 'Hand to Hand', 'Heavy Armor', 'Illusion', 'Light Armor',
+    'Marksman', 'Mercantile', 'Mysticism', 'Restoration', 'Security', 'Sneak', 'Speechcraft',
+)
+_OB_NO_MAGNITUDE = ('Night-Eye', 'Water Breathing', 'Water Walking')
+_OB_SOUL_POWER = (150, 300, 800, 1200, 1600)
+_OB_SOUL_NAMES = ('Petty', 'Lesser', 'Common', 'Greater', 'Grand')
+_OB_CHARGE_CAP = 85
+_OB_RANK_BY = ('magnitude', 'charges', 'gold')
+_ob_sigil_cache: dict = {}
+
+
+def _ob_altar_name(effect: str) -> str:
+    """Map a specific effect name (Fortify Blade) to the generic altar effect (Fortify Skill)."""
+    prefix, _, target = effect.partition(' ')
+    if prefix.lower() in ('absorb', 'fortify'):
+        if target.lower() in {a.lower() for a in _OB_ATTRIBUTES}:
+            return f"{prefix.title()} Attribute"
+        if target.lower() in {s.lower() for s in _OB_SKILLS}:
+            return f"{prefix.title()} Skill"
+    return effect
+
+
+def _ob_sigil_arrays() -> dict:
+    """Sigil stones joined once into dense (stone × level) arrays, cached per database."""
+    key = str(DB_PATH)
+    if _cache_hit(_ob_sigil_cache, key):
+        return _ob_sigil_cache[key]
+    cols = ", ".join(
+        f"wm.{lv}_magnitude, wm.{lv}_charges, am.{lv}_magnitude AS {lv}_armor_magnitude"
+        for lv in _SIGIL_LEVELS
+    )
+    rows = _query(
+        f"SELECT s.form_id, s.weapon_effect, s.armor_effect, {cols} "
+        f"FROM oblivion_sigil_stone s "
+        f"JOIN oblivion_sigil_stone_weapon_magnitudes wm ON s.form_id = wm.form_id "
+        f"JOIN oblivion_sigil_stone_armor_magnitudes am ON s.form_id = am.form_id "
+        f"ORDER BY s.form_id"
+    )
+
+    def grid(suffix: str) -> np.ndarray:
+        return np.array(
+            [[r[f"{lv}_{suffix}"] for lv in _SIGIL_LEVELS] for r in rows], dtype=float
+        ).reshape(len(rows), len(_SIGIL_LEVELS))
+
+    altar = {r["name"] for r in _query("SELECT name FROM oblivion_enchant_effects")}
+    weapon = np.array([r["weapon_effect"] for r in rows], dtype=object)
+    armor = np.array([r["armor_effect"] for r in rows], dtype=object)
+    stone_effects = set(weapon) | set(armor)
+    stone_altar = {_ob_altar_name(e) for e in stone_effects}
+    arrays = {
+        "form_id": np.array([r["form_id"] for r in rows], dtype=object),
+        "weapon_effect": weapon,
+        "armor_effect": armor,
+        "weapon_magnitude": grid("magnitude"),
+        "weapon_charges": grid("charges"),
+        "armor_magnitude": grid("armor_magnitude"),
+        "sigil_only": sorted(e for e in stone_effects if _ob_altar_name(e) not in altar),
+        "altar_only": sorted(altar - stone_altar),
+        "both": sorted(e for e in stone_effects if _ob_altar_name(e) in altar),
+    }
+    _ob_sigil_cache[key] = arrays
+    return arrays
+
+
+_OB_ALTAR_APPAREL_NOTE = (
+    "Altar apparel magnitude and gold are not computed: no sourced constant-effect "
+    "formula. These rows list the soul levels only and are ranked after everything else."
+)
+
+
+def _ob_altar_options(effect: dict, item_type: str, magnitude: float | None) -> list[dict]:
+    """One altar row per soul level (soul filling its gem) for a single effect.
+
+    Apparel magnitude and gold are None except for the no-magnitude effects:
+    the CEEF formula in oblivion_enchanting.md collapses to magnitude = soul
+    power (1600 Fortify Health from a Grand soul), so it is not used.
+    """
+    bc, bf = effect["base_cost"], effect["barter_factor"]
+    rows = []
+    if item_type == "apparel":
+        for soul in _OB_SOUL_NAMES:
+            mag = 5.0 if effect["name"] in _OB_NO_MAGNITUDE else None
+            rows.append({
+                "effect": effect["name"], "soul": soul, "magnitude": mag,
+                "charge_per_use": None, "uses": None,
+                "gold": None if mag is None else round(mag * bf, 2),
+            })
+        return rows
+
+    max_mag = (_OB_CHARGE_CAP / (0.1 * bc)) ** (1 / 1.28)
+    mag = max(1, math.floor(max_mag)) if magnitude is None else magnitude
+    charge = bc * 0.1 * mag ** 1.28
+    if charge > _OB_CHARGE_CAP:
+        return []
+    for soul, power in zip(_OB_SOUL_NAMES, _OB_SOUL_POWER):
+        rows.append({
+            "effect": effect["name"], "soul": soul, "magnitude": mag,
+            "charge_per_use": round(charge, 2), "uses": math.floor(power / charge),
+            "gold": round(0.4 * (charge + power), 2),
+        })
+    return rows
+
+
+def oblivion_enchant_plan(
+    effects: list[str],
+    item_type: str = "weapon",
+    level: str | None = None,
+    magnitude: float | None = None,
+    rank_by: str = "magnitude",
+) -> dict:
+    item_type = item_type.lower()
+    if item_type not in ("weapon", "apparel"):
+        return {"error": f"Unknown item_type '{item_type}'. Choose from: weapon, apparel"}
+    if level and level.lower() not in _SIGIL_LEVELS:
+        return {"error": f"Unknown level '{level}'. Choose from: {', '.join(_SIGIL_LEVELS)}"}
+    if rank_by not in _OB_RANK_BY:
+        return {"error": f"Unknown rank_by '{rank_by}'. Choose from: {', '.join(_OB_RANK_BY)}"}
+    if not effects:
+        return {"error": "at least one effect is required"}
+
+    arrays = _ob_sigil_arrays()
+    wanted_lower = {e.lower() for e in effects}
+    altar = {r["name"].lower(): r for r in _query(
+        "SELECT name, base_cost, barter_factor FROM oblivion_enchant_effects"
+    )}
+    if item_type == "weapon":
+        names, mags, charges = arrays["weapon_effect"], arrays["weapon_magnitude"], arrays["weapon_charges"]
+    else:
+        names, mags, charges = arrays["armor_effect"], arrays["armor_magnitude"], None
+    levels = [_SIGIL_LEVELS.index(level.lower())] if level else list(range(len(_SIGIL_LEVELS)))
+    lower = np.array([n.lower() for n in names], dtype=object)
+    generic = np.array([_ob_altar_name(n).lower() for n in names], dtype=object)
+
+    stones: list[dict] = []
+    altar_rows: list[dict] = []
+    unavailable: list[str] = []
+    for wanted in effects:
+        w = wanted.lower()
+        hit = (lower == w) | (generic == w)
+        sub = np.full(mags.shape, False)
+        sub[:, levels] = hit[:, None] & ~np.isnan(mags[:, levels])
+        for i, j in zip(*np.nonzero(sub)):
+            stones.append({
+                "form_id": arrays["form_id"][i], "effect": names[i], "level": _SIGIL_LEVELS[j],
+                "magnitude": float(mags[i, j]),
+                "charges": None if charges is None else float(charges[i, j]),
+                "gold": 0,
+            })
+        target = altar.get(w) or altar.get(_ob_altar_name(wanted).lower())
+        if target:
+            altar_rows.extend(_ob_altar_options(target, item_type, magnitude))
+        if not hit.any() and not target:
+            unavailable.append(wanted)
+
+    def rank(rows: list[dict], charge_key: str) -> list[dict]:
+        # Rows without a value for the key (altar apparel) keep their order, last.
+        if rank_by == "gold":
+            return sorted(rows, key=lambda r: (r["gold"] is None, r["gold"] or 0))
+        key = "magnitude" if rank_by == "magnitude" else charge_key
+        return sorted(rows, key=lambda r: (r[key] is None, -(r[key] or 0)))
+
+    result = {
+        "item_type": item_type,
+        "rank_by": rank_by,
+        "sigil_stones": rank(stones, "charges"),
+        "altar": rank(altar_rows, "uses"),
+        "sigil_only": [e for e in arrays["sigil_only"] if e.lower() in wanted_lower],
+        "unavailable": unavailable,
+    }
+    if any(r["magnitude"] is None for r in altar_rows):
+        result["altar_note"] = _OB_ALTAR_APPAREL_NOTE
+    return result
+
+
+def oblivion_enchant_exclusive_effects() -> dict:
+    arrays = _ob_sigil_arrays()
+    return {k: arrays[k] for k in ("sigil_only", "altar_only", "both")}
+
+
 # ─── Skyrim enchanting ──────────────────────────────────────────────────────
 
 def skyrim_enchant_perks() -> list[dict]:
@@ -510,21 +1549,441 @@ def skyrim_enchant_souls(name: str | None = None) -> list[dict]:
     return _query("SELECT name, soul_size FROM skyrim_enchant_souls ORDER BY soul_size, name")
 
 
+def skyrim_soul_gem_allocation(souls: dict, gems: dict) -> dict:
+    return _soul_gem_allocation('skyrim', souls, gems)
+
+
+_disenchant_cache: dict = {}
+# Entries that name a whole family of generic (random-loot) items rather than one
+# unique item: "All weapons of Frost", "Necklaces of Haggling", or a note saying so.
+_DISENCHANT_GENERIC_NOTES = ('all levels of enchantment', 'most varieties')
+_DISENCHANT_GENERIC_PREFIXES = ('All', 'Armor', 'Boots', 'Bracers', 'Circlets', 'Gauntlets',
+                                'Helmets', 'Necklaces', 'Rings', 'Robes', 'Shields')
+# Set-cover cost by how easy an item is to come by: generic loot, unique items,
+# then items whose note carries a caveat (quest lock, bug, Creation Club, ...).
+_DISENCHANT_COST = {'generic': 1, 'unique': 2, 'conditional': 3}
+
+
+def _disenchant_index() -> dict:
+    """Both disenchant tables plus effect → items and item → effects inverted indexes."""
+    key = str(DB_PATH)
+    if not _cache_hit(_disenchant_cache, key):
+        items: list[dict] = []
+        by_item: dict[tuple[str, str], int] = {}
+        effect_items: dict[str, list[int]] = {}
+        for table, kind in (('skyrim_enchant_disenchant_apparel', 'apparel'),
+                            ('skyrim_enchant_disenchant_weapons', 'weapon')):
+            for r in _query(f"SELECT effect, item, note FROM {table} ORDER BY effect, item"):
+                idx = by_item.get((kind, r['item']))
+                if idx is None:
+                    note = (r['note'] or '').lower()
+                    words = r['item'].split()
+                    family = words[0] in _DISENCHANT_GENERIC_PREFIXES or 'weapons' in words
+                    if family or any(n in note for n in _DISENCHANT_GENERIC_NOTES):
+                        source = 'generic'
+                    elif note:
+                        source = 'conditional'
+                    else:
+                        source = 'unique'
+                    idx = by_item[(kind, r['item'])] = len(items)
+                    items.append({"item": r['item'], "type": kind, "effects": [],
+                                  "notes": [], "effect_notes": {}, "source": source})
+                items[idx]['effects'].append(r['effect'])
+                items[idx]['effect_notes'][r['effect']] = r['note']
+                if r['note'] and r['note'] not in items[idx]['notes']:
+                    items[idx]['notes'].append(r['note'])
+                effect_items.setdefault(r['effect'], []).append(idx)
+        _disenchant_cache[key] = {"items": items, "effect_items": effect_items}
+    return _disenchant_cache[key]
+
+
 def skyrim_enchant_disenchant(effect: str) -> list[dict]:
-    params = {"effect": f"%{effect}%"}
-    apparel = _query(
-        "SELECT effect, item, note, 'apparel' AS type "
-        "FROM skyrim_enchant_disenchant_apparel "
-        "WHERE LOWER(effect) LIKE LOWER(:effect) ORDER BY effect, item",
-        params,
+    ix = _disenchant_index()
+    needle = effect.lower()
+    out = []
+    for kind in ('apparel', 'weapon'):
+        for name in sorted(e for e in ix['effect_items'] if needle in e.lower()):
+            rows = [ix['items'][i] for i in ix['effect_items'][name]]
+            for it in sorted((it for it in rows if it['type'] == kind), key=lambda it: it['item']):
+                out.append({"effect": name, "item": it['item'],
+                            "note": it['effect_notes'][name], "type": kind})
+    return out
+
+
+def skyrim_disenchant_route(
+    effects: list[str] | None = None,
+    item_type: str | None = None,
+    exclude_notes: list[str] | None = None,
+    exclude_unique: bool = False,
+) -> dict:
+    ix = _disenchant_index()
+    if item_type not in (None, 'apparel', 'weapon'):
+        return {"error": "item_type must be 'apparel' or 'weapon'"}
+    if effects:
+        by_lower = {e.lower(): e for e in ix['effect_items']}
+        unknown = [e for e in effects if e.lower() not in by_lower]
+        if unknown:
+            return {"error": f"Unknown disenchant effect(s): {', '.join(unknown)}"}
+        wanted = {by_lower[e.lower()] for e in effects}
+    else:
+        wanted = {
+            e for e, idxs in ix['effect_items'].items()
+            if item_type is None or any(ix['items'][i]['type'] == item_type for i in idxs)
+        }
+    blocked = [n.lower() for n in exclude_notes or []]
+
+    def allowed(it: dict) -> bool:
+        if item_type and it['type'] != item_type:
+            return False
+        if exclude_unique and it['source'] != 'generic':
+            return False
+        return not any(b in n.lower() for n in it['notes'] for b in blocked)
+
+    candidates = {
+        i for e in wanted for i in ix['effect_items'][e] if allowed(ix['items'][i])
+    }
+    coverable = {e for e in wanted if any(i in candidates for i in ix['effect_items'][e])}
+
+    # Weighted greedy set cover: most newly learned effects per unit of cost,
+    # ties to the cheaper source and then the name.
+    left, chosen = set(coverable), []
+    while left:
+        best = min(
+            (i for i in candidates if left & set(ix['items'][i]['effects'])),
+            key=lambda i: (-len(left & set(ix['items'][i]['effects']))
+                           / _DISENCHANT_COST[ix['items'][i]['source']],
+                           _DISENCHANT_COST[ix['items'][i]['source']],
+                           ix['items'][i]['item']),
+        )
+        chosen.append(best)
+        left -= set(ix['items'][best]['effects'])
+    # Drop any pick whose effects the later picks already cover.
+    for i in list(reversed(chosen)):
+        others = set().union(*(ix['items'][j]['effects'] for j in chosen if j != i))
+        if wanted & set(ix['items'][i]['effects']) <= others:
+            chosen.remove(i)
+
+    items = []
+    for i in sorted(chosen, key=lambda i: (ix['items'][i]['type'], ix['items'][i]['item'])):
+        it = ix['items'][i]
+        items.append({
+            "item": it['item'], "type": it['type'], "source": it['source'],
+            "effects": sorted(set(it['effects']) & wanted),
+            "note": '; '.join(it['notes']) or None,
+            "alternatives": len({j for e in it['effects'] if e in wanted
+                                 for j in ix['effect_items'][e] if j in candidates}) - 1,
+        })
+    result = {
+        "effects_covered": len(coverable),
+        "item_count": len(items),
+        "items": items,
+    }
+    if wanted - coverable:
+        result["uncovered"] = sorted(wanted - coverable)
+    return result
+
+
+# Enchanting calculator. Every input axis broadcasts, so a single point and a
+# full skill × Enchanter rank × soul gem × patched grid share one code path.
+
+_SK_SOUL_MULT = {250: 1 / 12, 500: 1 / 6, 1000: 1 / 3, 2000: 2 / 3, 3000: 1.0}
+_SK_GRID_GEMS = ('Petty Soul Gem', 'Lesser Soul Gem', 'Common Soul Gem',
+                 'Greater Soul Gem', 'Grand Soul Gem')
+_SK_ENCHANTER_SKILL = (0, 0, 20, 40, 60, 80)   # skill needed for Enchanter rank 0..5
+
+
+def _sk_skill_mult(skill):
+    s = np.asarray(skill, dtype=float) / 100
+    return 1 + s * (s - 0.14) / 3.4
+
+
+def _sk_enchant_mult(skill, enchanter_rank, patched, potion_effect=0.0,
+                     specific_perk=0.0, seeker_of_sorcery=0.0, skill_bonus=0.0):
+    """Enchanting multiplier excluding base magnitude and soul (broadcasts).
+
+    skill_bonus is Ahzidal's Genius + Haunting Gift in skill points: folded
+    into effective skill in vanilla and ignored when patched
+    (skyrim_enchanting.md, "Apparel: Enchantment Magnitude Formula").
+    """
+    skill = np.asarray(skill, dtype=float)
+    skill_term = np.where(
+        np.asarray(patched, dtype=bool),
+        _sk_skill_mult(skill) * (1 + np.asarray(potion_effect)),
+        _sk_skill_mult(skill + np.asarray(potion_effect) * 100 + skill_bonus),
     )
-    weapons = _query(
-        "SELECT effect, item, note, 'weapon' AS type "
-        "FROM skyrim_enchant_disenchant_weapons "
-        "WHERE LOWER(effect) LIKE LOWER(:effect) ORDER BY effect, item",
+    return (skill_term * (1 + 0.2 * np.asarray(enchanter_rank))
+            * (1 + specific_perk) * (1 + seeker_of_sorcery))
+
+
+def _sk_charges_per_use(base_cost, skill):
+    """Charges per use at maximum magnitude."""
+    return 3 * float(base_cost) ** 1.1 * (1 - np.sqrt(np.asarray(skill, dtype=float) / 200))
+
+
+def skyrim_enchant_calculator(
+    effect: str,
+    base_magnitude: float | None = None,
+    skill: int | None = None,
+    enchanter_rank: int | None = None,
+    soul_gem: str | None = None,
+    patched: bool | None = None,
+    potion_magnitude: float = 0,
+    specific_perk: bool = False,
+    seeker_of_sorcery: bool = False,
+    elemental_destruction_rank: int = 0,
+    ahzidal_genius: bool = False,
+    haunting_gift: int = 0,
+    skill_step: int = 5,
+) -> dict:
+    weapon = _query(
+        "SELECT name, base_cost FROM skyrim_enchant_weapons WHERE LOWER(name) = LOWER(:n)",
+        {"n": effect},
+    )
+    apparel = [] if weapon else _query(
+        "SELECT enchantment AS name, base_cost FROM skyrim_enchant_apparel "
+        "WHERE LOWER(enchantment) = LOWER(:n)",
+        {"n": effect},
+    )
+    if not (weapon or apparel):
+        return {"error": f"No Skyrim weapon or apparel enchantment named '{effect}'"}
+    row = (weapon or apparel)[0]
+    is_weapon = bool(weapon)
+    if is_weapon and not row["base_cost"]:
+        return {"error": f"{row['name']} has no base_cost in skyrim_enchant_weapons"}
+    if skill is not None and not 0 <= skill <= 100:
+        return {"error": "skill must be between 0 and 100"}
+    if enchanter_rank is not None and not 0 <= enchanter_rank <= 5:
+        return {"error": "enchanter_rank must be between 0 and 5"}
+    if elemental_destruction_rank not in (0, 1, 2):
+        return {"error": "elemental_destruction_rank must be 0, 1, or 2"}
+
+    gem_names = [soul_gem] if soul_gem else list(_SK_GRID_GEMS)
+    gem_rows = {
+        r["name"].lower(): r for r in _query(
+            "SELECT name, capacity FROM skyrim_enchant_soulgems WHERE capacity > 0"
+        )
+    }
+    gems = [gem_rows.get(g.lower()) for g in gem_names]
+    if None in gems:
+        return {"error": f"Unknown or empty Skyrim soul gem '{soul_gem}'"}
+
+    skills = np.array([skill] if skill is not None
+                      else sorted(set(range(15, 101, max(1, skill_step))) | {100}), dtype=float)
+    ranks = np.array([enchanter_rank] if enchanter_rank is not None else range(6))
+    caps = np.array([g["capacity"] for g in gems], dtype=float)
+    flags = np.array([patched] if patched is not None else [True, False])
+
+    # Axes: skill × rank × gem × patched.
+    sk = skills[:, None, None, None]
+    rk = ranks[None, :, None, None]
+    cap = caps[None, None, :, None]
+    pt = flags[None, None, None, :]
+    shape = (len(skills), len(ranks), len(caps), len(flags))
+
+    mult = _sk_enchant_mult(
+        sk, rk, pt,
+        potion_effect=potion_magnitude / 100,
+        specific_perk=0.25 if specific_perk else 0.0,
+        seeker_of_sorcery=0.1 if seeker_of_sorcery else 0.0,
+        skill_bonus=(10 if ahzidal_genius else 0) + haunting_gift,
+    )
+    columns = ["skill", "enchanter_rank", "soul_gem", "patched"]
+    if is_weapon:
+        charges = _sk_charges_per_use(row["base_cost"], sk)
+        uses = cap / charges
+        # A soul too small for one use at max magnitude: the game lowers the
+        # magnitude until one use fits (charges ∝ magnitude^1.1).
+        scale = np.minimum(1.0, uses) ** (1 / 1.1)
+        charges = np.minimum(charges, cap)
+        uses = np.maximum(np.floor(uses), 1).astype(int)
+        outer = 1 + 0.25 * elemental_destruction_rank
+        if base_magnitude is not None:
+            magnitude = np.floor(np.floor(np.floor(base_magnitude * mult) * outer) * scale)
+        else:
+            magnitude = np.round(mult * outer * scale, 3)
+        columns += ["max_magnitude" if base_magnitude is not None else "magnitude_multiplier",
+                    "charges_per_use", "uses"]
+        values = [magnitude, np.round(charges, 2), uses]
+    else:
+        soul = np.vectorize(_SK_SOUL_MULT.get)(cap)
+        if base_magnitude is not None:
+            magnitude = np.floor(base_magnitude * soul * mult)
+        else:
+            magnitude = np.round(soul * mult, 3)
+        columns.append("magnitude" if base_magnitude is not None else "magnitude_multiplier")
+        values = [magnitude]
+
+    feasible = np.broadcast_to(
+        np.array(_SK_ENCHANTER_SKILL)[rk] <= sk, shape
+    ).ravel()
+    if not feasible.any():
+        return {"error": f"Enchanter rank {enchanter_rank} requires Enchanting "
+                         f"{_SK_ENCHANTER_SKILL[enchanter_rank]}"}
+    idx = np.indices(shape).reshape(4, -1)
+    flat = [np.broadcast_to(v, shape).ravel() for v in values]
+    rows = []
+    for i in np.flatnonzero(feasible):
+        s, r, g, p = idx[:, i]
+        rows.append(
+            [int(skills[s]), int(ranks[r]), gems[g]["name"], bool(flags[p])]
+            + [v[i].item() for v in flat]
+        )
+    return {
+        "effect": row["name"],
+        "type": "weapon" if is_weapon else "apparel",
+        "base_cost": row["base_cost"],
+        "columns": columns,
+        "rows": rows,
+    }
+
+
+def skyrim_enchant_charge_table(
+    effect: str,
+    skill: int | None = None,
+    enchanter_rank: int | None = None,
+    soul_gem: str | None = None,
+    patched: bool | None = None,
+) -> dict:
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = 'skyrim_enchant_charge_grid'"):
+        return {"error": "skyrim_enchant_charge_grid has not been built — run update_tes.py"}
+    where = ["LOWER(effect) = LOWER(:effect)"]
+    params: dict = {"effect": effect}
+    for col, val in (("skill", skill), ("enchanter_rank", enchanter_rank), ("patched", patched)):
+        if val is not None:
+            where.append(f"{col} = :{col}")
+            params[col] = int(val)
+    if soul_gem:
+        where.append("LOWER(soul_gem) = LOWER(:gem)")
+        params["gem"] = soul_gem
+    rows = _query(
+        "SELECT effect, type, base_cost, skill, enchanter_rank, soul_gem, patched, "
+        "magnitude_multiplier, charges_per_use, uses FROM skyrim_enchant_charge_grid "
+        f"WHERE {' AND '.join(where)} ORDER BY rowid",
         params,
     )
-    return apparel + weapons
+    if not rows:
+        return {"error": f"No precomputed row for '{effect}' with those parameters; "
+                         f"use skyrim_enchant_calculator for other inputs"}
+    weapon = rows[0]["type"] == "weapon"
+    columns = ["skill", "enchanter_rank", "soul_gem", "patched", "magnitude_multiplier"]
+    if weapon:
+        columns += ["charges_per_use", "uses"]
+    return {
+        "effect": rows[0]["effect"],
+        "type": rows[0]["type"],
+        "base_cost": rows[0]["base_cost"],
+        "columns": columns,
+        "rows": [[r["skill"], r["enchanter_rank"], r["soul_gem"], bool(r["patched"])]
+                 + [r[c] for c in columns[4:]] for r in rows],
+    }
+
+
+# Alchemy ↔ enchanting feedback loop. Fortify Enchanting potions strengthen
+# Fortify Alchemy apparel, which strengthens the next potion. Profiles are
+# evaluated as NumPy columns so one call can sweep thousands of them.
+
+_SK_FORTIFY_ALCHEMY_BASE_MAG = 8   # per piece at skill 0, Grand soul, no perks
+_SK_LOOP_DEFAULTS = {
+    "alchemy_skill": 100, "alchemist_rank": 5, "benefactor": True, "seeker_of_shadows": False,
+    "enchanting_skill": 100, "enchanter_rank": 5, "insightful_enchanter": True,
+    "seeker_of_sorcery": False, "fortify_alchemy_slots": 4, "starting_fortify_alchemy": 0,
+    "patched": False,
+}
+
+
+def _sk_loop_batch(p: dict, fe_base_mag: float, max_iterations: int) -> dict:
+    """Iterate the loop for column arrays in p until every profile is stable.
+
+    Returns per-iteration arrays plus the continuous (unfloored) fixed point,
+    which is solved in closed form: linear in Fortify Alchemy when patched,
+    quadratic in vanilla. inf marks a relaxation with no finite fixed point.
+    """
+    alch = (4 * fe_base_mag * (1 + 0.5 * p["alchemy_skill"] / 100)
+            * (1 + 0.2 * p["alchemist_rank"]) * np.where(p["benefactor"], 1.25, 1.0)
+            * np.where(p["seeker_of_shadows"], 1.1, 1.0))
+    ench = (_SK_FORTIFY_ALCHEMY_BASE_MAG * p["fortify_alchemy_slots"]
+            * (1 + 0.2 * p["enchanter_rank"]) * np.where(p["insightful_enchanter"], 1.25, 1.0)
+            * np.where(p["seeker_of_sorcery"], 1.1, 1.0))
+    per_piece_scale = ench / p["fortify_alchemy_slots"]
+
+    fa = p["starting_fortify_alchemy"].astype(float)
+    prev_fe = prev_fa = np.full(fa.shape, np.nan)
+    steps = []
+    # converged_at: first iteration whose (FE, FA) state the next one repeats.
+    converged_at = np.zeros(fa.shape, dtype=int)
+    for i in range(1, max_iterations + 1):
+        fe = np.floor(alch * (1 + fa / 100))
+        mult = _sk_enchant_mult(p["enchanting_skill"], 0, p["patched"], potion_effect=fe / 100)
+        piece = np.floor(per_piece_scale * mult)
+        fa = piece * p["fortify_alchemy_slots"]
+        steps.append((fe, piece, fa))
+        stable = (fe == prev_fe) & (fa == prev_fa)
+        converged_at = np.where((converged_at == 0) & stable, i - 1, converged_at)
+        if (converged_at > 0).all():
+            break
+        prev_fe, prev_fa = fe, fa
+
+    # Continuous fixed point F of F = ench × m(skill, FE(F)).
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s_e = p["enchanting_skill"] / 100
+        k_lin = ench * _sk_skill_mult(p["enchanting_skill"])
+        denom = 1 - k_lin * alch / 1e4
+        linear = np.where(denom > 0, k_lin * (1 + alch / 100) / denom, np.inf)
+        s0 = s_e + alch / 100
+        b = alch / 1e4
+        c2 = ench * b * b / 3.4
+        c1 = ench * b * (2 * s0 - 0.14) / 3.4 - 1
+        c0 = ench * (1 + s0 * (s0 - 0.14) / 3.4)
+        disc = c1 * c1 - 4 * c2 * c0
+        root = np.where(c2 > 0, (-c1 - np.sqrt(np.maximum(disc, 0))) / (2 * c2), -c0 / c1)
+        quadratic = np.where((disc >= 0) & (root >= 0), root, np.inf)
+    analytic = np.where(p["patched"], linear, quadratic)
+    return {"steps": steps, "converged_at": converged_at, "analytic": analytic}
+
+
+def skyrim_alchemy_enchant_loop(profiles: list[dict], max_iterations: int = 10) -> dict:
+    if not profiles:
+        return {"error": "at least one profile is required"}
+    unknown = sorted({k for pr in profiles for k in pr} - set(_SK_LOOP_DEFAULTS))
+    if unknown:
+        return {"error": f"Unknown profile key(s): {', '.join(unknown)}. "
+                         f"Valid keys: {', '.join(_SK_LOOP_DEFAULTS)}"}
+    filled = [{**_SK_LOOP_DEFAULTS, **pr} for pr in profiles]
+    cols = {k: np.array([pr[k] for pr in filled]) for k in _SK_LOOP_DEFAULTS}
+    if ((cols["fortify_alchemy_slots"] < 1) | (cols["fortify_alchemy_slots"] > 5)).any():
+        return {"error": "fortify_alchemy_slots must be between 1 and 5"}
+    fe_rows = _query(
+        "SELECT MAX(base_magnitude) AS m FROM skyrim_alchemy_effects WHERE effect = 'Fortify Enchanting'"
+    )
+    fe_base_mag = fe_rows[0]["m"] if fe_rows and fe_rows[0]["m"] else 1.0
+
+    out = _sk_loop_batch(cols, fe_base_mag, max(1, max_iterations))
+    fe, piece, fa = out["steps"][-1]
+    limits = [
+        [int(fa[i]), int(piece[i]), int(fe[i]), int(out["converged_at"][i]) or None,
+         None if np.isinf(out["analytic"][i]) else round(float(out["analytic"][i]), 2)]
+        for i in range(len(filled))
+    ]
+    if len(filled) > 1:
+        keys = list(_SK_LOOP_DEFAULTS)
+        return {
+            "columns": keys + ["fortify_alchemy", "fortify_alchemy_per_piece",
+                               "fortify_enchanting", "converged_at", "analytic_limit"],
+            "rows": [[pr[k] for k in keys] + lim for pr, lim in zip(filled, limits)],
+        }
+    fa_total, per_piece, fe_last, converged_at, analytic = limits[0]
+    return {
+        "profile": filled[0],
+        "iterations": [
+            {"iteration": n, "fortify_enchanting": int(f[0]),
+             "fortify_alchemy_per_piece": int(pc[0]), "fortify_alchemy": int(a[0])}
+            for n, (f, pc, a) in enumerate(out["steps"], 1)
+        ],
+        "limit": {"fortify_alchemy": fa_total, "fortify_alchemy_per_piece": per_piece,
+                  "fortify_enchanting": fe_last},
+        "converged_at": converged_at,
+        "analytic_limit": analytic,
+    }
 
 
 # ─── Skyrim smithing ────────────────────────────────────────────────────────
@@ -637,6 +2096,529 @@ def skyrim_smelting(
     )
 
 
+_smithing_cache: dict = {}
+
+
+def _strip_dlc(name: str) -> str:
+    """'StalhrimDR' → 'Stalhrim': drop the DLC tag used in skyrim_tempering_materials."""
+    if name[-2:] in ('DR', 'DG') and len(name) > 2 and name[-3].islower():
+        return name[:-2]
+    return name
+
+
+def _smithing_matrix() -> dict:
+    """Armor, weapon, and ammo recipes as one pieces × materials matrix, plus tempering
+    materials, the ingot → ore smelting map, and the quality table; cached per database."""
+    key = str(DB_PATH)
+    if _cache_hit(_smithing_cache, key):
+        return _smithing_cache[key]
+    tables = (
+        ('armor', 'skyrim_smithing_armor', _ARMOR_FIXED),
+        ('weapon', 'skyrim_smithing_weapons', _WEAPON_FIXED),
+        ('ammo', 'skyrim_smithing_ammo', _WEAPON_FIXED | {'type', 'batch_size'}),
+    )
+    pieces: list[dict] = []
+    recipes: list[dict] = []
+    for kind, table, fixed in tables:
+        for r in _query(f"SELECT * FROM {table} ORDER BY piece"):
+            # Arrows and bolts sit in the weapons table but cannot be tempered.
+            last = r['piece'].rstrip(' †').rsplit(' ', 1)[-1]
+            pieces.append({
+                'piece': r['piece'], 'material_perk': r['material_perk'],
+                'kind': 'ammo' if last in ('Arrow', 'Bolt') else kind,
+                'value': r['value'], 'batch_size': r.get('batch_size') or 1,
+            })
+            recipes.append({k: v for k, v in r.items() if k not in fixed and v})
+    materials = sorted({m for rec in recipes for m in rec})
+    col = {m: j for j, m in enumerate(materials)}
+    matrix = np.zeros((len(pieces), len(materials)), dtype=np.int64)
+    for i, rec in enumerate(recipes):
+        for m, qty in rec.items():
+            matrix[i, col[m]] = qty
+
+    categories = [
+        (_strip_dlc(r['smithing_category']), _strip_dlc(r['crafting_material']))
+        for r in _query("SELECT smithing_category, crafting_material FROM skyrim_tempering_materials")
+        if r['crafting_material'] != '*'
+    ]
+    for p in pieces:
+        padded = f" {p['piece'].lower()} "
+        hits = [(c, m) for c, m in categories if f" {c.lower()} " in padded]
+        p['tempering_material'] = max(hits, key=lambda h: len(h[0]))[1] if hits else None
+
+    # Single-source smelting only: Dwemer scrap has several sources and Steel needs two ores.
+    smelt = _query(
+        "SELECT Source_Name, Source_To_Ingot, Ingot_Name, Ingots_Produced FROM skyrim_smelting "
+        "WHERE Ingot_Name IS NOT NULL"
+    )
+    by_ingot: dict[str, list[dict]] = {}
+    for r in smelt:
+        by_ingot.setdefault(r['Ingot_Name'].lower().replace(' ', '_'), []).append(r)
+    smeltable = [m for m in materials if m in by_ingot and (len(by_ingot[m]) == 1 or m == 'steel_ingot')]
+    ores = sorted({r['Source_Name'] for m in smeltable for r in by_ingot[m]})
+    ingot_to_ore = np.zeros((len(smeltable), len(ores)), dtype=float)
+    for i, m in enumerate(smeltable):
+        for r in by_ingot[m]:
+            ingot_to_ore[i, ores.index(r['Source_Name'])] = r['Source_To_Ingot'] / r['Ingots_Produced']
+
+    perks = {r['name']: r['skill_level'] for r in _query("SELECT name, skill_level FROM skyrim_smithing_perks")}
+    quality = _query(
+        "SELECT quality, skill_without_perk, skill_with_perk "
+        "FROM skyrim_smithing_improvement ORDER BY skill_without_perk"
+    )
+    cached = {
+        "pieces": pieces,
+        "index": {p['piece'].lower(): i for i, p in enumerate(pieces)},
+        "materials": materials,
+        "matrix": matrix,
+        "ingot_cols": np.array([col[m] for m in smeltable], dtype=np.int64),
+        "multi_source": [m for m in materials if m in by_ingot and m not in smeltable],
+        "ores": ores,
+        "ingot_to_ore": ingot_to_ore,
+        "perk_skill": perks,
+        "quality": quality,
+    }
+    _smithing_cache[key] = cached
+    return cached
+
+
+def skyrim_smithing_plan(
+    pieces: list[str] | None = None,
+    perk: str | None = None,
+    quality: str = 'Legendary',
+) -> dict:
+    m = _smithing_matrix()
+    qnames = [q['quality'].lower() for q in m['quality']]
+    if quality.lower() not in qnames:
+        return {"error": f"Unknown quality '{quality}'. Choose from: "
+                         f"{', '.join(q['quality'] for q in m['quality'])}"}
+    if not pieces and not perk:
+        return {"error": "Provide pieces, perk, or both"}
+
+    counts = np.zeros(len(m['pieces']), dtype=np.int64)
+    unknown: list[str] = []
+    for name in pieces or []:
+        i = m['index'].get(name.strip().lower())
+        if i is None:
+            unknown.append(name)
+        else:
+            counts[i] += 1
+    if perk:
+        hit = [i for i, p in enumerate(m['pieces'])
+               if p['kind'] != 'ammo' and p['material_perk']
+               and perk.lower() in p['material_perk'].lower()]
+        if not hit:
+            return {"error": f"No craftable pieces for perk '{perk}'"}
+        counts[hit] = np.maximum(counts[hit], 1)
+    chosen = np.nonzero(counts)[0]
+    if not len(chosen):
+        return {"error": f"Unknown piece(s): {', '.join(unknown)}", "unknown": unknown}
+
+    totals = counts @ m['matrix']
+    materials = {_col_display(c): int(v) for c, v in zip(m['materials'], totals) if v}
+
+    # Raw materials: smelt single-source ingots back to ore, fold leather strips into leather.
+    ore_qty = totals[m['ingot_cols']] @ m['ingot_to_ore']
+    raw = totals.copy()
+    raw[m['ingot_cols']] = 0
+    raw_materials = {_col_display(c): int(v) for c, v in zip(m['materials'], raw) if v}
+    raw_materials.update({ore: int(math.ceil(q)) for ore, q in zip(m['ores'], ore_qty) if q})
+    strips = raw_materials.pop('Leather Strips', 0)
+    if strips:
+        raw_materials['Leather'] = raw_materials.get('Leather', 0) + math.ceil(strips / 4)
+    notes = [
+        f"{_col_display(ing)} has several smelting sources; see skyrim_smelting(ingot=...)"
+        for ing in m['multi_source'] if totals[m['materials'].index(ing)]
+    ]
+
+    # Tempering: one improvement per piece straight to the target quality.
+    q_idx = qnames.index(quality.lower())
+    target = m['quality'][q_idx]
+    tempering: dict[str, int] = {}
+    rows: list[dict] = []
+    perks_needed: set[str] = set()
+    for i in chosen:
+        p = m['pieces'][i]
+        if p['material_perk']:
+            perks_needed.add(p['material_perk'])
+        if p['kind'] != 'ammo' and p['tempering_material']:
+            tempering[p['tempering_material']] = tempering.get(p['tempering_material'], 0) + int(counts[i])
+        rows.append({
+            'piece': p['piece'], 'kind': p['kind'], 'count': int(counts[i]),
+            'material_perk': p['material_perk'],
+            'tempering_material': None if p['kind'] == 'ammo' else p['tempering_material'],
+        })
+
+    craft_levels = [m['perk_skill'].get(pk) for pk in sorted(perks_needed)]
+    result = {
+        "pieces": rows,
+        "materials": materials,
+        "raw_materials": raw_materials,
+        "tempering": {
+            "quality": target['quality'],
+            "quality_number": q_idx + 1,
+            "materials": tempering,
+        },
+        "skill": {
+            "perks": sorted(perks_needed),
+            "craft": max((lv for lv in craft_levels if lv is not None), default=0),
+            "temper_with_perk": target['skill_with_perk'],
+            "temper_without_perk": target['skill_without_perk'],
+        },
+    }
+    if notes:
+        result["smelting_notes"] = notes
+    if unknown:
+        result["unknown"] = unknown
+    return result
+
+
+def skyrim_smithing_set_totals(perk: str, quality: str = 'Legendary') -> dict:
+    if not _query("SELECT name FROM sqlite_master WHERE type='table' AND name = 'skyrim_smithing_set_totals'"):
+        return {"error": "skyrim_smithing_set_totals has not been built — run update_tes.py"}
+    rows = _query(
+        "SELECT material_perk, plan FROM skyrim_smithing_set_totals "
+        "WHERE LOWER(material_perk) = LOWER(:perk) AND LOWER(quality) = LOWER(:quality)",
+        {"perk": perk, "quality": quality},
+    )
+    if not rows:
+        perks = sorted({r["material_perk"] for r in _query(
+            "SELECT DISTINCT material_perk FROM skyrim_smithing_set_totals")})
+        return {"error": f"No precomputed set for perk '{perk}' at quality '{quality}'. "
+                         f"Perks: {', '.join(perks)}"}
+    return {"material_perk": rows[0]["material_perk"], **json.loads(rows[0]["plan"])}
+
+
+# Skill XP to advance from level L to L+1: Skill Improve Mult × L^1.95 + Skill Improve Offset.
+_SMITHING_IMPROVE_MULT = 0.25
+_SMITHING_IMPROVE_OFFSET = 300
+# Base values for the two non-ingot materials most recipes use (not in skyrim_smelting).
+_SMITHING_DEFAULT_PRICES = {'leather': 10, 'leather_strips': 3}
+
+
+def _smithing_xp_to_next(level: np.ndarray) -> np.ndarray:
+    return _SMITHING_IMPROVE_MULT * level.astype(float) ** 1.95 + _SMITHING_IMPROVE_OFFSET
+
+
+def _smithing_unit_prices(prices: dict | None) -> dict[str, float]:
+    """Gold per unit of each material column: ingots at smelted-ore cost, then overrides."""
+    unit: dict[str, float] = dict(_SMITHING_DEFAULT_PRICES)
+    rows = _query(
+        "SELECT Source_Name, Source_Value, Source_To_Ingot, Ingot_Name, Ingots_Produced "
+        "FROM skyrim_smelting WHERE Ingot_Name IS NOT NULL"
+    )
+    ore = {r['Source_Name']: r['Source_Value'] for r in rows}
+    for r in rows:
+        col = r['Ingot_Name'].lower().replace(' ', '_')
+        if col == 'steel_ingot':
+            cost = ore['Iron Ore'] + ore['Corundum Ore']
+        else:
+            cost = r['Source_Value'] * r['Source_To_Ingot'] / r['Ingots_Produced']
+        unit[col] = min(unit.get(col, cost), cost)
+    for name, gold in (prices or {}).items():
+        unit[name.strip().lower().replace(' ', '_')] = float(gold)
+    return unit
+
+
+def _cover_knapsack(xp: np.ndarray, cost: np.ndarray, need: int) -> tuple[float, np.ndarray, np.ndarray]:
+    """Cheapest multiset of actions (unbounded) whose XP sum is ≥ need.
+
+    Each action is a whole-array pass: along every residue class mod its XP the
+    recurrence f[x] = min(f[x], f[x - w] + c) is a running minimum of f[x] - k·c.
+    Returns (cost, counts per action, f) where f[x] is the cheapest way to gain exactly x XP."""
+    top = need + int(xp.max())
+    f = np.full(top + 1, np.inf)
+    f[0] = 0.0
+    choice = np.full(top + 1, -1, dtype=np.int64)
+    for i, (w, c) in enumerate(zip(xp, cost)):
+        rows = -(-(top + 1) // w)
+        g = np.full(rows * w, np.inf)
+        g[:top + 1] = f
+        g = g.reshape(rows, w)
+        k = np.arange(rows)[:, None] * c
+        best = np.minimum.accumulate(g - k, axis=0) + k
+        improved = best.ravel()[:top + 1] < f
+        f = np.minimum(f, best.ravel()[:top + 1])
+        choice[improved] = i
+    x = need + int(np.argmin(f[need:]))
+    total = float(f[x])
+    counts = np.zeros(len(xp), dtype=np.int64)
+    while x > 0:
+        i = choice[x]
+        # Walk back one action at a time; f[x - w] + c == f[x] along the optimal path.
+        counts[i] += 1
+        x -= int(xp[i])
+    return total, counts, f
+
+
+def skyrim_smithing_leveling(
+    current_skill: int,
+    target_skill: int = 100,
+    gold_budget: float | None = None,
+    prices: dict | None = None,
+    improve: bool = True,
+) -> dict:
+    if not 0 <= current_skill < target_skill <= 100:
+        return {"error": "Require 0 <= current_skill < target_skill <= 100"}
+    m = _smithing_matrix()
+    unit = _smithing_unit_prices(prices)
+    priced = np.array([c in unit for c in m['materials']], dtype=bool)
+    price_vec = np.array([unit.get(c, 0.0) for c in m['materials']])
+    craftable = (m['matrix'][:, ~priced] == 0).all(axis=1)
+    craft_cost = m['matrix'] @ price_vec
+
+    # Action table: craft an item, optionally followed by one improvement to quality q.
+    names, quals, xp, cost, min_skill = [], [], [], [], []
+    for i, p in enumerate(m['pieces']):
+        if not craftable[i] or p['kind'] == 'ammo' or not p['value']:
+            continue
+        perk_level = m['perk_skill'].get(p['material_perk'], None) if p['material_perk'] else 0
+        if perk_level is None:
+            continue
+        craft_xp = 3 * p['value'] ** 0.65 + 25
+        names.append(p['piece']); quals.append(None)
+        xp.append(craft_xp); cost.append(craft_cost[i]); min_skill.append(perk_level)
+        temper = (p['tempering_material'] or '').lower().replace(' ', '_')
+        if not improve or temper not in unit:
+            continue
+        col = 'skill_with_perk' if p['material_perk'] else 'skill_without_perk'
+        for q, row in enumerate(m['quality'], start=1):
+            gain = 3.8 * (p['value'] * q / 6) ** 0.5 * q ** 0.5
+            names.append(p['piece']); quals.append(row['quality'])
+            xp.append(craft_xp + gain); cost.append(craft_cost[i] + unit[temper])
+            min_skill.append(max(perk_level, row[col]))
+    if not names:
+        return {"error": "No craftable candidates with priced materials; pass prices"}
+    xp_arr = np.floor(np.array(xp)).astype(np.int64)
+    cost_arr = np.array(cost)
+    skill_arr = np.array(min_skill)
+
+    levels = np.arange(current_skill, target_skill)
+    need = _smithing_xp_to_next(levels)
+    # Levels where the candidate set changes split the range into bands; within a band
+    # overflow XP carries freely, so each band is one cover-knapsack.
+    cuts = sorted({current_skill, target_skill} | {int(s) for s in skill_arr if current_skill < s < target_skill})
+    plan: list[dict] = []
+    total_cost = 0.0
+    reached = None
+    for lo, hi in zip(cuts, cuts[1:]):
+        band_need = int(math.ceil(need[lo - current_skill:hi - current_skill].sum()))
+        avail = np.nonzero(skill_arr <= lo)[0]
+        if not len(avail):
+            return {"error": f"No candidate can be crafted at skill {lo}"}
+        # Drop dominated actions (no more XP for no less gold) before the knapsack.
+        order = avail[np.lexsort((cost_arr[avail], -xp_arr[avail]))]
+        keep, best_cost = [], np.inf
+        for a in order:
+            if cost_arr[a] < best_cost:
+                keep.append(a)
+                best_cost = cost_arr[a]
+        keep = np.array(keep)
+        band_cost, counts, f = _cover_knapsack(xp_arr[keep], cost_arr[keep], band_need)
+        if gold_budget is not None and reached is None and total_cost + band_cost > gold_budget:
+            affordable = np.nonzero(f <= gold_budget - total_cost)[0]
+            gained = int(affordable.max()) if len(affordable) else 0
+            done = np.cumsum(need[lo - current_skill:hi - current_skill])
+            reached = lo + int(np.searchsorted(done, gained, side='right'))
+        total_cost += band_cost
+        plan.append({
+            "levels": f"{lo}-{hi}",
+            "xp": band_need,
+            "gold": round(band_cost, 2),
+            "actions": [
+                {"item": names[a], "quality": quals[a], "count": int(n),
+                 "xp_each": int(xp_arr[a]), "gold_each": round(float(cost_arr[a]), 2)}
+                for a, n in zip(keep, counts) if n
+            ],
+        })
+
+    result = {
+        "current_skill": current_skill,
+        "target_skill": target_skill,
+        "xp_required": int(math.ceil(need.sum())),
+        "gold": round(total_cost, 2),
+        "plan": plan,
+    }
+    if gold_budget is not None:
+        result["gold_budget"] = gold_budget
+        result["reached_skill"] = target_skill if reached is None else reached
+    return result
+
+
+# ─── Skyrim salvage (carry-weight knapsack over skyrim_smelting) ─────────────
+
+_SALVAGE_MAX_WEIGHT = 100_000
+
+
+def _bounded_knapsack(weight: np.ndarray, value: np.ndarray, cap: np.ndarray, budget: int):
+    """0/1 knapsack over binary-split copies of each item (item i at most cap[i] times).
+
+    Returns (f, take) where f[w] is the best value within weight w and take(w)
+    returns the per-item counts of one optimal choice at that weight."""
+    f = np.zeros(budget + 1, dtype=np.int64)
+    parts: list[tuple[int, int]] = []
+    for i, c in enumerate(cap):
+        k = 1
+        while c > 0:
+            m = min(k, c)
+            if weight[i] * m <= budget:
+                parts.append((i, m))
+            c -= m
+            k *= 2
+    keep = np.zeros((len(parts), budget + 1), dtype=bool)
+    for p, (i, m) in enumerate(parts):
+        wt, val = int(weight[i] * m), int(value[i] * m)
+        cand = f[:budget + 1 - wt] + val
+        better = cand > f[wt:]
+        keep[p, wt:] = better
+        f[wt:] = np.where(better, cand, f[wt:])
+
+    def take(w: int) -> np.ndarray:
+        counts = np.zeros(len(weight), dtype=np.int64)
+        for p in range(len(parts) - 1, -1, -1):
+            if keep[p, w]:
+                i, m = parts[p]
+                counts[i] += m
+                w -= int(weight[i] * m)
+        return counts
+
+    return f, take
+
+
+def skyrim_salvage_plan(
+    weight_budget: int,
+    available: dict | None = None,
+    ingot: str | None = None,
+) -> dict:
+    if not 1 <= weight_budget <= _SALVAGE_MAX_WEIGHT:
+        return {"error": f"weight_budget must be between 1 and {_SALVAGE_MAX_WEIGHT}"}
+    budget = int(weight_budget)
+    rows = _query(
+        "SELECT Source_Name, Source_Weight, Source_To_Ingot, Ingot_Name, Ingots_Produced, "
+        "Ingot_Value, Note FROM skyrim_smelting ORDER BY Ingot_Name, Source_Name"
+    )
+    by_lower = {r['Source_Name'].lower(): r['Source_Name'] for r in rows}
+    stock: dict[str, int] | None = None
+    if available is not None:
+        unknown = [s for s in available if s.strip().lower() not in by_lower]
+        if unknown:
+            return {"error": f"Unknown smelting source(s): {', '.join(unknown)}"}
+        stock = {by_lower[s.strip().lower()]: int(n) for s, n in available.items()}
+    target = None
+    if ingot:
+        ingots = {r['Ingot_Name'].lower(): r['Ingot_Name'] for r in rows if r['Ingot_Name']}
+        target = ingots.get(ingot.strip().lower())
+        if target is None:
+            return {"error": f"Unknown ingot: {ingot}"}
+
+    not_smeltable = [
+        {"source": r['Source_Name'], "note": r['Note']}
+        for r in rows if r['Ingot_Name'] is None and (stock is None or r['Source_Name'] in stock)
+    ]
+    weights = {r['Source_Name']: r['Source_Weight'] for r in rows if r['Ingot_Name']}
+
+    # One recipe per smelter batch; rows noted "Also requires ..." (Steel) merge into a
+    # single batch that consumes one of each source.
+    recipes: list[dict] = []
+    joint: dict[str, dict] = {}
+    for r in rows:
+        if r['Ingot_Name'] is None:
+            continue
+        gain = r['Ingots_Produced'] * (int(r['Ingot_Name'] == target) if target else r['Ingot_Value'])
+        if (r['Note'] or '').startswith('Also requires'):
+            rec = joint.setdefault(r['Ingot_Name'], {
+                "ingot": r['Ingot_Name'], "uses": {}, "produced": r['Ingots_Produced'], "gain": gain,
+            })
+            if rec['uses'] == {}:
+                recipes.append(rec)
+            rec['uses'][r['Source_Name']] = r['Source_To_Ingot']
+        else:
+            recipes.append({
+                "ingot": r['Ingot_Name'], "uses": {r['Source_Name']: r['Source_To_Ingot']},
+                "produced": r['Ingots_Produced'], "gain": gain,
+            })
+    recipes = [
+        rec for rec in recipes
+        if rec['gain'] > 0 and (stock is None or all(s in stock for s in rec['uses']))
+    ]
+    for rec in recipes:
+        rec['weight'] = sum(weights[s] * n for s, n in rec['uses'].items())
+
+    def caps(recs: list[dict], left: dict[str, int] | None) -> np.ndarray:
+        return np.array([
+            min((left[s] // n if left is not None else budget // rec['weight']) for s, n in rec['uses'].items())
+            for rec in recs
+        ], dtype=np.int64)
+
+    def arrays(recs: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+        return (np.array([rec['weight'] for rec in recs], dtype=np.int64),
+                np.array([rec['gain'] for rec in recs], dtype=np.int64))
+
+    # With limited stock, a multi-source batch competes with the single-source batches
+    # of the same ores. Enumerate its count and solve that small group for each value;
+    # every other recipe is independent and solved once.
+    group: list[dict] = []
+    multi = [rec for rec in recipes if len(rec['uses']) > 1]
+    if stock is not None:
+        # Stock that covers the whole budget on its own never binds, so it cannot couple.
+        shared = {s for rec in multi for s in rec['uses'] if stock[s] * weights[s] < budget}
+        group = [rec for rec in recipes if len(rec['uses']) == 1 and set(rec['uses']) & shared]
+    rest = [rec for rec in recipes if rec not in group and not (group and rec in multi)]
+    wr, vr = arrays(rest)
+    f_rest, take_rest = _bounded_knapsack(wr, vr, caps(rest, stock), budget)
+
+    chosen: list[tuple[dict, int]] = []
+    if group:
+        best = (-1, 0, 0, None)
+        wg, vg = arrays(group)
+        for joint_count in range(int(caps(multi, stock).min()) + 1):
+            used = joint_count * sum(rec['weight'] for rec in multi)
+            if used > budget:
+                break
+            left = dict(stock)
+            for rec in multi:
+                for s, n in rec['uses'].items():
+                    left[s] -= n * joint_count
+            f_g, take_g = _bounded_knapsack(wg, vg, caps(group, left), budget - used)
+            # Split the remaining weight between the group and everything else.
+            total = f_g + f_rest[budget - used::-1] + joint_count * sum(rec['gain'] for rec in multi)
+            w = int(np.argmax(total))
+            if total[w] > best[0]:
+                best = (int(total[w]), joint_count, w, take_g)
+        _, joint_count, w, take_g = best
+        used = joint_count * sum(rec['weight'] for rec in multi)
+        chosen += [(rec, joint_count) for rec in multi]
+        chosen += list(zip(group, take_g(w)))
+        chosen += list(zip(rest, take_rest(budget - used - w)))
+    else:
+        chosen += list(zip(rest, take_rest(budget)))
+
+    pickup: dict[str, int] = {}
+    smelt, ingots_out = [], {}
+    for rec, n in chosen:
+        n = int(n)
+        if not n:
+            continue
+        for s, k in rec['uses'].items():
+            pickup[s] = pickup.get(s, 0) + k * n
+        smelt.append({"ingot": rec['ingot'], "sources": dict(rec['uses']), "batches": n,
+                      "ingots": rec['produced'] * n})
+        ingots_out[rec['ingot']] = ingots_out.get(rec['ingot'], 0) + rec['produced'] * n
+    values = {r['Ingot_Name']: r['Ingot_Value'] for r in rows if r['Ingot_Name']}
+    result = {
+        "weight_budget": budget,
+        "objective": target or "gold",
+        "pickup": [{"source": s, "count": n, "weight": n * weights[s]} for s, n in sorted(pickup.items())],
+        "weight": sum(n * weights[s] for s, n in pickup.items()),
+        "smelt": sorted(smelt, key=lambda x: (x['ingot'], sorted(x['sources']))),
+        "ingots": dict(sorted(ingots_out.items())),
+        "gold": sum(n * values[i] for i, n in ingots_out.items()),
+    }
+    if not_smeltable:
+        result["not_smeltable"] = not_smeltable
+    return result
+
+
 # ─── Skyrim homestead ───────────────────────────────────────────────────────
 
 _BUILD_MAT_COLS = [
@@ -667,6 +2649,99 @@ _INGOT_TO_ORE: dict[str, dict[str, int]] = {
 }
 
 
+_HOMESTEAD_CRAFTABLE = ('nails', 'hinge', 'iron_fittings', 'lock')
+_homestead_cache: dict = {}
+_homestead_totals_cache: dict = {}
+
+
+def _homestead_matrix() -> dict:
+    """Load skyrim_homestead_build once as a sparse (COO) locations × materials
+    matrix, plus the component → ingot and ingot → ore linear maps."""
+    key = str(DB_PATH)
+    if _cache_hit(_homestead_cache, key):
+        return _homestead_cache[key]
+    col_list = ', '.join(_BUILD_MAT_COLS)
+    rows = _query(f"SELECT location, {col_list} FROM skyrim_homestead_build")
+    locations = sorted({r['location'] for r in rows})
+    loc_index = {loc: i for i, loc in enumerate(locations)}
+    dense = np.array(
+        [[r[c] or 0 for c in _BUILD_MAT_COLS] for r in rows], dtype=np.int64
+    ).reshape(len(rows), len(_BUILD_MAT_COLS))
+    row_idx, col_idx = np.nonzero(dense)
+    col_of = {c: j for j, c in enumerate(_BUILD_MAT_COLS)}
+
+    comp_rows = _query(
+        "SELECT name, batch_size, iron_ingot, corundum_ingot "
+        "FROM skyrim_homestead_crafted_components"
+    )
+    recipes = {r['name'].replace(' ', '_'): r for r in comp_rows}
+    comps = [c for c in _HOMESTEAD_CRAFTABLE if c in recipes]
+    # comp_to_ingot[i] = (iron, corundum) ingots consumed per forge batch of comps[i]
+    comp_to_ingot = np.array(
+        [[recipes[c]['iron_ingot'], recipes[c]['corundum_ingot']] for c in comps], dtype=np.int64
+    ).reshape(len(comps), 2)
+
+    ingots = list(_INGOT_TO_ORE)
+    ores = list(dict.fromkeys(o for m in _INGOT_TO_ORE.values() for o in m))
+    ingot_to_ore = np.zeros((len(ingots), len(ores)), dtype=np.int64)
+    for i, ingot in enumerate(ingots):
+        for ore, mult in _INGOT_TO_ORE[ingot].items():
+            ingot_to_ore[i, ores.index(ore)] = mult
+
+    matrix = {
+        "locations": locations,
+        "row_location": np.array([loc_index[r['location']] for r in rows], dtype=np.int64),
+        "row_idx": row_idx,
+        "col_idx": col_idx,
+        "values": dense[row_idx, col_idx],
+        "comps": comps,
+        "comp_cols": np.array([col_of[c] for c in comps], dtype=np.int64),
+        "batch_size": np.array([recipes[c]['batch_size'] for c in comps], dtype=np.int64),
+        "comp_to_ingot": comp_to_ingot,
+        "ingot_cols": np.array([col_of[c] for c in ingots], dtype=np.int64),
+        "ores": ores,
+        "ingot_to_ore": ingot_to_ore,
+    }
+    _homestead_cache[key] = matrix
+    return matrix
+
+
+def _homestead_prefix_match(location: str, prefix: str) -> bool:
+    """SQL LIKE '<prefix>%' semantics: case-insensitive, '_' matches any one character."""
+    prefix = prefix.replace(' ', '_').lower()
+    location = location.lower()
+    return len(location) >= len(prefix) and all(
+        p == '_' or p == c for p, c in zip(prefix, location)
+    )
+
+
+def _homestead_totals(location_list: list[str]) -> tuple[int, np.ndarray]:
+    """Return (row_count, material totals) for a location set, cached per set."""
+    m = _homestead_matrix()
+    key = (str(DB_PATH), tuple(sorted({p.replace(' ', '_').lower() for p in location_list})))
+    if _cache_hit(_homestead_totals_cache, key):
+        return _homestead_totals_cache[key]
+    if location_list:
+        loc_mask = np.array([
+            any(_homestead_prefix_match(loc, p) for p in location_list) for loc in m["locations"]
+        ], dtype=bool)
+        row_mask = loc_mask[m["row_location"]] if len(loc_mask) else np.zeros(0, dtype=bool)
+    else:
+        row_mask = np.ones(len(m["row_location"]), dtype=bool)
+    keep = row_mask[m["row_idx"]]
+    totals = np.bincount(
+        m["col_idx"][keep], weights=m["values"][keep], minlength=len(_BUILD_MAT_COLS)
+    ).astype(np.int64)
+    if len(_homestead_totals_cache) >= 1024:
+        _homestead_totals_cache.clear()
+    _homestead_totals_cache[key] = (int(row_mask.sum()), totals)
+    return _homestead_totals_cache[key]
+
+
+def _homestead_nonzero(totals: np.ndarray) -> dict[str, int]:
+    return {c: int(v) for c, v in zip(_BUILD_MAT_COLS, totals) if v}
+
+
 def skyrim_homestead_locations() -> list[str]:
     rows = _query("SELECT DISTINCT location FROM skyrim_homestead_build ORDER BY location")
     return [r['location'] for r in rows]
@@ -726,22 +2801,9 @@ def skyrim_homestead_manifest(
             location_list = ['Small House'] + location_list
             auto_included.append('Small House (prerequisite for Main Hall)')
 
-    if location_list:
-        conds = ' OR '.join(f"location LIKE :loc{i}" for i in range(len(location_list)))
-        q_params: dict = {f'loc{i}': f'{p.replace(" ", "_")}%' for i, p in enumerate(location_list)}
-        where = f"WHERE ({conds})"
-    else:
-        q_params = {}
-        where = ""
-
-    col_list = ', '.join(_BUILD_MAT_COLS)
-    rows = _query(
-        f"SELECT section, location, {col_list} FROM skyrim_homestead_build "
-        f"{where} ORDER BY location, section",
-        q_params,
-    )
+    row_count, cached = _homestead_totals(location_list)
 
-    if not rows:
+    if not row_count:
         return {
             "level": level,
             "locations_queried": location_list or ["(all)"],
@@ -750,13 +2812,6 @@ def skyrim_homestead_manifest(
             "note": "No rows matched. Verify location prefix with skyrim_homestead_locations().",
         }
 
-    totals: dict[str, int] = {}
-    for row in rows:
-        for col in _BUILD_MAT_COLS:
-            v = row.get(col) or 0
-            if v:
-                totals[col] = totals.get(col, 0) + v
-
     _LEVEL_DESC = {
         1: "Component level — raw build quantities; crafted components listed as-is",
         2: "Ingot level — crafted components expanded to ingots via forge batch recipes",
@@ -767,56 +2822,40 @@ def skyrim_homestead_manifest(
         "level": level,
         "description": _LEVEL_DESC[level],
         "locations_queried": location_list or ["(all)"],
-        "row_count": len(rows),
+        "row_count": row_count,
     }
     if auto_included:
         result["auto_included"] = auto_included
 
+    totals = cached.copy()
     if level == 1:
-        result["materials"] = {k: v for k, v in totals.items() if v}
+        result["materials"] = _homestead_nonzero(totals)
         return result
 
-    comp_rows = _query(
-        "SELECT name, batch_size, iron_ingot, corundum_ingot "
-        "FROM skyrim_homestead_crafted_components"
-    )
-    recipes = {r['name'].replace(' ', '_'): r for r in comp_rows}
-    craftable = ('nails', 'hinge', 'iron_fittings', 'lock')
+    # Level 2: batches = ceil(needed / batch_size); ingots = batches · comp_to_ingot
+    m = _homestead_matrix()
+    needed = totals[m["comp_cols"]]
+    batches = -(-needed // m["batch_size"])
+    ingots_used = batches[:, None] * m["comp_to_ingot"]
+    totals[m["comp_cols"]] = 0
+    totals[_BUILD_MAT_COLS.index('iron_ingot')] += ingots_used[:, 0].sum()
+    totals[_BUILD_MAT_COLS.index('corundum_ingot')] += ingots_used[:, 1].sum()
 
     batch_info: dict[str, dict] = {}
-    extra_iron = 0
-    extra_corundum = 0
-
-    for comp in craftable:
-        needed = totals.pop(comp, 0)
-        if not needed:
+    for i, comp in enumerate(m["comps"]):
+        if not needed[i]:
             continue
-        rec = recipes.get(comp)
-        if not rec:
-            continue
-        bs = rec['batch_size']
-        batches = math.ceil(needed / bs)
-        produced = batches * bs
-        waste = produced - needed
-        iron_used = batches * rec['iron_ingot']
-        corundum_used = batches * rec['corundum_ingot']
-        extra_iron += iron_used
-        extra_corundum += corundum_used
+        produced = int(batches[i] * m["batch_size"][i])
         batch_info[comp] = {
-            'needed': needed,
-            'batches': batches,
+            'needed': int(needed[i]),
+            'batches': int(batches[i]),
             'produced': produced,
-            'waste': waste,
-            'iron_ingot_consumed': iron_used,
-            'corundum_ingot_consumed': corundum_used,
+            'waste': produced - int(needed[i]),
+            'iron_ingot_consumed': int(ingots_used[i, 0]),
+            'corundum_ingot_consumed': int(ingots_used[i, 1]),
         }
 
-    if extra_iron:
-        totals['iron_ingot'] = totals.get('iron_ingot', 0) + extra_iron
-    if extra_corundum:
-        totals['corundum_ingot'] = totals.get('corundum_ingot', 0) + extra_corundum
-
-    result["materials"] = {k: v for k, v in totals.items() if v}
+    result["materials"] = _homestead_nonzero(totals)
     if batch_info:
         result["batch_info"] = batch_info
         result["note"] = (
@@ -828,27 +2867,24 @@ def skyrim_homestead_manifest(
         return result
 
     # Level 3: convert ingots to ores
-    steel_count = totals.get('steel_ingot', 0)
-    ore_notes: list[str] = []
-
-    for col, ore_map in _INGOT_TO_ORE.items():
-        qty = totals.pop(col, 0)
-        if not qty:
-            continue
-        for ore_name, mult in ore_map.items():
-            totals[ore_name] = totals.get(ore_name, 0) + qty * mult
+    steel_count = int(totals[_BUILD_MAT_COLS.index('steel_ingot')])
+    ore_qty = totals[m["ingot_cols"]] @ m["ingot_to_ore"]
+    totals[m["ingot_cols"]] = 0
+    materials = _homestead_nonzero(totals)
+    strips = materials.pop('leather_strips', 0)
+    materials.update({ore: int(q) for ore, q in zip(m["ores"], ore_qty) if q})
 
+    ore_notes: list[str] = []
     if steel_count:
         ore_notes.append(
             f"Steel Ingot: each of the {steel_count} steel ingots contributes "
             f"1 Iron Ore and 1 Corundum Ore — both ore totals above include this."
         )
 
-    strips = totals.pop('leather_strips', 0)
     if strips:
         leather = math.ceil(strips / 4)
         waste_strips = leather * 4 - strips
-        totals['leather'] = totals.get('leather', 0) + leather
+        materials['leather'] = materials.get('leather', 0) + leather
         ore_notes.append(
             f"Leather strips: {strips} strips → {leather} leather "
             f"(4 strips per leather at the tanning rack"
@@ -856,13 +2892,206 @@ def skyrim_homestead_manifest(
             + ")"
         )
 
-    result["materials"] = {k: v for k, v in totals.items() if v}
+    result["materials"] = materials
     if ore_notes:
         result["ore_notes"] = ore_notes
 
     return result
 
 
+# Room → prerequisite rooms (skyrim_homestead.md).  Entryway waits for the whole Main
+# Hall, including Main_Hall_Upstairs furnishings, so the Entry Hall ordering rule holds.
+_HOMESTEAD_ROOMS: dict[str, tuple[str, ...]] = {
+    'Small House': (),
+    'Main Hall': ('Small House',),
+    'Entryway': ('Main Hall',),
+    'Cellar': ('Main Hall',),
+    'West_Wing': ('Main Hall',),
+    "West_Wing_Enchanter's_Tower": ('West_Wing',),
+    'West_Wing_Bedrooms': ('West_Wing',),
+    'West_Wing_Greenhouse': ('West_Wing',),
+    'North_Wing': ('Main Hall',),
+    'North_Wing_Trophy_Room': ('North_Wing',),
+    'North_Wing_Storage_Room': ('North_Wing',),
+    'North_Wing_Alchemy_Laboratory': ('North_Wing',),
+    'East_Wing': ('Main Hall',),
+    'East_Wing_Library': ('East_Wing',),
+    'East_Wing_Armory': ('East_Wing',),
+    'East_Wing_Kitchen': ('East_Wing',),
+    'Exterior': (),
+}
+
+
+def _homestead_room(location: str) -> str | None:
+    """Longest room prefix that a build-table location falls under."""
+    matches = [r for r in _HOMESTEAD_ROOMS if _homestead_prefix_match(location, r)]
+    return max(matches, key=len) if matches else None
+
+
+def skyrim_homestead_plan(
+    locations: str,
+    stockpile: dict | None = None,
+    built: str | None = None,
+    prices: dict | None = None,
+) -> dict:
+    location_list = [loc.strip() for loc in (locations or '').split(',') if loc.strip()]
+    if not location_list:
+        return {"error": "locations is required (comma-separated location prefixes)"}
+    built_rooms: set[str] = set()
+    for b in (built or '').split(','):
+        if b.strip():
+            room = _homestead_room(b.strip())
+            if room is None:
+                return {"error": f"Unknown room '{b.strip()}' in built"}
+            built_rooms.add(room)
+
+    stock = np.zeros(len(_BUILD_MAT_COLS), dtype=np.int64)
+    for name, qty in (stockpile or {}).items():
+        col = name.strip().lower().replace(' ', '_')
+        if col not in _BUILD_MAT_COLS:
+            return {"error": f"Unknown stockpile material '{name}'. Use build-table column names "
+                             f"such as sawn_log, quarried_stone, iron_ingot, nails."}
+        stock[_BUILD_MAT_COLS.index(col)] += int(qty)
+
+    m = _homestead_matrix()
+    loc_room = [_homestead_room(loc) for loc in m["locations"]]
+    requested = np.array([
+        any(_homestead_prefix_match(loc, p) for p in location_list) for loc in m["locations"]
+    ], dtype=bool)
+
+    rooms = list(dict.fromkeys(r for r, hit in zip(loc_room, requested) if hit and r not in built_rooms))
+    if not rooms:
+        return {"error": "No unbuilt rooms matched. Verify location prefix with skyrim_homestead_locations()."}
+
+    # Pull in missing prerequisite rooms (all of their locations), as the manifest does
+    # for Small House.
+    auto_included: list[str] = []
+    i = 0
+    while i < len(rooms):
+        for pre in _HOMESTEAD_ROOMS[rooms[i]]:
+            if pre not in rooms and pre not in built_rooms:
+                rooms.append(pre)
+                auto_included.append(f"{pre} (prerequisite for {rooms[i]})")
+                requested |= np.array([r == pre for r in loc_room], dtype=bool)
+        i += 1
+    for wing in ('West_Wing', 'North_Wing', 'East_Wing'):
+        picked = [r for r in rooms if r.startswith(wing + '_')]
+        if len(picked) > 1:
+            return {"error": f"Only one {wing} room can be built; got {', '.join(picked)}"}
+
+    n = len(rooms)
+    index = {r: k for k, r in enumerate(rooms)}
+    pre_mask = [sum(1 << index[p] for p in _HOMESTEAD_ROOMS[r] if p in index) for r in rooms]
+
+    # Per-room level-1 vectors from the sparse matrix, restricted to requested locations.
+    row_room = np.array([index.get(loc_room[li], -1) if requested[li] else -1
+                         for li in m["row_location"]], dtype=np.int64)
+    entry_room = row_room[m["row_idx"]]
+    keep = entry_room >= 0
+    room_vecs = np.zeros((n, len(_BUILD_MAT_COLS)), dtype=np.int64)
+    np.add.at(room_vecs, (entry_room[keep], m["col_idx"][keep]), m["values"][keep])
+
+    # Cumulative need for every subset, built incrementally: need[S] = need[S - low] + room[low].
+    size = 1 << n
+    need = np.zeros((size, len(_BUILD_MAT_COLS)), dtype=np.int64)
+    for s in range(1, size):
+        low = (s & -s).bit_length() - 1
+        need[s] = need[s & (s - 1)] + room_vecs[low]
+
+    # Level-2 deficit for every subset: forge only what the stockpile lacks, in whole batches.
+    comp_cols = m["comp_cols"]
+    to_forge = np.maximum(need[:, comp_cols] - stock[comp_cols], 0)
+    batches = -(-to_forge // m["batch_size"])
+    direct = need.copy()
+    direct[:, comp_cols] = 0
+    ingots = batches @ m["comp_to_ingot"]
+    direct[:, _BUILD_MAT_COLS.index('iron_ingot')] += ingots[:, 0]
+    direct[:, _BUILD_MAT_COLS.index('corundum_ingot')] += ingots[:, 1]
+    stock_direct = stock.copy()
+    stock_direct[comp_cols] = 0
+    deficit = np.maximum(direct - stock_direct, 0)
+
+    # DP over prerequisite-closed subsets: fewest gathering stops, then fewest forge sessions.
+    inf = (n + 1, n + 1)
+    best: list[tuple[int, int]] = [inf] * size
+    last = [-1] * size
+    best[0] = (0, 0)
+    for s in range(1, size):
+        for k in range(n):
+            prev = s & ~(1 << k)
+            if not s >> k & 1 or best[prev] == inf or pre_mask[k] & ~prev:
+                continue
+            cost = (
+                best[prev][0] + bool((deficit[s] != deficit[prev]).any()),
+                best[prev][1] + bool((batches[s] != batches[prev]).any()),
+            )
+            if cost < best[s]:
+                best[s], last[s] = cost, k
+    order: list[int] = []
+    s = size - 1
+    while s:
+        order.append(last[s])
+        s &= ~(1 << last[s])
+    order.reverse()
+
+    steward = {r['room']: r['gold_cost'] for r in _query(
+        "SELECT room, gold_cost FROM skyrim_homestead_steward_cost"
+    )}
+    unit = _smithing_unit_prices(prices)
+    unit_price = np.array([unit.get(c, np.nan) for c in _BUILD_MAT_COLS])
+    stages: list[dict] = []
+    prev = 0
+    for step, k in enumerate(order, start=1):
+        s = prev | (1 << k)
+        gather = deficit[s] - deficit[prev]
+        forged = batches[s] - batches[prev]
+        produced = batches[s] * m["batch_size"] + stock[comp_cols]
+        gold = steward.get(rooms[k])
+        short = gather > 0
+        unpriced = [c for c, q, u in zip(_BUILD_MAT_COLS, gather, unit_price) if q > 0 and np.isnan(u)]
+        gather_gold = round(float(np.nansum(gather[short] * unit_price[short])), 2)
+        # gather_gold is a lower bound while anything is unpriced, so it can only
+        # rule gathering out.
+        if not short.any():
+            advice = "build"
+        elif gold is None:
+            advice = "gather"
+        elif gather_gold > gold:
+            advice = "steward"
+        elif unpriced:
+            advice = "compare"
+        else:
+            advice = "gather"
+        stages.append({
+            "stage": step,
+            "room": rooms[k],
+            "materials": _homestead_nonzero(room_vecs[k]),
+            "forge_batches": {c: int(b) for c, b in zip(m["comps"], forged) if b},
+            "gather": _homestead_nonzero(gather),
+            "leftover_components": {c: int(v) for c, v in zip(
+                m["comps"], produced - need[s, comp_cols]) if v > 0},
+            "steward_gold": gold,
+            "gather_gold": gather_gold,
+            "unpriced": unpriced,
+            "recommendation": advice,
+        })
+        prev = s
+
+    # Forge batches saved by carrying leftovers between stages instead of forging per room.
+    bs = m["batch_size"]
+    per_room = int((-(-room_vecs[:, comp_cols] // bs)).sum())
+    carried = int((-(-room_vecs[:, comp_cols].sum(axis=0) // bs)).sum())
+    return {
+        "order": [rooms[k] for k in order],
+        "auto_included": auto_included,
+        "gather_stops": best[size - 1][0],
+        "stages": stages,
+        "total_forge_batches": {c: int(b) for c, b in zip(m["comps"], batches[size - 1]) if b},
+        "batches_saved": per_room - carried,
+        "total_gather": _homestead_nonzero(deficit[size - 1]),
+    }
+
+
 # ─── Tool registry ──────────────────────────────────────────────────────────
 
 # Maps tool name → (function, input_schema)
@@ -872,6 +3101,23 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
     "list_tables": (list_tables, {
         "type": "object", "properties": {}, "required": []
     }),
+    "tes_effect_equivalents": (tes_effect_equivalents, {
+        "type": "object",
+        "properties": {
+            "effect": {"type": "string", "description": "Effect name from any TES game, e.g. 'Fortify Smithing'"},
+            "game": {"type": "string", "enum": ["morrowind", "oblivion", "skyrim"],
+                     "description": "Optional: only return this game's equivalents"},
+        },
+        "required": ["effect"],
+    }),
+    "effect_profile": (effect_profile, {
+        "type": "object",
+        "properties": {
+            "game": {"type": "string", "enum": ["morrowind", "oblivion", "skyrim"]},
+            "effect": {"type": "string", "description": "Effect name, e.g. 'Fortify Health'"},
+        },
+        "required": ["game", "effect"],
+    }),
     # ── Skyrim alchemy
     "skyrim_alchemy_ingredient": (skyrim_alchemy_ingredient, {
         "type": "object",
@@ -899,6 +3145,15 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
     "skyrim_alchemy_perks": (skyrim_alchemy_perks, {
         "type": "object", "properties": {}, "required": []
     }),
+    "skyrim_alchemy_recipes": (skyrim_alchemy_recipes, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "string"}, "description": "Effect names (case-insensitive)"},
+            "exact": {"type": "boolean", "description": "True: exactly these effects; false: at least these effects"},
+            "limit": {"type": "integer", "description": "Maximum recipes to return (default 50)"},
+        },
+        "required": ["effects"],
+    }),
     # ── Oblivion alchemy
     "oblivion_alchemy_ingredient": (oblivion_alchemy_ingredient, {
         "type": "object",
@@ -928,6 +3183,24 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         "properties": {"apparatus_type": {"type": "string", "description": "Partial type keyword: Mortar, Retort, Alembic, or Calcinator"}},
         "required": [],
     }),
+    "oblivion_alchemy_recipes": (oblivion_alchemy_recipes, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "string"}, "description": "Effect names (case-insensitive)"},
+            "exact": {"type": "boolean", "description": "True: exactly these effects; false: at least these effects"},
+            "limit": {"type": "integer", "description": "Maximum recipes to return (default 50)"},
+        },
+        "required": ["effects"],
+    }),
+    "oblivion_potion_strength": (oblivion_potion_strength, {
+        "type": "object",
+        "properties": {
+            "effect": {"type": "string", "description": "Oblivion alchemy effect, e.g. 'Restore Health'"},
+            "apparatus_tier": {"type": "string", "enum": ["Novice", "Apprentice", "Journeyman", "Expert", "Master"]},
+            "mastery": {"type": "string", "enum": ["Novice", "Apprentice", "Journeyman", "Expert", "Master"]},
+        },
+        "required": ["effect"],
+    }),
     # ── Morrowind alchemy
     "morrowind_alchemy_ingredient": (morrowind_alchemy_ingredient, {
         "type": "object",
@@ -957,6 +3230,23 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         "properties": {"apparatus_type": {"type": "string"}},
         "required": [],
     }),
+    "morrowind_alchemy_recipes": (morrowind_alchemy_recipes, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "string"}, "description": "Effect names (case-insensitive)"},
+            "exact": {"type": "boolean", "description": "True: exactly these effects; false: at least these effects"},
+            "limit": {"type": "integer", "description": "Maximum recipes to return (default 50)"},
+        },
+        "required": ["effects"],
+    }),
+    "morrowind_alchemy_enchant_loop": (morrowind_alchemy_enchant_loop, {
+        "type": "object",
+        "properties": {
+            "profiles": {"type": "array", "items": {"type": "object"}, "description": "Character profiles: alchemy, intelligence, luck, enchant, mortar_quality, retort_quality, calcinator_quality, potions_per_round, fortified_intelligence, gear_item, gear_slots, soul_size, min_success (omitted keys use defaults)"},
+            "max_iterations": {"type": "integer", "description": "Rounds to simulate (default 20)"},
+        },
+        "required": ["profiles"],
+    }),
     # ── Morrowind enchanting
     "morrowind_enchant_magic_effects": (morrowind_enchant_magic_effects, {
         "type": "object",
@@ -974,6 +3264,22 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
     "morrowind_enchant_soul_gems": (morrowind_enchant_soul_gems, {
         "type": "object", "properties": {}, "required": []
     }),
+    "morrowind_soul_gem_allocation": (morrowind_soul_gem_allocation, {
+        "type": "object",
+        "properties": {
+            "souls": {
+                "type": "object",
+                "description": "Creature name to count, e.g. {\"Golden Saint\": 2}; a bare number is a soul size",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+            "gems": {
+                "type": "object",
+                "description": "Soul gem name to count, e.g. {\"Grand Soul Gem\": 3}",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+        },
+        "required": ["souls", "gems"],
+    }),
     "morrowind_enchant_item": (morrowind_enchant_item, {
         "type": "object",
         "properties": {
@@ -983,6 +3289,20 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         },
         "required": [],
     }),
+    "morrowind_enchant_optimize": (morrowind_enchant_optimize, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "object"}, "description": "Effects: {effect, min_magnitude, max_magnitude, duration, area, range (self/touch/target), weight}"},
+            "enchant_type": {"type": "string", "description": "constant (CE), cast_when_used (CWU), or cast_when_strikes (CWS)"},
+            "item": {"type": "string", "description": "Exact item name to enchant"},
+            "category": {"type": "string", "description": "weapon, armor, or clothing: search for the cheapest host"},
+            "item_type": {"type": "string", "description": "Narrow a category search, e.g. Ring, Shield, Shirt"},
+            "soul": {"type": "string", "description": "Creature whose soul is used"},
+            "soul_size": {"type": "integer", "description": "Soul size, instead of soul"},
+            "objective": {"type": "string", "description": "total (default), balanced, or min_points"},
+        },
+        "required": ["effects", "enchant_type"],
+    }),
     # ── Oblivion enchanting
     "oblivion_enchant_effects": (oblivion_enchant_effects, {
         "type": "object",
@@ -997,6 +3317,22 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         "properties": {"name": {"type": "string"}},
         "required": [],
     }),
+    "oblivion_soul_gem_allocation": (oblivion_soul_gem_allocation, {
+        "type": "object",
+        "properties": {
+            "souls": {
+                "type": "object",
+                "description": "Creature name to count, e.g. {\"Golden Saint\": 2}; a bare number is a soul size",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+            "gems": {
+                "type": "object",
+                "description": "Soul gem name to count, e.g. {\"Grand Soul Gem\": 3}",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+        },
+        "required": ["souls", "gems"],
+    }),
     "oblivion_sigil_stone": (oblivion_sigil_stone, {
         "type": "object",
         "properties": {
@@ -1006,6 +3342,20 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         },
         "required": [],
     }),
+    "oblivion_enchant_plan": (oblivion_enchant_plan, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "string"}},
+            "item_type": {"type": "string", "description": "weapon or apparel (default weapon)"},
+            "level": {"type": "string", "description": "descendent/subjacent/latent/ascendent/transcendent"},
+            "magnitude": {"type": "number", "description": "Weapon only: fixed magnitude instead of the max under the charge cap"},
+            "rank_by": {"type": "string", "description": "magnitude, charges, or gold (default magnitude)"},
+        },
+        "required": ["effects"],
+    }),
+    "oblivion_enchant_exclusive_effects": (oblivion_enchant_exclusive_effects, {
+        "type": "object", "properties": {}, "required": []
+    }),
     # ── Skyrim enchanting
     "skyrim_enchant_perks": (skyrim_enchant_perks, {
         "type": "object", "properties": {}, "required": []
@@ -1031,11 +3381,77 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         "properties": {"name": {"type": "string"}},
         "required": [],
     }),
+    "skyrim_soul_gem_allocation": (skyrim_soul_gem_allocation, {
+        "type": "object",
+        "properties": {
+            "souls": {
+                "type": "object",
+                "description": "Creature name to count, e.g. {\"Golden Saint\": 2}; a bare number is a soul size",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+            "gems": {
+                "type": "object",
+                "description": "Soul gem name to count, e.g. {\"Grand Soul Gem\": 3}",
+                "additionalProperties": {"type": "integer", "minimum": 0},
+            },
+        },
+        "required": ["souls", "gems"],
+    }),
     "skyrim_enchant_disenchant": (skyrim_enchant_disenchant, {
         "type": "object",
         "properties": {"effect": {"type": "string", "description": "Partial enchantment effect name"}},
         "required": ["effect"],
     }),
+    "skyrim_disenchant_route": (skyrim_disenchant_route, {
+        "type": "object",
+        "properties": {
+            "effects": {"type": "array", "items": {"type": "string"}, "description": "Effects to learn; omit for all"},
+            "item_type": {"type": "string", "enum": ["apparel", "weapon"]},
+            "exclude_notes": {
+                "type": "array", "items": {"type": "string"},
+                "description": "Skip items whose note contains any of these, e.g. [\"quest\", \"Creation Club\"]",
+            },
+            "exclude_unique": {"type": "boolean", "description": "Only generic loot items"},
+        },
+    }),
+    "skyrim_enchant_calculator": (skyrim_enchant_calculator, {
+        "type": "object",
+        "properties": {
+            "effect": {"type": "string", "description": "Weapon or apparel enchantment name (exact, case-insensitive)"},
+            "base_magnitude": {"type": "number", "description": "Enchanting-table hover magnitude; omit for a multiplier"},
+            "skill": {"type": "integer", "description": "Enchanting skill 0-100; omit to sweep 15-100"},
+            "enchanter_rank": {"type": "integer", "description": "Enchanter perk ranks 0-5; omit to sweep"},
+            "soul_gem": {"type": "string", "description": "Soul gem name; omit to sweep Petty..Grand"},
+            "patched": {"type": "boolean", "description": "Unofficial Patch formula; omit to return both"},
+            "potion_magnitude": {"type": "number", "description": "Fortify Enchanting potion percent (32 for +32%)"},
+            "specific_perk": {"type": "boolean", "description": "Fire/Frost/Storm/Insightful/Corpus Enchanter applies"},
+            "seeker_of_sorcery": {"type": "boolean"},
+            "elemental_destruction_rank": {"type": "integer", "description": "Augmented Flames/Frost/Shock rank 0-2 (weapons)"},
+            "ahzidal_genius": {"type": "boolean"},
+            "haunting_gift": {"type": "integer", "description": "Haunting Gift bonus (stacks × 10)"},
+            "skill_step": {"type": "integer", "description": "Skill increment when sweeping (default 5)"},
+        },
+        "required": ["effect"],
+    }),
+    "skyrim_enchant_charge_table": (skyrim_enchant_charge_table, {
+        "type": "object",
+        "properties": {
+            "effect": {"type": "string", "description": "Weapon or apparel enchantment name"},
+            "skill": {"type": "integer", "description": "Enchanting skill, 15–100 in steps of 5"},
+            "enchanter_rank": {"type": "integer", "description": "Enchanter perk rank 0–5"},
+            "soul_gem": {"type": "string", "description": "Petty/Lesser/Common/Greater/Grand Soul Gem"},
+            "patched": {"type": "boolean", "description": "Unofficial Skyrim Patch formula"},
+        },
+        "required": ["effect"],
+    }),
+    "skyrim_alchemy_enchant_loop": (skyrim_alchemy_enchant_loop, {
+        "type": "object",
+        "properties": {
+            "profiles": {"type": "array", "items": {"type": "object"}, "description": "Character profiles: alchemy_skill, alchemist_rank, benefactor, seeker_of_shadows, enchanting_skill, enchanter_rank, insightful_enchanter, seeker_of_sorcery, fortify_alchemy_slots, starting_fortify_alchemy, patched (omitted keys use a fully-perked default)"},
+            "max_iterations": {"type": "integer", "description": "Loop rounds to simulate (default 10)"},
+        },
+        "required": ["profiles"],
+    }),
     # ── Skyrim smithing
     "skyrim_smithing_perks": (skyrim_smithing_perks, {
         "type": "object", "properties": {}, "required": []
@@ -1072,6 +3488,51 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         },
         "required": [],
     }),
+    "skyrim_smithing_plan": (skyrim_smithing_plan, {
+        "type": "object",
+        "properties": {
+            "pieces": {"type": "array", "items": {"type": "string"}, "description": "Exact piece names; repeat to craft more than one"},
+            "perk": {"type": "string", "description": "Material perk; adds every armor and weapon piece it unlocks"},
+            "quality": {"type": "string", "description": "Target tempering quality (default Legendary)"},
+        },
+        "required": [],
+    }),
+    "skyrim_smithing_set_totals": (skyrim_smithing_set_totals, {
+        "type": "object",
+        "properties": {
+            "perk": {"type": "string", "description": "Exact material perk, e.g. 'Ebony Smithing'"},
+            "quality": {"type": "string", "description": "Improvement quality (default Legendary)"},
+        },
+        "required": ["perk"],
+    }),
+    "skyrim_smithing_leveling": (skyrim_smithing_leveling, {
+        "type": "object",
+        "properties": {
+            "current_skill": {"type": "integer"},
+            "target_skill": {"type": "integer", "description": "Default 100"},
+            "gold_budget": {"type": "number", "description": "Report the skill this much gold reaches"},
+            "prices": {
+                "type": "object",
+                "description": "Gold per unit by material, e.g. {\"Leather Strips\": 0} for owned stock",
+                "additionalProperties": {"type": "number"},
+            },
+            "improve": {"type": "boolean", "description": "Include craft-and-improve actions (default true)"},
+        },
+        "required": ["current_skill"],
+    }),
+    "skyrim_salvage_plan": (skyrim_salvage_plan, {
+        "type": "object",
+        "properties": {
+            "weight_budget": {"type": "integer", "description": "Carry weight available for raw sources"},
+            "available": {
+                "type": "object",
+                "description": "Source name to count on hand, e.g. {\"Solid Dwemer Metal\": 4}; omit for unlimited",
+                "additionalProperties": {"type": "integer"},
+            },
+            "ingot": {"type": "string", "description": "Maximize this ingot's count; omit to maximize gold value"},
+        },
+        "required": ["weight_budget"],
+    }),
     # ── Skyrim homestead
     "skyrim_homestead_locations": (skyrim_homestead_locations, {
         "type": "object", "properties": {}, "required": []
@@ -1104,62 +3565,123 @@ TOOL_MAP: dict[str, tuple[Any, dict]] = {
         },
         "required": [],
     }),
+    "skyrim_homestead_plan": (skyrim_homestead_plan, {
+        "type": "object",
+        "properties": {
+            "locations": {"type": "string", "description": "Comma-separated location prefixes to build"},
+            "stockpile": {
+                "type": "object",
+                "description": "Materials on hand keyed by build-table column, e.g. {\"sawn_log\": 20}",
+                "additionalProperties": {"type": "integer"},
+            },
+            "built": {"type": "string", "description": "Comma-separated rooms already built"},
+            "prices": {
+                "type": "object",
+                "description": "Gold per unit keyed by build-table column, e.g. {\"sawn_log\": 10}; "
+                               "ingots default to smelted-ore cost",
+                "additionalProperties": {"type": "number"},
+            },
+        },
+        "required": ["locations"],
+    }),
 }
 
 # Flat list of tool definitions for Anthropic API
 TOOLS: list[dict] = []
 _TOOL_DESCRIPTIONS: dict[str, str] = {
     "list_tables": "List all tables in the TES GameTools database.",
+    "tes_effect_equivalents": "Map an effect name to its equivalent effects in Morrowind, Oblivion, and Skyrim.",
+    "effect_profile": "Everything about one effect in one game: ingredients, base stats, enchant slots, disenchant sources, perks, sigil stones.",
     "skyrim_alchemy_ingredient": "Return weight, value, and effects for a named Skyrim alchemy ingredient.",
     "skyrim_alchemy_search": "Search Skyrim alchemy ingredients by partial name.",
     "skyrim_alchemy_find_by_effect": "Return all Skyrim ingredients carrying a given effect.",
     "skyrim_alchemy_combos": "Given Skyrim ingredient names, return all pairs that share an effect.",
     "skyrim_alchemy_list_effects": "Return all 60 distinct Skyrim alchemy effects.",
     "skyrim_alchemy_perks": "Return the Skyrim alchemy perk tree.",
+    "skyrim_alchemy_recipes": "Return materialized 2-/3-ingredient Skyrim recipes yielding exactly (or at least) the given effects.",
     "oblivion_alchemy_ingredient": "Return weight, value, and effects for a named Oblivion alchemy ingredient.",
     "oblivion_alchemy_search": "Search Oblivion alchemy ingredients by partial name.",
     "oblivion_alchemy_find_by_effect": "Return all Oblivion ingredients carrying a given effect.",
     "oblivion_alchemy_combos": "Given Oblivion ingredient names, return all pairs that share an effect.",
     "oblivion_alchemy_list_effects": "Return all distinct Oblivion alchemy effects.",
     "oblivion_alchemy_apparatus": "Return Oblivion alchemy apparatus with grade and strength.",
+    "oblivion_alchemy_recipes": "Return materialized 2-/3-ingredient Oblivion recipes yielding exactly (or at least) the given effects.",
+    "oblivion_potion_strength": "Precomputed Oblivion potion magnitude, duration, and price by apparatus tier and mastery rank.",
     "morrowind_alchemy_ingredient": "Return weight, value, and effects for a named Morrowind alchemy ingredient (hidden effects included).",
     "morrowind_alchemy_search": "Search Morrowind alchemy ingredients by partial name.",
     "morrowind_alchemy_find_by_effect": "Return all Morrowind ingredients carrying a given effect (hidden included).",
     "morrowind_alchemy_combos": "Given Morrowind ingredient names, return all pairs that share an effect.",
     "morrowind_alchemy_list_effects": "Return all distinct Morrowind alchemy effects.",
     "morrowind_alchemy_apparatus": "Return Morrowind alchemy apparatus with quality values.",
+    "morrowind_alchemy_recipes": "Return materialized 2-/3-ingredient Morrowind recipes yielding exactly (or at least) the given effects.",
+    "morrowind_alchemy_enchant_loop": "Simulate the Morrowind alchemy-enchant loop (Fortify Intelligence potions, then Constant Effect gear) to its limit for one or many profiles.",
     "morrowind_enchant_magic_effects": "Return Morrowind magic effects with base_cost and school. Optional name/school filter.",
     "morrowind_enchant_souls": "Return Morrowind creature soul sizes. Optional partial name filter.",
     "morrowind_enchant_soul_gems": "Return Morrowind soul gem types with weight, value, and capacity.",
+    "morrowind_soul_gem_allocation": "Assign Morrowind souls to soul gems for the most charge and least wasted capacity.",
     "morrowind_enchant_item": "Search enchantable Morrowind items by name, type, or minimum enchantment capacity.",
+    "morrowind_enchant_optimize": "Optimize magnitudes for a multi-effect Morrowind enchantment under compounding cost, item capacity and soul size; find the cheapest host item.",
     "oblivion_enchant_effects": "Return Oblivion enchantment effects with base_cost and barter_factor.",
     "oblivion_enchant_souls": "Return Oblivion creature soul sizes (150/300/800/1200/1600).",
+    "oblivion_soul_gem_allocation": "Assign Oblivion souls to soul gems for the most charge and least wasted capacity.",
     "oblivion_sigil_stone": "Return Oblivion sigil stones with weapon/armor effects and magnitudes.",
+    "oblivion_enchant_plan": "Rank Oblivion sigil stone and altar options for target effects on a weapon or apparel by magnitude, charges, or gold.",
+    "oblivion_enchant_exclusive_effects": "Return Oblivion effects available only via sigil stones, only at the altar, or both.",
     "skyrim_enchant_perks": "Return the Skyrim enchanting perk tree.",
     "skyrim_enchant_weapon_effects": "Return Skyrim weapon enchantment effects with school and base_cost.",
     "skyrim_enchant_apparel_effects": "Return Skyrim apparel enchantments with equip-slot flags and base_cost.",
     "skyrim_enchant_soul_gems": "Return Skyrim soul gem types with capacity and trappable souls.",
     "skyrim_enchant_souls": "Return Skyrim creature soul sizes. Souls of 3000 are black souls.",
+    "skyrim_soul_gem_allocation": "Assign Skyrim souls to soul gems for the most charge and least wasted capacity.",
     "skyrim_enchant_disenchant": "Return items to disenchant to learn a given enchantment effect.",
+    "skyrim_disenchant_route": "Fewest, easiest-to-find items to disenchant to learn a set of Skyrim enchantments.",
+    "skyrim_enchant_calculator": "Compute Skyrim enchantment magnitude, charges per use, and uses per soul for one point or a skill × perk × soul gem × patch grid.",
+    "skyrim_enchant_charge_table": "Precomputed Skyrim enchant magnitude/charges/uses grid by skill, Enchanter rank, soul gem, and patch.",
+    "skyrim_alchemy_enchant_loop": "Simulate the Skyrim Fortify Enchanting ↔ Fortify Alchemy loop to its fixed point for one or many profiles.",
     "skyrim_smithing_perks": "Return the Skyrim smithing perk tree.",
     "skyrim_smithing_armor": "Return Skyrim craftable armor pieces with material requirements.",
     "skyrim_smithing_weapons": "Return Skyrim craftable weapons and ammunition with material requirements.",
     "skyrim_smithing_improvement": "Return Skyrim quality levels with effective-skill thresholds.",
     "skyrim_tempering_materials": "Return the tempering material for each smithing category.",
     "skyrim_smelting": "Return Skyrim smelting recipes (ore or Dwemer scrap to ingot).",
+    "skyrim_smithing_plan": "Plan a Skyrim armor/weapon set: summed forge materials, ore, tempering materials, and smithing skill needed.",
+    "skyrim_smithing_set_totals": "Precomputed material, ore, tempering, and skill totals for every piece under one Skyrim material perk.",
+    "skyrim_smithing_leveling": "Cheapest Skyrim Smithing craft/improve sequence from one skill level to another, with optional gold budget.",
+    "skyrim_salvage_plan": "Choose which ore and Dwemer scrap to carry within a weight budget for the most ingots or gold.",
     "skyrim_homestead_locations": "List all distinct location values in the Skyrim homestead build table.",
     "skyrim_homestead_build": "Return Skyrim homestead build rows with non-zero material quantities.",
     "skyrim_homestead_crafted_components": "Return Skyrim homestead forge recipes (nails, hinge, iron fittings, lock).",
     "skyrim_homestead_steward_cost": "Return gold cost to have the steward furnish each homestead room.",
     "skyrim_homestead_manifest": "Compute a Skyrim Hearthfire build manifest at component, ingot, or ore level.",
+    "skyrim_homestead_plan": "Plan a Skyrim Hearthfire build order from a stockpile: forge batches, per-stage shortfall, and steward buy-vs-build.",
 }
 
-for _name, (_fn, _schema) in TOOL_MAP.items():
-    TOOLS.append({
-        "name": _name,
-        "description": _TOOL_DESCRIPTIONS.get(_name, _name.replace("_", " ")),
-        "input_schema": _schema,
-    })
+# Tools reading an index that only update_tes.py builds (too large to ship):
+# offered only when DB_PATH has the table.
+_TOOL_TABLES: dict[str, str] = {
+    "skyrim_alchemy_recipes": "skyrim_alchemy_effect_bits",
+    "oblivion_alchemy_recipes": "oblivion_alchemy_effect_bits",
+    "morrowind_alchemy_recipes": "morrowind_alchemy_effect_bits",
+}
+
+
+def refresh_tools() -> None:
+    """Rebuild TOOLS for the current DB_PATH, leaving out tools whose table is missing."""
+    tables = set()
+    if DB_PATH is not None:
+        tables = {r["name"] for r in _query("SELECT name FROM sqlite_master WHERE type='table'")}
+    TOOLS[:] = [
+        {
+            "name": name,
+            "description": _TOOL_DESCRIPTIONS.get(name, name.replace("_", " ")),
+            "input_schema": schema,
+        }
+        for name, (_fn, schema) in TOOL_MAP.items()
+        if name not in _TOOL_TABLES or _TOOL_TABLES[name] in tables
+    ]
+
+
+refresh_tools()
 
 
 def call_tool(name: str, arguments: dict) -> Any:
@@ -1169,6 +3691,9 @@ def call_tool(name: str, arguments: dict) -> Any:
         return {"error": f"Unknown tool: {name}"}
     fn, _ = entry
     try:
-        return fn(**arguments)
+        # _tool_call records timing, rows and size, and logs the traceback of an exception.
+        with _tool_call(name, arguments) as call:
+            call.result = fn(**arguments)
     except Exception as exc:
         return {"error": str(exc)}
+    return call.result
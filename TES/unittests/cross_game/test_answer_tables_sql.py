@@ -0,0 +1,97 @@
+"""Tests for the precomputed TES answer tables."""
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+_answers = load_module(
+    "TES/cross_game/answers_sql/create_or_update_tes_answer_tables.py",
+    "tes_answer_tables_sql",
+)
+
+SCRIPT = str(REPO_ROOT / "TES/cross_game/answers_sql/create_or_update_tes_answer_tables.py")
+SHIPPED_DB = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ── Oblivion potion strength (worked values from oblivion_alchemy.md) ─────────
+
+def test_positive_effect_calcinator_and_retort():
+    # Magicka_Cost 125; Base_Mag = (125 / 4)^(1/2.28) = 4.52
+    s = _answers.ob_potion_strength("Restore Health", 10.0, 1.0, 100)
+    assert s == {"kind": "potion", "magnitude": 13, "duration": 43, "price": 56}
+
+
+def test_negative_effect_is_poison_without_retort():
+    s = _answers.ob_potion_strength("Damage Health", 12.0, 1.0, 100)
+    base = (125 / (1.2 * 4)) ** (1 / 2.28)
+    assert s["kind"] == "poison"
+    assert s["magnitude"] == round(base * 1.35)
+    assert s["duration"] == round(4 * base * 1.35)
+
+
+def test_duration_only_effect_has_magnitude_one():
+    s = _answers.ob_potion_strength("Invisibility", 40.0, 0.5, 50)
+    assert s["magnitude"] == 1
+    assert s["duration"] == round((50 + 12.5) / 4 * (1 + 0.125 + 0.175))
+
+
+def test_dispel_with_calcinator_and_retort_is_weaker():
+    both = _answers.ob_potion_strength("Dispel", 3.6, 1.0, 100)
+    base = (125 / 0.36) ** (1 / 1.28)
+    assert both["magnitude"] == round(base * 1.15)
+    assert both["duration"] == 1
+
+
+def test_cure_effects_have_no_strength():
+    s = _answers.ob_potion_strength("Cure Disease", 1400.0, 0.1, 0)
+    assert s["magnitude"] is None and s["duration"] is None
+    assert s["price"] == 1
+
+
+# ── full build against a copy of the shipped database ────────────────────────
+
+@pytest.fixture(scope="module")
+def built_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("answer_tables") / "gametools.sqlite3"
+    shutil.copy(SHIPPED_DB, db)
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return db
+
+
+def _count(db, sql, params=()):
+    conn = sqlite3.connect(db)
+    n = conn.execute(sql, params).fetchone()[0]
+    conn.close()
+    return n
+
+
+def test_potion_grid_is_complete(built_db):
+    effects = _count(SHIPPED_DB, "SELECT COUNT(DISTINCT effect) FROM oblivion_alchemy_effects "
+                                 "WHERE base_cost IS NOT NULL")
+    assert _count(built_db, f"SELECT COUNT(*) FROM {_answers.POTION_TABLE}") == effects * 25
+
+
+def test_charge_grid_skips_unreachable_ranks(built_db):
+    assert _count(built_db, f"SELECT COUNT(*) FROM {_answers.CHARGE_TABLE} "
+                            f"WHERE enchanter_rank = 5 AND skill < 80") == 0
+    assert _count(built_db, f"SELECT COUNT(*) FROM {_answers.CHARGE_TABLE} "
+                            f"WHERE effect = 'Notched Pickaxe'") == 0
+
+
+def test_set_totals_one_row_per_perk_and_quality(built_db):
+    assert _count(built_db, f"SELECT COUNT(*) FROM {_answers.SET_TABLE}") == 10 * 6
+
+
+def test_missing_source_table_fails(tmp_path):
+    db = tmp_path / "empty.sqlite3"
+    sqlite3.connect(db).close()
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Database error" in result.stderr
@@ -0,0 +1,119 @@
+"""Tests for the cross-game effect equivalence graph."""
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+_graph = load_module(
+    "TES/cross_game/effects_sql/create_or_update_tes_effect_graph.py",
+    "tes_effect_graph_sql",
+)
+
+SCRIPT = str(REPO_ROOT / "TES/cross_game/effects_sql/create_or_update_tes_effect_graph.py")
+SHIPPED_DB = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ── normalize / families ──────────────────────────────────────────────────────
+
+def test_normalize_drops_parentheticals_and_punctuation():
+    assert _graph.normalize("Fortify One-Handed") == "fortify one handed"
+    assert _graph.normalize("Restore Health (Morrowind)") == "restore health"
+
+
+def test_normalize_splits_run_together_and():
+    assert _graph.normalize("Fortify AlterationandMagicka Regen") == \
+        "fortify alteration and magicka regen"
+
+
+def test_families_renamed_skills():
+    assert _graph.families("fortify smithing") == ["fortify armorer"]
+    assert _graph.families("damage one handed") == ["damage blade", "damage blunt"]
+    assert _graph.families("fortify long blade") == ["fortify blade"]
+
+
+def test_families_word_and_phrase_synonyms():
+    assert _graph.families("restore stamina") == ["restore fatigue"]
+    assert _graph.families("paralyze") == ["paralysis"]
+    assert _graph.families("resist magic") == ["resist magicka"]
+    assert _graph.families("calm humanoid") == ["calm"]
+
+
+def test_families_compound_enchantment_splits_parts():
+    assert _graph.families("fortify destruction and magicka regen") == \
+        ["fortify destruction", "regenerate magicka"]
+
+
+def test_families_passthrough():
+    assert _graph.families("fire damage") == ["fire damage"]
+
+
+def test_load_mgef_skips_placeholders():
+    mgef = _graph.load_mgef()
+    assert mgef["Fortify Skill"] == "FOSK"
+    assert not any("DO NOT USE" in n for n in mgef)
+
+
+# ── full build against a copy of the shipped database ────────────────────────
+
+@pytest.fixture(scope="module")
+def built_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("effect_graph") / "gametools.sqlite3"
+    shutil.copy(SHIPPED_DB, db)
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return db
+
+
+def _rows(db, alias):
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        f"SELECT g.game, g.effect, g.qualifier FROM {_graph.ALIAS_TABLE} a "
+        f"JOIN {_graph.GRAPH_TABLE} g ON g.family = a.family WHERE a.alias = ?",
+        (alias,),
+    ).fetchall()
+    conn.close()
+    return set(rows)
+
+
+def test_build_smithing_maps_to_armorer(built_db):
+    rows = _rows(built_db, "fortify smithing")
+    assert ("oblivion", "Fortify Skill", "Armorer") in rows
+    assert ("morrowind", "Fortify Skill", "Armorer") in rows
+    assert ("skyrim", "Fortify Smithing", None) in rows
+
+
+def test_build_generic_attribute_expanded(built_db):
+    rows = _rows(built_db, "drain strength")
+    assert ("oblivion", "Drain Attribute", "Strength") in rows
+    assert ("morrowind", "Drain Attribute", "Strength") in rows
+
+
+def test_build_stamina_fatigue(built_db):
+    games = {g for g, _, _ in _rows(built_db, "restore stamina")}
+    assert games == {"morrowind", "oblivion", "skyrim"}
+
+
+def test_build_is_idempotent(built_db):
+    conn = sqlite3.connect(built_db)
+    before = conn.execute(f"SELECT COUNT(*) FROM {_graph.GRAPH_TABLE}").fetchone()[0]
+    conn.close()
+    result = subprocess.run([sys.executable, SCRIPT, str(built_db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    conn = sqlite3.connect(built_db)
+    after = conn.execute(f"SELECT COUNT(*) FROM {_graph.GRAPH_TABLE}").fetchone()[0]
+    conn.close()
+    assert before == after > 0
+
+
+def test_missing_source_table_fails(tmp_path):
+    db = tmp_path / "empty.sqlite3"
+    sqlite3.connect(db).close()
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Database error" in result.stderr
@@ -0,0 +1,127 @@
+"""Tests for the denormalized per-game effect profile tables."""
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/cross_game/effects_sql"))
+_profiles = load_module(
+    "TES/cross_game/effects_sql/create_or_update_tes_effect_profiles.py",
+    "tes_effect_profiles_sql",
+)
+
+SCRIPT = str(REPO_ROOT / "TES/cross_game/effects_sql/create_or_update_tes_effect_profiles.py")
+SHIPPED_DB = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ── helpers ───────────────────────────────────────────────────────────────────
+
+def test_generic_key_attribute_and_skill():
+    assert _profiles.generic_key("fortify strength", "oblivion") == ("fortify attribute", "Strength")
+    assert _profiles.generic_key("drain blunt weapon", "morrowind") == ("drain skill", "Blunt Weapon")
+    assert _profiles.generic_key("fire damage", "oblivion") == ("fire damage", None)
+
+
+def test_is_harmful():
+    assert _profiles.is_harmful("damage health")
+    assert _profiles.is_harmful("weakness to fire")
+    assert _profiles.is_harmful("paralysis")
+    assert not _profiles.is_harmful("restore health")
+
+
+def _prof(**cols):
+    base = {"effect": "X", "ingredients": [], "base": {}, "enchant_slots": [], "disenchant": []}
+    return dict(base, **cols)
+
+
+def test_merge_synonyms_joins_names_of_one_effect():
+    merged = _profiles.merge_synonyms({
+        "paralysis": _prof(effect="Paralysis", ingredients=[{"name": "Canis Root"}]),
+        "paralyze": _prof(effect="Paralyze", enchant_slots=["weapon"], base={"enchant": {"base_cost": 34}}),
+    })
+    assert merged["paralyze"] is merged["paralysis"]
+    assert merged["paralyze"]["effect"] == "Paralysis"
+    assert merged["paralyze"]["enchant_slots"] == ["weapon"]
+    assert merged["paralyze"]["base"] == {"enchant": {"base_cost": 34}}
+
+
+def test_merge_synonyms_keeps_skills_apart():
+    merged = _profiles.merge_synonyms({
+        "fortify axe": _prof(effect="Fortify Axe"),
+        "fortify blunt weapon": _prof(effect="Fortify Blunt Weapon"),
+    })
+    assert merged["fortify axe"]["effect"] == "Fortify Axe"
+    assert merged["fortify blunt weapon"]["effect"] == "Fortify Blunt Weapon"
+
+
+# ── full build against a copy of the shipped database ────────────────────────
+
+@pytest.fixture(scope="module")
+def built_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("effect_profiles") / "gametools.sqlite3"
+    shutil.copy(SHIPPED_DB, db)
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return db
+
+
+def _profile(db, game, key):
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(f"SELECT * FROM {game}_effect_profile WHERE effect_key = ?", (key,)).fetchone()
+    conn.close()
+    return {k: (json.loads(row[k]) if k in _profiles.COLUMNS and row[k] is not None else row[k])
+            for k in row.keys()}
+
+
+def test_skyrim_profile_matches_source_tables(built_db):
+    prof = _profile(built_db, "skyrim", "fortify health")
+    conn = sqlite3.connect(SHIPPED_DB)
+    ingredients = {r[0] for r in conn.execute(
+        "SELECT name FROM skyrim_alchemy_effects WHERE effect = 'Fortify Health'")}
+    items = {r[0] for r in conn.execute(
+        "SELECT item FROM skyrim_enchant_disenchant_apparel WHERE effect = 'Fortify Health'")}
+    conn.close()
+    assert {i["name"] for i in prof["ingredients"]} == ingredients
+    assert {d["item"] for d in prof["disenchant"]} == items
+    assert prof["enchant_slots"] == ["chest", "shield", "amulet", "ring"]
+    names = {p["name"] for p in prof["perks"]}
+    assert {"Benefactor", "Corpus Enchanter"} <= names
+    assert "Poisoner" not in names
+    assert prof["sigil_stones"] is None
+
+
+def test_skyrim_harmful_weapon_effect_perks(built_db):
+    names = {p["name"] for p in _profile(built_db, "skyrim", "frost damage")["perks"]}
+    assert {"Frost Enchanter", "Augmented Frost (2/2)"} <= names
+    assert "Fire Enchanter" not in names
+
+
+def test_oblivion_generic_effect_and_sigil_stones(built_db):
+    prof = _profile(built_db, "oblivion", "fortify strength")
+    assert prof["base"]["effect_id"] == "FOAT"
+    assert prof["base"]["qualifier"] == "Strength"
+    assert prof["sigil_stones"] and all(s["slot"] == "armor" for s in prof["sigil_stones"])
+    assert prof["perks"] is None
+
+
+def test_morrowind_skill_without_ingredients(built_db):
+    prof = _profile(built_db, "morrowind", "fortify blunt weapon")
+    assert prof["ingredients"] == []
+    assert prof["base"]["generic_effect"] == "Fortify Skill"
+    assert prof["sigil_stones"] is None
+
+
+def test_missing_source_table_fails(tmp_path):
+    db = tmp_path / "empty.sqlite3"
+    sqlite3.connect(db).close()
+    result = subprocess.run([sys.executable, SCRIPT, str(db)], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Database error" in result.stderr
@@ -0,0 +1,305 @@
+"""Tests for answer_cache.AnswerCache and its use by the /api/chat routes."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import answer_cache
+import claude_client
+import server
+from fastapi.testclient import TestClient
+
+SCOPE = ("Skyrim", "model-a", "db1")
+CALLS = [{"name": "skyrim_alchemy_effect_search", "arguments": {"effect": "Fortify Smithing"},
+          "result": [{"ingredient": "Sabre Cat Tooth"}], "elapsed_ms": 1.5}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _put(cache, question, scope=SCOPE, response="answer"):
+    cache.put(question, *scope, response, CALLS)
+
+
+# ── Normalization and eligibility ────────────────────────────────────────────
+
+def test_normalize_drops_stopwords_plurals_and_filler():
+    assert answer_cache.normalize("What ingredients give Fortify Smithing, please?") == \
+        "ingredient fortify smithing"
+    assert answer_cache.normalize("How many charges does Banish get at 100 skill") == \
+        "charge banish 100 skill"
+
+
+def test_cacheable_only_first_turn_text():
+    assert answer_cache.cacheable([{"role": "user", "content": "Fortify Smithing?"}]) == "Fortify Smithing?"
+    assert answer_cache.cacheable(
+        [{"role": "user", "content": [{"type": "text", "text": "Fortify Smithing?"}]}]) == "Fortify Smithing?"
+    assert answer_cache.cacheable([
+        {"role": "user", "content": "a"}, {"role": "assistant", "content": "b"},
+        {"role": "user", "content": "and Fortify Smithing?"}]) is None
+    assert answer_cache.cacheable(
+        [{"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t", "content": "x"}]}]) is None
+    assert answer_cache.cacheable([{"role": "user", "content": "what is the?"}]) is None
+    assert answer_cache.cacheable([]) is None
+
+
+def test_db_version_follows_file_content(tmp_path):
+    db = tmp_path / "g.sqlite3"
+    db.write_bytes(b"one")
+    first = answer_cache.db_version(db)
+    assert answer_cache.db_version(db) == first
+    db.write_bytes(b"two!")
+    assert answer_cache.db_version(db) != first
+    assert answer_cache.db_version(tmp_path / "missing") == ""
+    assert answer_cache.db_version(None) == ""
+
+
+# ── Lookup ───────────────────────────────────────────────────────────────────
+
+def test_exact_and_near_matches_hit():
+    cache = answer_cache.AnswerCache()
+    _put(cache, "What ingredients give Fortify Smithing?")
+    for q in ("ingredients for fortify smithing", "ingredients for Fortify Smithing please",
+              "What ingredients give Fortify Smithng?"):
+        hit = cache.get(q, *SCOPE)
+        assert hit is not None and hit["response"] == "answer", q
+        assert hit["tool_calls"] == CALLS
+    assert cache.hits == 3 and cache.misses == 0
+
+
+@pytest.mark.parametrize("question", [
+    "What ingredients give Fortify Sneak?",
+    "What ingredients give Fortify Smithing and Restore Health?",
+    "Which weapons can I smith?",
+    "Fortify Smithing ingredients",
+])
+def test_different_questions_miss(question):
+    cache = answer_cache.AnswerCache()
+    _put(cache, "What ingredients give Fortify Smithing?")
+    assert cache.get(question, *SCOPE) is None
+
+
+def test_numbers_must_match():
+    cache = answer_cache.AnswerCache()
+    _put(cache, "How many charges does Banish get at 100 skill")
+    assert cache.get("charges for Banish at 100 skil", *SCOPE) is not None
+    assert cache.get("How many charges does Banish get at 50 skill", *SCOPE) is None
+
+
+@pytest.mark.parametrize("stored, question", [
+    ("how much ore for 2 iron ingots and 5 steel ingots",
+     "how much ore for 5 iron ingots and 2 steel ingots"),
+    ("charges at skill 2 with enchanter rank 50", "charges at skill 50 with enchanter rank 2"),
+    ("level smithing from 50 to 20", "level smithing from 20 to 50"),
+])
+def test_numbers_must_keep_their_place(stored, question):
+    cache = answer_cache.AnswerCache()
+    _put(cache, stored)
+    assert cache.get(question, *SCOPE) is None
+
+
+@pytest.mark.parametrize("scope", [
+    ("Oblivion", "model-a", "db1"), ("Skyrim", "model-b", "db1"), ("Skyrim", "model-a", "db2"),
+])
+def test_scope_must_match(scope):
+    cache = answer_cache.AnswerCache()
+    _put(cache, "Fortify Smithing ingredients")
+    assert cache.get("Fortify Smithing ingredients", *scope) is None
+
+
+def test_similarity_off_is_exact_only():
+    cache = answer_cache.AnswerCache(similarity=None)
+    _put(cache, "What ingredients give Fortify Smithing?")
+    assert cache.get("ingredients for fortify smithing, please", *SCOPE) is not None
+    assert cache.get("Fortify Smithing ingredients", *SCOPE) is None       # word order
+    assert cache.get("What ingredients give Fortify Smithng?", *SCOPE) is None
+
+
+# ── Eviction ─────────────────────────────────────────────────────────────────
+
+def test_ttl_expiry(clock):
+    cache = answer_cache.AnswerCache(ttl=60, clock=clock)
+    _put(cache, "Fortify Smithing ingredients")
+    clock.now += 59
+    assert cache.get("Fortify Smithing ingredients", *SCOPE) is not None
+    clock.now += 1
+    assert cache.get("Fortify Smithing ingredients", *SCOPE) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(clock):
+    cache = answer_cache.AnswerCache(max_entries=2, clock=clock)
+    _put(cache, "Fortify Smithing ingredients")
+    _put(cache, "Banish charges")
+    assert cache.get("Fortify Smithing ingredients", *SCOPE) is not None   # now most recent
+    _put(cache, "Golden Saint soul gem")
+    assert len(cache) == 2
+    assert cache.get("Banish charges", *SCOPE) is None
+    assert cache.get("Fortify Smithing ingredients", *SCOPE) is not None
+
+
+def test_put_refreshes_entry():
+    cache = answer_cache.AnswerCache()
+    _put(cache, "Fortify Smithing ingredients", response="old")
+    _put(cache, "fortify smithing ingredient", response="new")
+    assert len(cache) == 1
+    assert cache.get("Fortify Smithing ingredients", *SCOPE)["response"] == "new"
+
+
+# ── Persistence ──────────────────────────────────────────────────────────────
+
+def test_entries_persist_across_instances(tmp_path, clock):
+    path = tmp_path / "cache" / "answers.sqlite3"
+    cache = answer_cache.AnswerCache(path, ttl=100, max_entries=2, clock=clock)
+    _put(cache, "Fortify Smithing ingredients")
+    clock.now += 10
+    _put(cache, "Banish charges")
+    clock.now += 10
+    _put(cache, "Golden Saint soul gem")      # evicts the oldest row from the file too
+    cache.close()
+
+    reloaded = answer_cache.AnswerCache(path, ttl=100, max_entries=2, clock=clock)
+    assert len(reloaded) == 2
+    assert reloaded.get("Fortify Smithing ingredients", *SCOPE) is None
+    assert reloaded.get("banish charge", *SCOPE)["tool_calls"] == CALLS
+    reloaded.close()
+
+    clock.now += 95                            # "Banish charges" is now past its ttl
+    pruned = answer_cache.AnswerCache(path, ttl=100, clock=clock)
+    assert len(pruned) == 1
+    assert pruned.get("Golden Saint soul gem", *SCOPE) is not None
+    pruned.clear()
+    pruned.close()
+    assert len(answer_cache.AnswerCache(path, ttl=100, clock=clock)) == 0
+
+
+# ── Server routes ────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def cached_server(monkeypatch, tmp_path):
+    """Server with an answer cache and a counting fake chat loop."""
+    calls = []
+
+    async def achat(messages, api_key, game_context="", model="", **kwargs):
+        calls.append(messages)
+        return {"response": f"answer {len(calls)}", "tool_calls": CALLS, "warning": None,
+                "error": None, "usage": {"input_tokens": 10}}
+
+    def chat_stream(messages, api_key, game_context="", model="", **kwargs):
+        calls.append(messages)
+        yield {"type": "text", "text": f"answer {len(calls)}"}
+        yield {"type": "done", "response": f"answer {len(calls)}", "tool_calls": CALLS,
+               "warning": None, "usage": {"input_tokens": 10}, "error": None}
+
+    monkeypatch.setattr(claude_client, "achat", achat)
+    monkeypatch.setattr(claude_client, "chat_stream", chat_stream)
+    monkeypatch.setattr(server.credentials, "get_api_key", lambda: "key")
+    monkeypatch.setattr(server._tools, "DB_PATH", REPO_ROOT / "TES/database/gametools.sqlite3")
+    cache = answer_cache.AnswerCache(tmp_path / "answers.sqlite3")
+    monkeypatch.setattr(server, "_ANSWER_CACHE", cache)
+    yield TestClient(server.app), calls
+    cache.close()
+
+
+def _ask(client, content, **extra):
+    body = {"messages": [{"role": "user", "content": content}], "game_context": "Skyrim", **extra}
+    return client.post("/api/chat", json=body).json()
+
+
+def test_route_serves_repeat_question_from_cache(cached_server):
+    client, calls = cached_server
+    first = _ask(client, "What ingredients give Fortify Smithing?")
+    assert first["cached"] is False and first["response"] == "answer 1"
+    again = _ask(client, "ingredients for fortify smithing please")
+    assert again["cached"] is True and again["response"] == "answer 1"
+    assert again["tool_calls"] == CALLS and again["usage"] == {}
+    assert len(calls) == 1
+
+
+def test_route_bypass_refreshes(cached_server):
+    client, calls = cached_server
+    _ask(client, "Fortify Smithing ingredients")
+    fresh = _ask(client, "Fortify Smithing ingredients", bypass_cache=True)
+    assert fresh["cached"] is False and fresh["response"] == "answer 2"
+    assert _ask(client, "Fortify Smithing ingredients")["response"] == "answer 2"
+    assert len(calls) == 2
+
+
+def test_route_keys_on_context_and_model(cached_server):
+    client, calls = cached_server
+    _ask(client, "Fortify Smithing ingredients")
+    assert _ask(client, "Fortify Smithing ingredients", game_context="Oblivion")["cached"] is False
+    assert _ask(client, "Fortify Smithing ingredients", model="other-model")["cached"] is False
+    assert len(calls) == 3
+
+
+def test_route_skips_follow_ups_and_errors(cached_server, monkeypatch):
+    client, calls = cached_server
+    history = [{"role": "user", "content": "Fortify Smithing ingredients"},
+               {"role": "assistant", "content": "answer"},
+               {"role": "user", "content": "Fortify Smithing ingredients"}]
+    for _ in range(2):
+        assert client.post("/api/chat", json={"messages": history}).json()["cached"] is False
+    assert len(calls) == 2
+
+    async def failing(messages, api_key, **kwargs):
+        return {"response": "", "tool_calls": [], "warning": None, "error": "API error", "usage": {}}
+    monkeypatch.setattr(claude_client, "achat", failing)
+    _ask(client, "Banish charges")
+    assert _ask(client, "Banish charges")["error"] == "API error"
+
+
+def test_route_without_cache_configured(cached_server, monkeypatch):
+    client, calls = cached_server
+    monkeypatch.setattr(server, "_ANSWER_CACHE", None)
+    _ask(client, "Fortify Smithing ingredients")
+    assert _ask(client, "Fortify Smithing ingredients")["cached"] is False
+    assert len(calls) == 2
+
+
+def _events(resp):
+    return [json.loads(frame.split("data: ", 1)[1]) for frame in resp.text.strip().split("\n\n")]
+
+
+def test_stream_route_caches_and_replays(cached_server):
+    client, calls = cached_server
+    body = {"messages": [{"role": "user", "content": "Fortify Smithing ingredients"}], "game_context": "Skyrim"}
+    live = _events(client.post("/api/chat/stream", json=body))
+    assert live[-1]["type"] == "done" and not live[-1].get("cached")
+    replay = _events(client.post("/api/chat/stream", json=body))
+    assert [e["type"] for e in replay] == ["text", "done"]
+    assert replay[0]["text"] == "answer 1"
+    assert replay[-1]["cached"] is True and replay[-1]["tool_calls"] == CALLS
+    assert len(calls) == 1
+    # The JSON route shares the cache.
+    assert _ask(client, "Fortify Smithing ingredients")["cached"] is True
+
+
+def test_configure_opens_and_closes_cache(monkeypatch, tmp_path):
+    for name in ("_UI_DIR", "_ANSWER_CACHE"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    for name in ("_RAG_DIR", "_SYSTEM_PROMPT", "_RAG_INDEX", "_BASE_URL"):
+        monkeypatch.setattr(claude_client, name, getattr(claude_client, name))
+    monkeypatch.setattr(server._tools, "DB_PATH", server._tools.DB_PATH)
+    args = dict(ui_dir=tmp_path, db_path=REPO_ROOT / "TES/database/gametools.sqlite3",
+                rag_dir=REPO_ROOT / "TES/mcp")
+    server.configure(**args, answer_cache_path=tmp_path / "answers.sqlite3")
+    assert isinstance(server._ANSWER_CACHE, answer_cache.AnswerCache)
+    assert (tmp_path / "answers.sqlite3").exists()
+    server.configure(**args)
+    assert server._ANSWER_CACHE is None
@@ -0,0 +1,184 @@
+"""Tests for claude_client.achat and the async /api/chat route, with a load test.
+
+The Anthropic SDK talks to an in-process mock Messages API (a mock HTTP
+transport with a fixed latency per request), so the tests measure how the
+async path overlaps many chats, not network speed.
+"""
+import asyncio
+import importlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import anthropic
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+import server
+from fastapi.testclient import TestClient
+
+# The HTTP library the installed SDK is built on (httpx, or httpx2 in newer releases).
+_http = importlib.import_module(anthropic.DefaultAsyncHttpxClient.__mro__[1].__module__.split(".")[0])
+
+LATENCY = 0.05     # seconds per mock API request
+
+
+class MockMessagesAPI:
+    """POST /v1/messages: asks for list_tables once, then answers with the table count."""
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            self.in_flight -= 1
+        body = json.loads(request.content)
+        last = body["messages"][-1]["content"]
+        if isinstance(last, list) and last and last[0].get("type") == "tool_result":
+            tables = json.loads(last[0]["content"])
+            content, stop = [{"type": "text", "text": f"{len(tables)} tables"}], "end_turn"
+        else:
+            content, stop = [{"type": "tool_use", "id": "tu_1", "name": "list_tables", "input": {}}], "tool_use"
+        return _http.Response(200, json={
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": body["model"],
+            "content": content, "stop_reason": stop, "stop_sequence": None,
+            "usage": {"input_tokens": 100, "output_tokens": 10,
+                      "cache_creation_input_tokens": 0, "cache_read_input_tokens": 90},
+        })
+
+
+@pytest.fixture(autouse=True)
+def shipped_db(monkeypatch):
+    monkeypatch.setattr(claude_client._tools, "DB_PATH", REPO_ROOT / "TES/database/gametools.sqlite3")
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    api = MockMessagesAPI()
+    client = anthropic.AsyncAnthropic(
+        api_key="key",
+        http_client=anthropic.DefaultAsyncHttpxClient(transport=_http.MockTransport(api)),
+    )
+    monkeypatch.setattr(claude_client, "_ASYNC_CLIENTS", {("key", None): client})
+    return api
+
+
+def _question(n=0):
+    return [{"role": "user", "content": f"how many tables? ({n})"}]
+
+
+def test_achat_runs_the_tool_loop(mock_api):
+    out = asyncio.run(claude_client.achat(_question(), "key"))
+    assert out["error"] is None
+    assert out["response"] == f"{len(claude_client._tools.list_tables())} tables"
+    assert [c["name"] for c in out["tool_calls"]] == ["list_tables"]
+    assert out["usage"]["cache_read_input_tokens"] == 180
+    assert mock_api.requests == 2
+
+
+def _without_timing(out):
+    return {**out, "tool_calls": [{**c, "elapsed_ms": 0} for c in out["tool_calls"]]}
+
+
+def test_chat_and_achat_agree(mock_api, monkeypatch):
+    sync_api = MockMessagesAPI()
+    monkeypatch.setattr(claude_client, "_sync_client", lambda key: anthropic.Anthropic(
+        api_key=key, http_client=anthropic.DefaultHttpxClient(
+            transport=_http.MockTransport(lambda request: asyncio.run(sync_api(request))))))
+    out = asyncio.run(claude_client.achat(_question(), "key"))
+    assert _without_timing(claude_client.chat(_question(), "key")) == _without_timing(out)
+    assert sync_api.requests == mock_api.requests == 2
+
+
+@pytest.mark.parametrize("status, error", [
+    (401, "Invalid API key. Please update your credentials in Settings."),
+    (400, "API error: "),
+])
+def test_achat_api_errors(monkeypatch, status, error):
+    async def fail(request):
+        return _http.Response(status, json={"type": "error", "error": {"type": "x", "message": "nope"}})
+    client = anthropic.AsyncAnthropic(
+        api_key="key", max_retries=0,
+        http_client=anthropic.DefaultAsyncHttpxClient(transport=_http.MockTransport(fail)),
+    )
+    monkeypatch.setattr(claude_client, "_ASYNC_CLIENTS", {("key", None): client})
+    out = asyncio.run(claude_client.achat(_question(), "key"))
+    assert out["error"].startswith(error) and out["response"] == "" and out["tool_calls"] == []
+
+
+def test_async_client_is_reused(monkeypatch):
+    monkeypatch.setattr(claude_client, "_ASYNC_CLIENTS", {})
+    first = claude_client._async_client("k1")
+    assert claude_client._async_client("k1") is first
+    assert claude_client._async_client("k2") is not first
+    monkeypatch.setattr(claude_client, "_BASE_URL", "http://127.0.0.1:9")
+    assert claude_client._async_client("k1") is not first
+
+
+def test_load_many_concurrent_chats_overlap(mock_api):
+    chats = 100
+
+    async def run_all():
+        return await asyncio.gather(*(claude_client.achat(_question(n), "key") for n in range(chats)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert all(r["error"] is None and r["response"].endswith(" tables") for r in results)
+    assert mock_api.requests == 2 * chats
+    # Serially this is 2 × 100 × 50 ms = 10 s; the chats wait on the API together.
+    assert mock_api.peak > 50
+    assert elapsed < 2 * chats * LATENCY / 4
+
+
+def test_tool_executor_is_bounded(mock_api, monkeypatch):
+    state = {"running": 0, "peak": 0, "threads": set()}
+    lock = threading.Lock()
+
+    def call_tool(name, arguments):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            state["threads"].add(threading.current_thread().name)
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return ["t"]
+
+    monkeypatch.setattr(claude_client._tools, "call_tool", call_tool)
+
+    async def run_all():
+        return await asyncio.gather(*(claude_client.achat(_question(n), "key") for n in range(40)))
+
+    results = asyncio.run(run_all())
+    assert all(r["response"] == "1 tables" for r in results)
+    assert 1 < state["peak"] <= claude_client._TOOL_EXECUTOR._max_workers
+    assert all(name.startswith("tes-tool") for name in state["threads"])
+
+
+def test_route_uses_async_path(mock_api, monkeypatch):
+    monkeypatch.setattr(server.credentials, "get_api_key", lambda: "key")
+    resp = TestClient(server.app).post("/api/chat", json={"messages": _question()})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["error"] is None and body["response"].endswith(" tables")
+    assert body["usage"]["input_tokens"] == 200
+
+
+def test_route_without_key_is_401(monkeypatch):
+    monkeypatch.setattr(server.credentials, "get_api_key", lambda: None)
+    assert TestClient(server.app).post("/api/chat", json={"messages": []}).status_code == 401
@@ -0,0 +1,118 @@
+"""Tests for claude_client.chat_stream and the POST /api/chat/stream SSE route."""
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from anthropic.types import TextBlock, ToolUseBlock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+import server
+from fastapi.testclient import TestClient
+
+
+class _FakeStream:
+    def __init__(self, message):
+        self._message = message
+        self.text_stream = [b.text for b in message.content if b.type == "text"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self._message
+
+
+class _FakeClient:
+    """Replays one scripted Message per streamed round."""
+    def __init__(self, rounds):
+        self.requests = []
+        rounds = list(rounds)
+
+        def stream(**kwargs):
+            self.requests.append(kwargs)
+            return _FakeStream(rounds.pop(0))
+
+        self.messages = SimpleNamespace(stream=stream)
+
+
+def _message(stop_reason, *content):
+    return SimpleNamespace(stop_reason=stop_reason, content=list(content))
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    def install(*rounds):
+        client = _FakeClient(rounds)
+        monkeypatch.setattr(claude_client.anthropic, "Anthropic", lambda api_key: client)
+        return client
+    return install
+
+
+def _tool_round():
+    return _message(
+        "tool_use",
+        TextBlock(type="text", text="Looking that up."),
+        ToolUseBlock(type="tool_use", id="tu_1", name="list_tables", input={}),
+    )
+
+
+def test_stream_event_sequence(fake_client):
+    client = fake_client(_tool_round(), _message("end_turn", TextBlock(type="text", text="Done.")))
+    events = list(claude_client.chat_stream([{"role": "user", "content": "tables?"}], "key"))
+
+    assert [e["type"] for e in events] == ["text", "tool_start", "tool_end", "text", "done"]
+    assert events[1] == {"type": "tool_start", "id": "tu_1", "name": "list_tables", "arguments": {}}
+    assert events[2]["result"] == claude_client._tools.call_tool("list_tables", {})
+    done = events[-1]
+    assert done["response"] == "Done." and done["error"] is None
+    assert [c["name"] for c in done["tool_calls"]] == ["list_tables"]
+    # The second round sees the tool result, exactly as chat() would send it.
+    tool_result = client.requests[1]["messages"][-1]["content"][0]
+    assert tool_result["tool_use_id"] == "tu_1"
+
+
+def test_stream_warning_comes_first(fake_client):
+    fake_client(_message("end_turn", TextBlock(type="text", text="No smithing there.")))
+    events = list(claude_client.chat_stream(
+        [{"role": "user", "content": "best smithing perks?"}], "key", game_context="Morrowind"))
+    assert events[0]["type"] == "warning"
+    assert events[-1]["warning"] == events[0]["warning"]
+
+
+def test_stream_round_cap_ends_with_error(fake_client):
+    fake_client(_tool_round(), _tool_round())
+    events = list(claude_client.chat_stream([{"role": "user", "content": "x"}], "key", max_tool_rounds=2))
+    assert events[-1]["type"] == "done"
+    assert "maximum tool-use rounds" in events[-1]["error"]
+
+
+def test_sse_framing():
+    frame = server._sse({"type": "text", "text": "a\nb"})
+    assert frame.startswith("event: text\ndata: ")
+    assert frame.endswith("\n\n") and frame.count("\n\n") == 1
+    assert json.loads(frame.split("data: ", 1)[1]) == {"type": "text", "text": "a\nb"}
+
+
+def test_route_streams_events(fake_client, monkeypatch):
+    fake_client(_message("end_turn", TextBlock(type="text", text="Hello.")))
+    monkeypatch.setattr(server.credentials, "get_api_key", lambda: "key")
+    resp = TestClient(server.app).post("/api/chat/stream", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in resp.text.split("\n\n") if f]
+    assert [f.splitlines()[0] for f in frames] == ["event: text", "event: done"]
+
+
+def test_route_without_key_is_401(monkeypatch):
+    monkeypatch.setattr(server.credentials, "get_api_key", lambda: None)
+    resp = TestClient(server.app).post("/api/chat/stream", json={"messages": []})
+    assert resp.status_code == 401
@@ -0,0 +1,113 @@
+"""Tests for conversation compaction (compaction.py) and its use in claude_client."""
+import copy
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from anthropic.types import TextBlock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+import compaction
+
+ROWS = [{"item": f"Iron Ingot {i}", "quantity": i, "location": "Lakeview Manor"} for i in range(300)]
+BIG = json.dumps(ROWS)
+
+
+def _turn(n, result=BIG, answer="Done."):
+    """One finished turn: question, tool call, tool result, answer."""
+    tid = f"tu_{n}"
+    return [
+        {"role": "user", "content": f"question {n}"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": tid, "name": "homestead_build", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": tid, "content": result}]},
+        {"role": "assistant", "content": answer},
+    ]
+
+
+def _result(messages, i):
+    return messages[i]["content"][0]["content"]
+
+
+def test_estimate_tokens():
+    assert compaction.estimate_tokens("") == 0
+    assert compaction.estimate_tokens("Fortify Enchantment") == 3       # Fortify, Enchantm, ent
+    assert compaction.estimate_tokens('{"a": 1234}') == 8                # { " a " : 123 4 }
+    assert compaction.estimate_tokens({"a": 1}) == compaction.estimate_tokens('{"a": 1}')
+    # JSON-heavy text estimates well above the chars/4 rule of thumb.
+    assert compaction.estimate_tokens(BIG) > len(BIG) / 4
+    # A tool result counts as its text, not as escaped JSON.
+    [_, _, result, _] = _turn(1)
+    assert compaction.estimate_messages([result]) < compaction.estimate_tokens(BIG) + 20
+
+
+def test_under_budget_is_unchanged():
+    messages = _turn(1) + [{"role": "user", "content": "next"}]
+    assert compaction.compact(messages, budget=10**9) == messages
+
+
+def test_dedupe_keeps_latest_copy():
+    messages = _turn(1) + _turn(2) + [{"role": "user", "content": "next"}]
+    out = compaction.compact(messages, budget=None)
+    assert _result(out, 2) == "[identical to the later result for tool_use_id tu_2]"
+    assert _result(out, 6) == BIG
+    assert _result(messages, 2) == BIG                                  # input untouched
+
+
+def test_consumed_results_are_shrunk_but_pending_ones_are_not():
+    messages = _turn(1, answer="Noted.") + [
+        {"role": "user", "content": "and the other one?"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": "tu_9", "name": "homestead_build", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "tu_9", "content": BIG + " "}]},
+    ]
+    before = copy.deepcopy(messages)
+    out = compaction.compact(messages, budget=compaction.estimate_tokens(BIG) + 1500)
+    short = json.loads(_result(out, 2))
+    assert short["rows"] == ROWS[:len(short["rows"])] and len(short["rows"]) < len(ROWS)
+    assert f"of {len(ROWS)} rows" in short["elided"] and "homestead_build" in short["elided"]
+    assert _result(out, 6) == BIG + " "                                 # not yet read by the model
+    assert messages == before
+
+
+def test_non_json_result_is_cut_with_a_note():
+    text = "x" * 10_000
+    out = compaction._shrink(text, "list_tables", 100)
+    assert out.startswith("x" * 300) and "9700 characters elided" in out and "list_tables" in out
+
+
+def test_old_turns_dropped_when_shrinking_is_not_enough():
+    messages = []
+    for n in range(6):
+        messages += _turn(n, result=json.dumps(ROWS[:5]) + str(n), answer="a" * 2000)
+    messages.append({"role": "user", "content": "latest question"})
+    out = compaction.compact(messages, budget=1200)
+    assert out[-1] == messages[-1]
+    assert out[0]["role"] == "user" and out[0]["content"].startswith("[")
+    assert "earlier turns omitted" in out[0]["content"]
+    assert compaction.estimate_messages(out) <= 1200
+    # Whole turns are dropped, so user and assistant still alternate.
+    assert all(a["role"] != b["role"] for a, b in zip(out, out[1:]))
+
+
+def test_current_turn_is_never_dropped():
+    messages = [{"role": "user", "content": "q " * 5000}]
+    assert compaction.compact(messages, budget=10) == messages
+
+
+def test_chat_sends_compacted_history(monkeypatch):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(copy.deepcopy(kwargs["messages"]))
+        return SimpleNamespace(stop_reason="end_turn", content=[TextBlock(type="text", text="ok")])
+
+    monkeypatch.setattr(claude_client.anthropic, "Anthropic",
+                        lambda api_key: SimpleNamespace(messages=SimpleNamespace(create=create)))
+    history = _turn(1) + _turn(2) + [{"role": "user", "content": "next"}]
+    claude_client.chat(history, "key", history_budget=None)
+    assert _result(requests[0], 2).startswith("[identical to")
+    assert _result(history, 2) == BIG
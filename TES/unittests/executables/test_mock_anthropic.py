@@ -0,0 +1,108 @@
+"""Tests for the mock Messages API and load driver in TES/executables/loadtest."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/loadtest"))
+import claude_client
+import load_driver
+import mock_anthropic
+import server
+
+SCENARIOS = mock_anthropic.load_scenarios()
+NO_LATENCY = mock_anthropic.Latency(0, 0, 0)
+
+
+@pytest.fixture
+def restore_state(monkeypatch):
+    """Undo the module-level configuration that the tests below change."""
+    for mod, name in ((claude_client, "_BASE_URL"), (claude_client, "_RAG_DIR"),
+                      (claude_client, "_SYSTEM_PROMPT"), (claude_client, "_RAG_INDEX"),
+                      (claude_client, "_ASYNC_CLIENTS"), (claude_client._tools, "DB_PATH"),
+                      (server, "_UI_DIR"), (server.credentials, "get_api_key")):
+        monkeypatch.setattr(mod, name, getattr(mod, name))
+    monkeypatch.setattr(claude_client, "_ASYNC_CLIENTS", {})
+    monkeypatch.setattr(claude_client._tools, "DB_PATH", REPO_ROOT / "TES/database/gametools.sqlite3")
+
+
+@pytest.fixture
+def mock_url(restore_state):
+    url, stop = load_driver._serve(mock_anthropic.create_app(latency=NO_LATENCY))
+    claude_client.set_base_url(url)
+    yield url
+    stop()
+
+
+def _calls(scenario):
+    return [call for rnd in scenario["rounds"] for call in rnd]
+
+
+@pytest.mark.parametrize("question", list(SCENARIOS))
+def test_scenarios_call_real_tools(question, restore_state):
+    for call in _calls(SCENARIOS[question]):
+        assert call["name"] in claude_client._tools.TOOL_MAP
+        result = claude_client._tools.call_tool(call["name"], call["input"])
+        first = result[0] if isinstance(result, list) and result else result
+        assert not (isinstance(first, dict) and "error" in first), (call, first)
+
+
+def test_turn_counts_rounds_since_question():
+    messages = [
+        {"role": "user", "content": "old"},
+        {"role": "assistant", "content": "a"},
+        {"role": "user", "content": "[1 earlier turn omitted to save context]\n\nnew question"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": "t", "name": "x", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t", "content": "[]"}]},
+    ]
+    assert mock_anthropic._turn(messages) == ("new question", 1)
+
+
+def test_chat_replays_scenario(mock_url):
+    question, scenario = next((q, s) for q, s in SCENARIOS.items() if len(s["rounds"]) == 2)
+    out = claude_client.chat([{"role": "user", "content": question}], "any-key")
+    assert out["error"] is None and out["response"] == scenario["answer"]
+    assert [(c["name"], c["arguments"]) for c in out["tool_calls"]] == \
+        [(c["name"], c["input"]) for c in _calls(scenario)]
+    assert out["usage"]["input_tokens"] > 0
+
+
+def test_stream_replays_scenario(mock_url):
+    question, scenario = next(iter(SCENARIOS.items()))
+    events = list(claude_client.chat_stream([{"role": "user", "content": question}], "any-key"))
+    text = "".join(e["text"] for e in events if e["type"] == "text")
+    assert text == scenario["answer"]
+    assert sum(e["type"] == "tool_end" for e in events) == len(_calls(scenario))
+    assert events[-1]["type"] == "done" and events[-1]["response"] == scenario["answer"]
+
+
+def test_unknown_question_gets_plain_answer(mock_url):
+    out = asyncio.run(claude_client.achat([{"role": "user", "content": "hello?"}], "any-key"))
+    assert out["tool_calls"] == [] and "mock" in out["response"]
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert load_driver.percentile(values, 50) == 50
+    assert load_driver.percentile(values, 99) == 99
+    assert load_driver.percentile([3.0], 95) == 3.0
+
+
+def test_driver_against_in_process_stack(restore_state):
+    url, stop = load_driver.start_stack(NO_LATENCY)
+    try:
+        results = asyncio.run(load_driver.drive(url, [1, 4], 8, list(SCENARIOS)))
+    finally:
+        stop()
+    assert [r["concurrency"] for r in results] == [1, 4]
+    for r in results:
+        assert r["errors"] == 0 and r["requests"] == 8
+        assert 0 < r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+        assert r["throughput_rps"] > 0
+    json.dumps(results)
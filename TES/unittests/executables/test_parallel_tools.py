@@ -0,0 +1,87 @@
+"""Tests for concurrent execution of one turn's tool_use blocks in claude_client."""
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from anthropic.types import TextBlock, ToolUseBlock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+
+# Later calls finish first, so completion order is the reverse of tool_use order.
+DELAYS = {"a": 0.15, "b": 0.10, "c": 0.05, "d": 0.0}
+
+
+@pytest.fixture
+def slow_tools(monkeypatch):
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def call_tool(name, arguments):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(DELAYS[arguments["key"]])
+        with lock:
+            state["running"] -= 1
+        return {"key": arguments["key"]}
+
+    monkeypatch.setattr(claude_client._tools, "call_tool", call_tool)
+    return state
+
+
+def _blocks(keys):
+    return [ToolUseBlock(type="tool_use", id=f"tu_{k}", name="lookup", input={"key": k}) for k in keys]
+
+
+def test_run_tools_positions_and_timing(slow_tools):
+    blocks = _blocks("abcd")
+    finished = list(claude_client._run_tools(blocks))
+    assert [i for i, _, _ in finished] == [3, 2, 1, 0]   # completion order
+    for i, entry, tool_result in finished:
+        assert tool_result["tool_use_id"] == blocks[i].id
+        assert entry["result"] == {"key": "abcd"[i]}
+        assert entry["elapsed_ms"] >= DELAYS["abcd"[i]] * 1000 - 1
+    assert 1 < slow_tools["peak"] <= claude_client._TOOL_WORKERS
+
+
+def test_run_tools_is_bounded(slow_tools, monkeypatch):
+    monkeypatch.setattr(claude_client, "_TOOL_WORKERS", 2)
+    list(claude_client._run_tools(_blocks("abcd")))
+    assert slow_tools["peak"] == 2
+
+
+def test_run_tools_single_and_empty(slow_tools):
+    assert list(claude_client._run_tools([])) == []
+    [(i, entry, _)] = claude_client._run_tools(_blocks("d"))
+    assert i == 0 and entry["name"] == "lookup"
+    assert slow_tools["peak"] == 1
+
+
+def test_chat_keeps_tool_use_order(slow_tools, monkeypatch):
+    rounds = [
+        SimpleNamespace(stop_reason="tool_use", content=_blocks("abcd")),
+        SimpleNamespace(stop_reason="end_turn", content=[TextBlock(type="text", text="ok")]),
+    ]
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return rounds.pop(0)
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(claude_client.anthropic, "Anthropic", lambda api_key: client)
+
+    start = time.perf_counter()
+    out = claude_client.chat([{"role": "user", "content": "x"}], "key")
+    assert time.perf_counter() - start < sum(DELAYS.values())   # not run one after another
+    assert [c["arguments"]["key"] for c in out["tool_calls"]] == list("abcd")
+    assert all("elapsed_ms" in c for c in out["tool_calls"])
+    sent = requests[1]["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in sent] == ["tu_a", "tu_b", "tu_c", "tu_d"]
@@ -0,0 +1,82 @@
+"""Tests for prompt caching (cache_control blocks, usage totals) in claude_client."""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from anthropic.types import TextBlock, ToolUseBlock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+@pytest.fixture(autouse=True)
+def rag_prompt(monkeypatch):
+    monkeypatch.setattr(claude_client, "_SYSTEM_PROMPT", "RAG rules " * 100)
+
+
+def _usage(inp, out, write, read):
+    return SimpleNamespace(input_tokens=inp, output_tokens=out,
+                           cache_creation_input_tokens=write, cache_read_input_tokens=read)
+
+
+def _fake_client(monkeypatch, rounds):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        return rounds.pop(0)
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(claude_client.anthropic, "Anthropic", lambda api_key: client)
+    return requests
+
+
+def test_system_prompt_prefix_is_cached_and_context_is_not():
+    plain = claude_client._system_prompt("")
+    skyrim = claude_client._system_prompt("Skyrim")
+    assert plain == [{"type": "text", "text": claude_client._SYSTEM_PROMPT, "cache_control": EPHEMERAL}]
+    assert skyrim[0] == plain[0]                     # stable cached prefix
+    assert "cache_control" not in skyrim[1] and "Skyrim" in skyrim[1]["text"]
+    assert claude_client._system_prompt("All Games") == plain
+
+
+def test_system_prompt_without_rag(monkeypatch):
+    monkeypatch.setattr(claude_client, "_SYSTEM_PROMPT", "")
+    assert claude_client._system_prompt("") == []
+    assert len(claude_client._system_prompt("Oblivion")) == 1
+
+
+def test_cached_tools_marks_only_last_schema():
+    tools = claude_client._cached_tools()
+    assert [t["name"] for t in tools] == [t["name"] for t in claude_client._tools.TOOLS]
+    assert tools[-1]["cache_control"] == EPHEMERAL
+    assert all("cache_control" not in t for t in tools[:-1])
+    assert "cache_control" not in claude_client._tools.TOOLS[-1]   # shared schema untouched
+
+
+def test_chat_sums_usage_over_rounds(monkeypatch):
+    requests = _fake_client(monkeypatch, [
+        SimpleNamespace(stop_reason="tool_use", usage=_usage(10, 5, 30000, 0),
+                        content=[ToolUseBlock(type="tool_use", id="tu_1", name="list_tables", input={})]),
+        SimpleNamespace(stop_reason="end_turn", usage=_usage(12, 7, 0, 30000),
+                        content=[TextBlock(type="text", text="ok")]),
+    ])
+    out = claude_client.chat([{"role": "user", "content": "x"}], "key", game_context="Morrowind")
+    assert out["usage"] == {"input_tokens": 22, "output_tokens": 12,
+                            "cache_creation_input_tokens": 30000, "cache_read_input_tokens": 30000}
+    # Both rounds send the same cached system/tools prefix.
+    assert requests[0]["system"] == requests[1]["system"]
+    assert requests[0]["system"][0]["cache_control"] == EPHEMERAL
+    assert requests[1]["tools"][-1]["cache_control"] == EPHEMERAL
+
+
+def test_chat_usage_on_error_and_missing_usage(monkeypatch):
+    _fake_client(monkeypatch, [SimpleNamespace(stop_reason="max_tokens", content=[])])
+    out = claude_client.chat([{"role": "user", "content": "x"}], "key")
+    assert out["usage"] == dict.fromkeys(claude_client._USAGE_FIELDS, 0)
@@ -0,0 +1,149 @@
+"""Tests for the BM25 rules-section retrieval (rag.py) and its use in claude_client."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import claude_client
+import rag
+
+RAG_DIR = REPO_ROOT / "TES/mcp"
+
+SAMPLE = """# Skyrim Smithing — Rules
+
+Intro text.
+
+## Perk Tree
+
+Steel Smithing, Elven Smithing and Daedric Smithing perks.
+
+```
+# not a heading
+```
+
+### Daedric
+
+Needs ebony ingots and daedra hearts.
+
+## Tempering
+
+Grindstones and workbenches.
+"""
+
+
+@pytest.fixture(scope="module")
+def index():
+    return rag.BM25Index.from_dir(RAG_DIR)
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """claude_client with the shipped documents loaded; module state restored afterwards."""
+    for name in ("_RAG_DIR", "_SYSTEM_PROMPT", "_RAG_INDEX"):
+        monkeypatch.setattr(claude_client, name, getattr(claude_client, name))
+    claude_client.set_rag_dir(RAG_DIR)
+    return claude_client
+
+
+def test_tokenize():
+    assert rag.tokenize("What are the Soul Gems for a ring?") == ["soul", "gem", "ring"]
+    assert rag.tokenize("glass") == ["glass"]
+
+
+def test_split_sections_heading_paths():
+    sections = rag.split_sections("skyrim_smithing", SAMPLE)
+    assert [s.title for s in sections] == [
+        "Skyrim Smithing — Rules",
+        "Skyrim Smithing — Rules > Perk Tree",
+        "Skyrim Smithing — Rules > Perk Tree > Daedric",
+        "Skyrim Smithing — Rules > Tempering",
+    ]
+    assert "# not a heading" in sections[1].text       # fenced lines stay in their section
+    assert {s.game for s in sections} == {"Skyrim"}
+    assert rag.split_sections("tes_general", "## A\n\ntext")[0].game is None
+
+
+def test_split_sections_always_marker():
+    doc = "## Reference\n\nTables.\n\n## Ask First\n\n<!-- rag: always -->\n\nAsk the user.\n"
+    reference, ask = rag.split_sections("skyrim_smithing", doc)
+    assert not reference.always and ask.always
+    assert ask.text == "## Ask First\n\nAsk the user."
+    assert all(s.always for s in rag.split_sections("tes_general", "## A\n\ntext\n\n## B\n\nmore"))
+
+
+def test_always_sections_are_not_searched(index):
+    titles = [s.title for s in index.always({"Skyrim"})]
+    assert any(t.endswith("Disclosing Legendary Quality") for t in titles)
+    assert any(t.endswith("Explicit Absence Rule") for t in titles)
+    assert not any("Cursed Enchantments" in t for t in titles)
+    assert not any(s.always for s in index.search("disclosing legendary quality cursed", k=50))
+
+
+def test_index_covers_every_document(index):
+    assert {s.doc for s in index.sections} == {p.stem for p in RAG_DIR.glob("*.md")}
+
+
+def test_search_ranks_the_matching_section_first(index):
+    [best] = index.search("soul gem capacity for a ring", {"Skyrim"}, k=1)
+    assert best.doc == "skyrim_enchanting" and "Soul Gem" in best.title
+
+
+def test_search_game_filter(index):
+    hits = index.search("effect names across games", {"Oblivion"}, k=20)
+    assert hits and {s.game for s in hits} == {"Oblivion"}
+    assert {s.game for s in index.always({"Oblivion"})} == {"Oblivion", None}
+
+
+def test_search_without_shared_terms_is_empty(index):
+    assert index.search("zzzz qqqq") == []
+    assert rag.BM25Index([]).search("anything") == []
+
+
+def test_rag_games():
+    assert claude_client._rag_games("anything", "") is None
+    assert claude_client._rag_games("anything", "All Games") is None
+    assert claude_client._rag_games("soul gems", "Morrowind") == {"Morrowind"}
+    assert claude_client._rag_games("how is this done in Skyrim?", "Oblivion") == {"Oblivion", "Skyrim"}
+    # An alert keyword (a system the game lacks) opens the search to all games.
+    assert claude_client._rag_games("best smithing perks", "Morrowind") is None
+
+
+def test_system_prompt_uses_retrieved_sections(loaded):
+    query = loaded._query_text([{"role": "user", "content": "Which soul gem for a constant effect ring?"}])
+    [rules, context] = loaded._system_prompt("Morrowind", query)
+    assert "Soul Gem" in rules["text"] and rules["cache_control"] == {"type": "ephemeral"}
+    assert len(rules["text"]) < len(loaded._SYSTEM_PROMPT) / 5
+    assert "(skyrim_" not in rules["text"] and "Morrowind" in context["text"]
+
+
+@pytest.mark.parametrize("game, question, rule", [
+    ("Skyrim", "How many steel ingots for a steel sword?", "Disclosing Legendary Quality"),
+    ("Skyrim", "Fortify Smithing potion ingredients", "Partial Data — NULL Fields"),
+    ("", "Is there smithing in Morrowind?", "Explicit Absence Rule"),
+    ("Oblivion", "Damage Health on a ring", "Cursed Enchantments"),
+])
+def test_system_prompt_always_includes_instructions(loaded, game, question, rule):
+    rules = loaded._system_prompt(game, question)[0]["text"]
+    assert rules != loaded._SYSTEM_PROMPT and rule in rules
+
+
+def test_system_prompt_falls_back_to_full_dump(loaded):
+    assert loaded._system_prompt("", "zzzz")[0]["text"] == loaded._SYSTEM_PROMPT
+    loaded.set_rag_dir(RAG_DIR, retrieval=False)
+    assert loaded._RAG_INDEX is None
+    assert loaded._system_prompt("Skyrim", "soul gems")[0]["text"] == loaded._SYSTEM_PROMPT
+
+
+def test_query_text_uses_last_two_user_messages():
+    messages = [
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "a"},
+        {"role": "user", "content": "second"},
+        {"role": "assistant", "content": "b"},
+        {"role": "user", "content": [{"type": "text", "text": "third"}]},
+    ]
+    assert claude_client._query_text(messages) == "second\nthird"
@@ -0,0 +1,117 @@
+"""Tests for the compact tool-result encoding (result_encoding.py)."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import compaction
+import result_encoding
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_result_encoding")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def decode_table(table):
+    """Rebuild row dicts from an encoded table, nulls left out."""
+    rows = []
+    for values in table["rows"]:
+        row = dict(table.get("same_for_all_rows", {}))
+        row.update(zip(table["columns"], values))
+        if "flag_columns" in table:
+            on = set(row.pop("flags").split(",")) - {""}
+            row.update({f: int(f in on) for f in table["flag_columns"]})
+        if "count_columns" in table:
+            pairs = dict(p.split(":") for p in row.pop("counts").split(",") if p)
+            row.update({c: int(pairs.get(c, 0)) for c in table["count_columns"]})
+        rows.append({k: v for k, v in row.items() if v is not None})
+    return rows
+
+
+def _without_nulls(rows):
+    return [{k: v for k, v in r.items() if v is not None} for r in rows]
+
+
+def test_encode_table_layout():
+    rows = [
+        {"name": "a", "perk": "Steel", "head": 1, "ring": 0, "note": None, "cost": 5},
+        {"name": "b", "perk": "Steel", "head": 0, "ring": 1, "note": None, "cost": None},
+    ]
+    table = result_encoding.encode_table(rows)
+    assert table == {
+        "row_count": 2,
+        "same_for_all_rows": {"perk": "Steel"},
+        "flag_columns": ["head", "ring"],
+        "columns": ["name", "cost", "flags"],
+        "rows": [["a", 5, "head"], ["b", None, "ring"]],
+    }
+
+
+def test_sparse_counts_are_folded():
+    rows = [{"piece": "a", "iron": 2, "steel": 0, "hide": 0},
+            {"piece": "b", "iron": 0, "steel": 3, "hide": 0},
+            {"piece": "c", "iron": 0, "steel": 0, "hide": 4},
+            {"piece": "d", "iron": 0, "steel": 0, "hide": 0}]
+    table = result_encoding.encode_table(rows)
+    assert table["count_columns"] == ["iron", "steel", "hide"]
+    assert table["rows"] == [["a", "iron:2"], ["b", "steel:3"], ["c", "hide:4"], ["d", ""]]
+
+
+def test_single_flag_column_is_not_folded():
+    table = result_encoding.encode_table([{"a": "x", "f": 1}, {"a": "y", "f": 0}])
+    assert table["columns"] == ["a", "f"] and "flag_columns" not in table
+
+
+def test_true_is_not_the_same_as_one():
+    table = result_encoding.encode_table([{"v": 1}, {"v": True}])
+    assert "same_for_all_rows" not in table
+
+
+@pytest.mark.parametrize("name, args", [
+    ("skyrim_enchant_apparel_effects", {}),
+    ("oblivion_sigil_stone", {}),
+    ("skyrim_smithing_armor", {}),
+])
+def test_real_results_round_trip_and_shrink(name, args):
+    result = tools.call_tool(name, args)
+    text = result_encoding.encode_result(result, max_chars=10**7)
+    assert decode_table(json.loads(text)) == _without_nulls(result)
+    assert len(text) < len(json.dumps(result, default=str)) * 0.6
+
+
+def test_nested_tables_are_encoded():
+    plan = tools.call_tool("skyrim_smithing_plan", {"perk": "Steel Smithing"})
+    encoded = json.loads(result_encoding.encode_result(plan, max_chars=10**7))
+    assert encoded["pieces"]["row_count"] == len(plan["pieces"])
+    assert decode_table(encoded["pieces"]) == _without_nulls(plan["pieces"])
+
+
+def test_truncation_keeps_leading_rows_and_hints():
+    result = tools.call_tool("oblivion_sigil_stone", {})
+    text = result_encoding.encode_result(result, max_chars=3000)
+    assert len(text) <= 3000
+    table = json.loads(text)
+    assert table["truncated"] is True and table["row_count"] == len(result)
+    assert 0 < table["rows_shown"] == len(table["rows"]) < len(result)
+    assert decode_table(table) == _without_nulls(result[:table["rows_shown"]])
+    assert table["hint"] == result_encoding.HINT
+
+
+def test_scalars_errors_and_oversized_text():
+    assert result_encoding.encode_result({"error": "nope"}) == '{"error":"nope"}'
+    assert result_encoding.encode_result(["a", "b"]) == '["a","b"]'
+    assert result_encoding.encode_result([]) == "[]"
+    huge = json.loads(result_encoding.encode_result("x" * 500, max_chars=100))
+    assert huge["partial_result"] == json.dumps("x" * 500)[:100]
+
+
+def test_compaction_shrinks_encoded_tables():
+    text = result_encoding.encode_result(tools.call_tool("oblivion_sigil_stone", {}))
+    short = json.loads(compaction._shrink(text, "oblivion_sigil_stone", 200))
+    assert short["columns"] == json.loads(text)["columns"]
+    assert 0 < len(short["rows"]) < len(json.loads(text)["rows"])
+    assert "oblivion_sigil_stone" in short["elided"]
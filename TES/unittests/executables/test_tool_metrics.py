@@ -0,0 +1,151 @@
+"""Tests for the tool metrics in tools.call_tool and GET /api/metrics."""
+import logging
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_metrics")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+sys.path.insert(0, str(REPO_ROOT / "TES/executables/src"))
+import answer_cache
+import server
+from fastapi.testclient import TestClient
+
+_SAMPLE_RE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(tools, "_tool_stats", {})
+
+
+def _samples(text):
+    """{(metric name, labels text): value} of every sample line."""
+    out = {}
+    for line in text.splitlines():
+        if line.startswith("#") or not line:
+            continue
+        m = _SAMPLE_RE.match(line)
+        assert m, line
+        out[(m.group(1), m.group(2) or "")] = float(m.group(3))
+    return out
+
+
+def test_call_records_time_sql_rows_and_bytes():
+    result = tools.call_tool("list_tables", {})
+    stats = tools._tool_stats["list_tables"]
+    assert stats.calls == 1 and stats.errors == 0
+    assert stats.sql_queries == 1 and stats.sql.count == 1 and stats.sql.sum > 0
+    assert stats.duration.sum >= stats.sql.sum
+    assert stats.rows.sum == len(result)
+    assert stats.result_bytes.sum == len(tools.json.dumps(result).encode())
+
+
+def test_error_results_and_exceptions_count_as_errors(caplog):
+    assert "error" in tools.call_tool("skyrim_enchant_calculator", {"effect": "No Such Effect"})
+    with caplog.at_level(logging.ERROR, logger="gametools.tools"):
+        out = tools.call_tool("list_tables", {"unexpected": 1})
+    assert "unexpected" in out["error"]
+    assert tools._tool_stats["skyrim_enchant_calculator"].errors == 1
+    assert tools._tool_stats["list_tables"].errors == 1
+    assert tools._tool_stats["list_tables"].rows.sum == 0
+    assert "list_tables raised" in caplog.text and "Traceback" in caplog.text
+
+
+def test_unknown_tool_is_not_recorded():
+    assert tools.call_tool("no_such_tool", {}) == {"error": "Unknown tool: no_such_tool"}
+    assert tools._tool_stats == {}
+
+
+def test_slow_calls_are_logged(monkeypatch, caplog):
+    monkeypatch.setattr(tools, "_SLOW_TOOL_MS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="gametools.tools"):
+        tools.call_tool("list_tables", {})
+    assert tools._tool_stats["list_tables"].slow == 1
+    assert "slow tool call: list_tables" in caplog.text and "1 queries" in caplog.text
+
+
+def test_fast_calls_are_not_logged(caplog):
+    with caplog.at_level(logging.WARNING, logger="gametools.tools"):
+        tools.call_tool("list_tables", {})
+    assert tools._tool_stats["list_tables"].slow == 0
+    assert "slow tool call" not in caplog.text
+
+
+def test_lookup_cache_hits_and_misses(monkeypatch):
+    monkeypatch.setattr(tools, "_homestead_cache", {})
+    monkeypatch.setattr(tools, "_homestead_totals_cache", {})
+    args = {"locations": "Main Hall"}
+    tools.call_tool("skyrim_homestead_manifest", args)
+    tools.call_tool("skyrim_homestead_manifest", args)
+    stats = tools._tool_stats["skyrim_homestead_manifest"]
+    assert stats.calls == 2 and stats.errors == 0
+    assert stats.cache_misses >= 1 and stats.cache_hits >= stats.cache_misses
+
+
+def test_sql_outside_a_tool_call_is_not_recorded():
+    tools.list_tables()
+    assert tools._tool_stats == {}
+
+
+@pytest.mark.parametrize("result, rows", [
+    ([1, 2, 3], 3),
+    ([], 0),
+    ({"a": [1, 2], "b": [3], "total": 9}, 3),
+    ({"total": 9}, 1),
+    ([{"error": "x"}], 0),
+    ({"error": "x"}, 0),
+    (None, 0),
+    (7, 1),
+])
+def test_row_count(result, rows):
+    assert tools._row_count(result) == rows
+
+
+def test_render_histograms_are_cumulative():
+    for _ in range(3):
+        tools.call_tool("list_tables", {})
+    samples = _samples(tools.render_metrics())
+    assert samples[("gametools_tool_calls_total", 'tool="list_tables"')] == 3
+    for name in ("gametools_tool_duration_seconds", "gametools_tool_sql_seconds",
+                 "gametools_tool_rows", "gametools_tool_result_bytes"):
+        buckets = [v for (n, labels), v in samples.items()
+                   if n == f"{name}_bucket" and labels.startswith('tool="list_tables"')]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == samples[(f"{name}_count", 'tool="list_tables"')] == 3
+
+
+def test_render_escapes_labels():
+    tools._tool_stats['a"b'] = tools._ToolStats(calls=1)
+    assert 'gametools_tool_calls_total{tool="a\\"b"} 1' in tools.render_metrics()
+
+
+def test_metrics_route(monkeypatch, tmp_path):
+    monkeypatch.setattr(server._tools, "DB_PATH", REPO_ROOT / "TES/database/gametools.sqlite3")
+    monkeypatch.setattr(server._tools, "_tool_stats", {})
+    cache = answer_cache.AnswerCache(tmp_path / "answers.sqlite3")
+    cache.put("Fortify Smithing ingredients", "", "m", "v", "answer", [])
+    cache.get("Fortify Smithing ingredients", "", "m", "v")
+    cache.get("Banish charges", "", "m", "v")
+    monkeypatch.setattr(server, "_ANSWER_CACHE", cache)
+    server._tools.call_tool("list_tables", {})
+
+    resp = TestClient(server.app).get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(resp.text)
+    assert samples[("gametools_tool_calls_total", 'tool="list_tables"')] == 1
+    assert samples[("gametools_answer_cache_hits_total", "")] == 1
+    assert samples[("gametools_answer_cache_misses_total", "")] == 1
+    assert samples[("gametools_answer_cache_entries", "")] == 1
+    assert "# TYPE gametools_tool_duration_seconds histogram" in resp.text
+    cache.close()
+
+    monkeypatch.setattr(server, "_ANSWER_CACHE", None)
+    assert "answer_cache" not in TestClient(server.app).get("/api/metrics").text
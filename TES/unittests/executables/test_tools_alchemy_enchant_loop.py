@@ -0,0 +1,99 @@
+"""Tests for the alchemy/enchanting feedback loop simulators in the standalone tools module."""
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_loop")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+SIMON = dict(alchemy_skill=40, alchemist_rank=3, benefactor=False,
+             enchanting_skill=40, enchanter_rank=3, insightful_enchanter=False)
+
+
+# ─── Skyrim ──────────────────────────────────────────────────────────────────
+
+def test_skyrim_default_profile_matches_showcase():
+    # Enchanting showcase Q13, "Theodore": 104 → 112 → 116 → 116.
+    r = tools.skyrim_alchemy_enchant_loop([{}])
+    totals = [it["fortify_alchemy"] for it in r["iterations"]]
+    assert totals[:4] == [104, 112, 116, 116]
+    assert r["limit"] == {"fortify_alchemy": 116, "fortify_alchemy_per_piece": 29,
+                          "fortify_enchanting": 32}
+    assert r["converged_at"] == 4
+
+
+def test_skyrim_analytic_limit_bounds_floored_limit():
+    r = tools.skyrim_alchemy_enchant_loop([{}, {"patched": True}, SIMON])
+    fa_col = r["columns"].index("fortify_alchemy")
+    an_col = r["columns"].index("analytic_limit")
+    for row in r["rows"]:
+        assert row[fa_col] <= row[an_col]
+
+
+def test_skyrim_batch_rows_follow_profiles():
+    r = tools.skyrim_alchemy_enchant_loop([SIMON, {}])
+    fa_col = r["columns"].index("fortify_alchemy")
+    assert [row[fa_col] for row in r["rows"]] == [52, 116]
+    assert "iterations" not in r
+
+
+def test_skyrim_unknown_profile_key():
+    assert "bogus" in tools.skyrim_alchemy_enchant_loop([{"bogus": 1}])["error"]
+
+
+def test_skyrim_empty_profiles():
+    assert "error" in tools.skyrim_alchemy_enchant_loop([])
+
+
+# ─── Morrowind ───────────────────────────────────────────────────────────────
+
+def test_morrowind_converging_loop():
+    r = tools.morrowind_alchemy_enchant_loop([{"gear_slots": 0}])
+    assert r["growth_per_round"] < 1
+    assert r["converged_at"] is not None
+    assert all(it["enchanted"] is None for it in r["iterations"])
+    assert math.isclose(r["limit"]["intelligence"], r["analytic_limit"], rel_tol=0.02)
+
+
+def test_morrowind_enchant_step_feeds_the_next_round():
+    r = tools.morrowind_alchemy_enchant_loop([{}])
+    pieces = [(n, it["enchanted"]) for n, it in enumerate(r["iterations"]) if it["enchanted"]]
+    assert r["gear_effect"] == "Fortify Alchemy" and len(pieces) == 2
+    n, first = pieces[0]
+    # CE Fortify Skill costs 5 points per magnitude and must be safe at the Intelligence reached.
+    assert first["points"] == 5 * first["magnitude"] <= r["item_capacity"]
+    intel = r["iterations"][n]["intelligence"]
+    assert (100 + intel / 5 + 50 / 10 - 3 * first["points"]) * 1.25 * 0.5 >= 100
+    assert r["iterations"][n + 1]["potion_strength"] > r["iterations"][n]["potion_strength"]
+    without = tools.morrowind_alchemy_enchant_loop([{"gear_slots": 0}])
+    assert r["limit"]["intelligence"] > without["limit"]["intelligence"]
+
+
+def test_morrowind_gear_limited_by_item_capacity():
+    r = tools.morrowind_alchemy_enchant_loop([{"potions_per_round": 30, "gear_item": "Exquisite Amulet"}])
+    assert r["item_capacity"] == 120
+    assert [it["enchanted"] for it in r["iterations"] if it["enchanted"]] == \
+        [{"magnitude": 24, "points": 120}] * 2
+
+
+def test_morrowind_gear_effect_follows_potion_yield():
+    r = tools.morrowind_alchemy_enchant_loop([{}, {"mortar_quality": 0.5, "potions_per_round": 2}])
+    col = r["columns"].index("gear_effect")
+    assert [row[col] for row in r["rows"]] == ["Fortify Alchemy", "Fortify Intelligence"]
+
+
+def test_morrowind_divergent_loop():
+    r = tools.morrowind_alchemy_enchant_loop([{"potions_per_round": 30}])
+    ints = [it["intelligence"] for it in r["iterations"]]
+    assert r["analytic_limit"] is None
+    assert r["converged_at"] is None
+    assert ints == sorted(ints) and ints[-1] > ints[0]
+
+
+def test_morrowind_errors():
+    assert "error" in tools.morrowind_alchemy_enchant_loop([{"mortar_quality": 0}])
+    assert "400" in tools.morrowind_alchemy_enchant_loop([{"soul_size": 100}])["error"]
+    assert "No Such Ring" in tools.morrowind_alchemy_enchant_loop([{"gear_item": "No Such Ring"}])["error"]
@@ -0,0 +1,48 @@
+"""Tests for offering the <game>_alchemy_recipes tools only when the index is built."""
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_alchemy_recipes")
+
+RECIPE_TOOLS = {"skyrim_alchemy_recipes", "oblivion_alchemy_recipes", "morrowind_alchemy_recipes"}
+
+
+@pytest.fixture(autouse=True)
+def restore_db():
+    yield
+    tools.DB_PATH = None
+    tools.refresh_tools()
+
+
+def _names():
+    return {t["name"] for t in tools.TOOLS}
+
+
+def test_not_offered_without_a_database():
+    assert not _names() & RECIPE_TOOLS
+    assert "list_tables" in _names()
+
+
+def test_not_offered_by_the_shipped_database():
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+    tools.refresh_tools()
+    assert not _names() & RECIPE_TOOLS
+    assert len(tools.TOOLS) == len(tools.TOOL_MAP) - len(RECIPE_TOOLS)
+
+
+def test_offered_once_the_index_is_built(tmp_path):
+    db = tmp_path / "gametools.sqlite3"
+    shutil.copy(REPO_ROOT / "TES/database/gametools.sqlite3", db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE skyrim_alchemy_effect_bits (effect TEXT PRIMARY KEY, bit INTEGER)")
+    conn.close()
+    tools.DB_PATH = db
+    tools.refresh_tools()
+    assert _names() & RECIPE_TOOLS == {"skyrim_alchemy_recipes"}
@@ -0,0 +1,95 @@
+"""Tests for the precomputed answer-table tools in the standalone tools module."""
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_answer_tables")
+
+SCRIPT = REPO_ROOT / "TES/cross_game/answers_sql/create_or_update_tes_answer_tables.py"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def answers_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("answer_tables") / "gametools.sqlite3"
+    shutil.copy(REPO_ROOT / "TES/database/gametools.sqlite3", db)
+    result = subprocess.run([sys.executable, str(SCRIPT), str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    tools.DB_PATH = db
+    yield db
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+@pytest.mark.parametrize("effect", ["Fire Damage", "Paralyze", "Fortify Health", "Muffle"])
+def test_charge_table_matches_calculator_grid(effect):
+    assert tools.skyrim_enchant_charge_table(effect) == tools.skyrim_enchant_calculator(effect)
+
+
+def test_charge_table_point_lookup():
+    kw = dict(skill=100, enchanter_rank=5, soul_gem="Grand Soul Gem", patched=False)
+    table = tools.skyrim_enchant_charge_table("shock damage", **{**kw, "soul_gem": "grand soul gem"})
+    assert table == tools.skyrim_enchant_calculator("Shock Damage", **kw)
+    assert len(table["rows"]) == 1
+
+
+def test_charge_table_off_grid_points_to_calculator():
+    assert "skyrim_enchant_calculator" in tools.skyrim_enchant_charge_table("Fire Damage", skill=37)["error"]
+
+
+def test_potion_strength_grid_order():
+    rows = tools.oblivion_potion_strength("restore health")
+    assert len(rows) == 25
+    assert (rows[0]["apparatus_tier"], rows[0]["mastery"]) == ("Novice", "Novice")
+    assert (rows[-1]["apparatus_tier"], rows[-1]["mastery"]) == ("Master", "Master")
+    mags = [r["magnitude"] for r in rows if r["apparatus_tier"] == "Master"]
+    assert mags == sorted(mags)
+
+
+def test_potion_strength_filters_and_errors():
+    rows = tools.oblivion_potion_strength("Damage Health", apparatus_tier="expert", mastery="journeyman")
+    assert len(rows) == 1 and rows[0]["kind"] == "poison"
+    assert "Unknown apparatus_tier" in tools.oblivion_potion_strength("X", apparatus_tier="Grand")[0]["error"]
+    assert "error" in tools.oblivion_potion_strength("Summon Pizza")[0]
+
+
+def test_set_totals_match_plan():
+    out = tools.skyrim_smithing_set_totals("glass smithing", quality="Epic")
+    plan = tools.skyrim_smithing_plan(perk="Glass Smithing", quality="Epic")
+    assert out.pop("material_perk") == "Glass Smithing"
+    assert out == plan
+
+
+def test_set_totals_unknown_perk_lists_perks():
+    assert "Ebony Smithing" in tools.skyrim_smithing_set_totals("Mithril")["error"]
+
+
+def test_shipped_db_has_tables(answers_db):
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+    try:
+        assert "rows" in tools.skyrim_enchant_charge_table("Fire Damage")
+        assert "error" not in tools.oblivion_potion_strength("Restore Health")[0]
+        assert "error" not in tools.skyrim_smithing_set_totals("Ebony Smithing")
+    finally:
+        tools.DB_PATH = answers_db
+
+
+def test_tables_not_built(answers_db, tmp_path):
+    db = tmp_path / "gametools.sqlite3"
+    shutil.copy(answers_db, db)
+    with sqlite3.connect(db) as conn:
+        for table in ("skyrim_enchant_charge_grid", "oblivion_potion_strength", "skyrim_smithing_set_totals"):
+            conn.execute(f"DROP TABLE {table}")
+    conn.close()
+    tools.DB_PATH = db
+    try:
+        assert "has not been built" in tools.skyrim_enchant_charge_table("Fire Damage")["error"]
+        assert "has not been built" in tools.oblivion_potion_strength("Restore Health")[0]["error"]
+        assert "has not been built" in tools.skyrim_smithing_set_totals("Ebony Smithing")["error"]
+    finally:
+        tools.DB_PATH = answers_db
@@ -0,0 +1,68 @@
+"""Tests for the disenchant index and skyrim_disenchant_route in the standalone tools module."""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_disenchant_route")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def _sql_disenchant(effect):
+    conn = sqlite3.connect(tools.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    out = []
+    for table, kind in (("skyrim_enchant_disenchant_apparel", "apparel"),
+                        ("skyrim_enchant_disenchant_weapons", "weapon")):
+        out += [dict(r) for r in conn.execute(
+            f"SELECT effect, item, note, '{kind}' AS type FROM {table} "
+            "WHERE LOWER(effect) LIKE LOWER(?) ORDER BY effect, item", (f"%{effect}%",))]
+    conn.close()
+    return out
+
+
+@pytest.mark.parametrize("effect", ["fortify", "Resist Fire", "damage", "zzz", ""])
+def test_disenchant_lookup_matches_sql(effect):
+    assert tools.skyrim_enchant_disenchant(effect) == _sql_disenchant(effect)
+
+
+def test_full_route_covers_every_effect():
+    all_effects = {r["effect"] for r in _sql_disenchant("")}
+    result = tools.skyrim_disenchant_route()
+    assert "uncovered" not in result
+    assert result["effects_covered"] == len(all_effects)
+    learned = [e for it in result["items"] for e in it["effects"]]
+    assert set(learned) == all_effects
+    assert result["item_count"] == len(result["items"])
+
+
+def test_route_prefers_generic_loot():
+    result = tools.skyrim_disenchant_route(effects=["Resist Fire", "Fortify Magicka"])
+    assert [it["source"] for it in result["items"]] == ["generic", "generic"]
+    assert result["items"][0]["alternatives"] > 0
+
+
+def test_exclude_unique_reports_uncovered():
+    result = tools.skyrim_disenchant_route(exclude_unique=True)
+    assert all(it["source"] == "generic" for it in result["items"])
+    assert "Smithing Expertise" in result["uncovered"]
+    assert result["effects_covered"] + len(result["uncovered"]) == tools.skyrim_disenchant_route()["effects_covered"]
+
+
+def test_exclude_notes_and_item_type():
+    result = tools.skyrim_disenchant_route(item_type="apparel", exclude_notes=["creation club"])
+    assert all(it["type"] == "apparel" for it in result["items"])
+    assert {"Dark Moon", "Empower Necromancy"} <= set(result["uncovered"])
+    weapons = tools.skyrim_disenchant_route(item_type="weapon")
+    assert {e for it in weapons["items"] for e in it["effects"]} == {
+        r["effect"] for r in _sql_disenchant("") if r["type"] == "weapon"
+    }
+
+
+def test_errors():
+    assert "error" in tools.skyrim_disenchant_route(effects=["Fortify Nothing"])
+    assert "error" in tools.skyrim_disenchant_route(item_type="shield")
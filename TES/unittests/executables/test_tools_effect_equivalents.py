@@ -0,0 +1,77 @@
+"""Tests for tes_effect_equivalents in the standalone tools module."""
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_effect_equivalents")
+
+SCRIPT = REPO_ROOT / "TES/cross_game/effects_sql/create_or_update_tes_effect_graph.py"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def graph_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("effect_equivalents") / "gametools.sqlite3"
+    shutil.copy(REPO_ROOT / "TES/database/gametools.sqlite3", db)
+    result = subprocess.run([sys.executable, str(SCRIPT), str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    tools.DB_PATH = db
+    yield db
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def test_smithing_maps_to_fortify_skill_armorer():
+    out = tools.tes_effect_equivalents("Fortify Smithing")
+    assert [m["family"] for m in out["matches"]] == ["fortify armorer"]
+    games = out["matches"][0]["games"]
+    assert {"effect": "Fortify Skill", "kind": "enchant", "code": "FOSK", "qualifier": "Armorer"} in games["oblivion"]
+    assert any(e["effect"] == "Fortify Skill" and e["qualifier"] == "Armorer" for e in games["morrowind"])
+    assert {e["effect"] for e in games["skyrim"]} == {"Fortify Smithing"}
+
+
+def test_game_filter():
+    out = tools.tes_effect_equivalents("fortify stamina", game="Skyrim")
+    assert out["matches"][0]["family"] == "fortify fatigue"
+    assert set(out["matches"][0]["games"]) == {"skyrim"}
+
+
+def test_one_handed_has_two_families():
+    out = tools.tes_effect_equivalents("Fortify One-Handed", game="oblivion")
+    assert [m["family"] for m in out["matches"]] == ["fortify blade", "fortify blunt"]
+
+
+def test_case_and_punctuation_insensitive():
+    assert tools.tes_effect_equivalents("PARALYZE") == \
+        {**tools.tes_effect_equivalents("Paralyze"), "effect": "PARALYZE"}
+
+
+def test_unknown_effect():
+    assert "error" in tools.tes_effect_equivalents("Summon Pizza")
+
+
+def test_shipped_db_has_graph(graph_db):
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+    try:
+        assert tools.tes_effect_equivalents("Fortify Smithing")["matches"]
+    finally:
+        tools.DB_PATH = graph_db
+
+
+def test_graph_not_built(graph_db, tmp_path):
+    db = tmp_path / "gametools.sqlite3"
+    shutil.copy(graph_db, db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("DROP TABLE tes_effect_aliases")
+        conn.execute("DROP TABLE tes_effect_graph")
+    conn.close()
+    tools.DB_PATH = db
+    try:
+        assert "has not been built" in tools.tes_effect_equivalents("Fortify Smithing")["error"]
+    finally:
+        tools.DB_PATH = graph_db
@@ -0,0 +1,73 @@
+"""Tests for effect_profile in the standalone tools module."""
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_effect_profile")
+
+SCRIPT = REPO_ROOT / "TES/cross_game/effects_sql/create_or_update_tes_effect_profiles.py"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def profile_db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("effect_profile") / "gametools.sqlite3"
+    shutil.copy(REPO_ROOT / "TES/database/gametools.sqlite3", db)
+    result = subprocess.run([sys.executable, str(SCRIPT), str(db)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    tools.DB_PATH = db
+    yield db
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def test_skyrim_profile_covers_the_multi_call_answer():
+    prof = tools.effect_profile("Skyrim", "Fortify Health")
+    ingredients = {r["name"] for r in tools.skyrim_alchemy_find_by_effect("Fortify Health")}
+    assert {i["name"] for i in prof["ingredients"]} == ingredients
+    assert prof["enchant_slots"]
+    assert prof["disenchant"]
+    assert prof["perks"]
+    assert prof["sigil_stones"] is None
+
+
+def test_synonym_names_share_a_profile():
+    assert tools.effect_profile("skyrim", "Paralyze") == tools.effect_profile("skyrim", "paralysis")
+
+
+def test_oblivion_sigil_stones_decoded():
+    prof = tools.effect_profile("oblivion", "Fire Damage")
+    assert prof["base"]["effect_id"] == "FIDG"
+    assert {s["slot"] for s in prof["sigil_stones"]} == {"weapon"}
+
+
+def test_unknown_game_and_effect():
+    assert "Unknown game" in tools.effect_profile("daggerfall", "Fortify Health")["error"]
+    assert "error" in tools.effect_profile("skyrim", "Summon Pizza")
+
+
+def test_shipped_db_has_profiles(profile_db):
+    tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+    try:
+        for game in ("morrowind", "oblivion", "skyrim"):
+            assert "error" not in tools.effect_profile(game, "Restore Health")
+    finally:
+        tools.DB_PATH = profile_db
+
+
+def test_profile_not_built(profile_db, tmp_path):
+    db = tmp_path / "gametools.sqlite3"
+    shutil.copy(profile_db, db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("DROP TABLE skyrim_effect_profile")
+    conn.close()
+    tools.DB_PATH = db
+    try:
+        assert "has not been built" in tools.effect_profile("skyrim", "Fortify Health")["error"]
+    finally:
+        tools.DB_PATH = profile_db
@@ -0,0 +1,106 @@
+"""Tests for skyrim_enchant_calculator in the standalone tools module."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_enchant_calc")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ─── formula helpers ─────────────────────────────────────────────────────────
+
+def test_skill_multiplier_at_100():
+    assert float(tools._sk_skill_mult(100)) == pytest.approx(1.2529, abs=1e-4)
+
+
+def test_patched_and_vanilla_agree_without_potion():
+    m = tools._sk_enchant_mult(100, 5, [True, False], specific_perk=0.25)
+    assert m[0] == pytest.approx(m[1])
+    assert m[0] == pytest.approx(3.132, abs=1e-3)
+
+
+def test_vanilla_folds_potion_into_skill():
+    patched, vanilla = tools._sk_enchant_mult(100, 0, [True, False], potion_effect=0.32)
+    assert patched == pytest.approx(tools._sk_skill_mult(100) * 1.32)
+    assert vanilla == pytest.approx(tools._sk_skill_mult(132))
+
+
+def test_skill_bonus_is_vanilla_only():
+    # Ahzidal's Genius + Haunting Gift raise effective skill in vanilla; the patched formula has no term.
+    patched, vanilla = tools._sk_enchant_mult(100, 0, [True, False], potion_effect=0.32, skill_bonus=20)
+    assert patched == pytest.approx(tools._sk_skill_mult(100) * 1.32)
+    assert vanilla == pytest.approx(tools._sk_skill_mult(152))
+    r = tools.skyrim_enchant_calculator(
+        "Fortify Alchemy", base_magnitude=12, skill=100, enchanter_rank=0, soul_gem="Grand Soul Gem",
+        patched=True, ahzidal_genius=True, haunting_gift=10,
+    )
+    assert r["rows"][0][-1] == 15
+
+
+def test_charges_per_use_net_use_scaling():
+    # Skill 100 stretches a soul 1 / (1 − sqrt(0.5)) ≈ 3.41× further than skill 0.
+    ratio = tools._sk_charges_per_use(10, 0) / tools._sk_charges_per_use(10, 100)
+    assert float(ratio) == pytest.approx(3.414, abs=1e-3)
+
+
+# ─── tool ────────────────────────────────────────────────────────────────────
+
+def test_single_weapon_point():
+    r = tools.skyrim_enchant_calculator(
+        "fire damage", base_magnitude=10, skill=100, enchanter_rank=5,
+        soul_gem="Grand Soul Gem", patched=True, specific_perk=True,
+    )
+    assert r["type"] == "weapon"
+    assert r["columns"][-3:] == ["max_magnitude", "charges_per_use", "uses"]
+    assert len(r["rows"]) == 1
+    *_, magnitude, charges, uses = r["rows"][0]
+    assert magnitude == 31
+    assert uses == 3000 // charges
+
+
+def test_small_soul_lowers_magnitude_to_one_use():
+    r = tools.skyrim_enchant_calculator(
+        "Banish", skill=15, enchanter_rank=0, soul_gem="Petty Soul Gem", patched=True,
+    )
+    *_, multiplier, charges, uses = r["rows"][0]
+    assert uses == 1
+    assert charges == 250
+    assert multiplier < 1
+
+
+def test_apparel_uses_soul_multiplier():
+    r = tools.skyrim_enchant_calculator(
+        "Fortify Alchemy", base_magnitude=12, skill=100, enchanter_rank=0, patched=True,
+    )
+    by_gem = {row[2]: row[-1] for row in r["rows"]}
+    assert r["type"] == "apparel"
+    assert "charges_per_use" not in r["columns"]
+    assert by_gem["Grand Soul Gem"] == 15
+    assert by_gem["Petty Soul Gem"] == 1
+
+
+def test_full_grid_drops_locked_ranks():
+    r = tools.skyrim_enchant_calculator("Frost Damage")
+    skills = {row[0] for row in r["rows"]}
+    assert min(skills) == 15 and max(skills) == 100
+    assert all(row[1] <= 1 for row in r["rows"] if row[0] < 20)
+    assert {row[3] for row in r["rows"]} == {True, False}
+
+
+# ─── negative ────────────────────────────────────────────────────────────────
+
+def test_unknown_effect():
+    assert "error" in tools.skyrim_enchant_calculator("Not An Enchantment")
+
+
+def test_unknown_soul_gem():
+    assert "error" in tools.skyrim_enchant_calculator("Fire Damage", soul_gem="Warped Soul Gem")
+
+
+def test_rank_locked_by_skill():
+    r = tools.skyrim_enchant_calculator("Fire Damage", skill=15, enchanter_rank=5)
+    assert "requires Enchanting 80" in r["error"]
@@ -0,0 +1,78 @@
+"""Tests for the cached sparse-matrix skyrim_homestead_manifest in the standalone tools module."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_homestead_manifest")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def _sql_totals(prefixes):
+    """Reference level-1 totals straight from SQL LIKE prefix matching."""
+    sums = ', '.join(f"COALESCE(SUM({c}), 0) AS {c}" for c in tools._BUILD_MAT_COLS)
+    if prefixes:
+        conds = ' OR '.join(f"location LIKE :loc{i}" for i in range(len(prefixes)))
+        params = {f'loc{i}': f'{p.replace(" ", "_")}%' for i, p in enumerate(prefixes)}
+        where = f"WHERE ({conds})"
+    else:
+        params, where = {}, ""
+    row = tools._query(f"SELECT COUNT(*) AS n, {sums} FROM skyrim_homestead_build {where}", params)[0]
+    return row.pop('n'), {k: v for k, v in row.items() if v}
+
+
+@pytest.mark.parametrize("locations", [
+    None,
+    "Small House",
+    "Small House,Main Hall",
+    "cellar",
+    "West_Wing,East Wing Armory",
+    "North_Wing_Alchemy_Laboratory,Entryway",
+    "Exterior",
+])
+def test_level1_matches_sql(locations):
+    result = tools.skyrim_homestead_manifest(locations, 1)
+    prefixes = [p.strip() for p in (locations or '').split(',') if p.strip()]
+    n, totals = _sql_totals(prefixes)
+    assert result["row_count"] == n
+    assert result["materials"] == totals
+
+
+def test_level2_batches_and_ingots():
+    level1 = tools.skyrim_homestead_manifest("Main Hall", 1)["materials"]
+    level2 = tools.skyrim_homestead_manifest("Main Hall", 2)
+    info = level2["batch_info"]
+    assert info["nails"]["batches"] == -(-level1["nails"] // 10)
+    assert info["nails"]["waste"] == info["nails"]["produced"] - level1["nails"]
+    for comp in tools._HOMESTEAD_CRAFTABLE:
+        assert comp not in level2["materials"]
+    iron = level1.get("iron_ingot", 0) + sum(b["iron_ingot_consumed"] for b in info.values())
+    assert level2["materials"]["iron_ingot"] == iron
+
+
+def test_level3_ores_and_leather():
+    level2 = tools.skyrim_homestead_manifest(None, 2)["materials"]
+    level3 = tools.skyrim_homestead_manifest(None, 3)["materials"]
+    assert level3["Iron Ore"] == level2["iron_ingot"] + level2["steel_ingot"]
+    assert level3["Corundum Ore"] == 2 * level2["corundum_ingot"] + level2["steel_ingot"]
+    assert level3["leather"] == -(-level2["leather_strips"] // 4)
+    assert not set(tools._INGOT_TO_ORE) & set(level3)
+
+
+def test_totals_cached_per_location_set():
+    first = tools._homestead_totals(["Cellar", "Entryway"])
+    assert tools._homestead_totals(["entryway", "cellar"]) is first
+
+
+def test_cached_totals_not_mutated():
+    before = tools.skyrim_homestead_manifest("Cellar", 1)["materials"]
+    tools.skyrim_homestead_manifest("Cellar", 3)
+    assert tools.skyrim_homestead_manifest("Cellar", 1)["materials"] == before
+
+
+def test_no_match():
+    result = tools.skyrim_homestead_manifest("Nowhere", 2)
+    assert result["row_count"] == 0 and result["materials"] == {}
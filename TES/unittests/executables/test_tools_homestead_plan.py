@@ -0,0 +1,91 @@
+"""Tests for skyrim_homestead_plan in the standalone tools module."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_homestead_plan")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+FULL = ("Main Hall,Main_Hall,Entryway,West_Wing_Bedrooms,"
+        "North_Wing_Alchemy_Laboratory,East_Wing_Armory,Cellar,Exterior")
+
+
+def test_order_respects_prerequisites():
+    result = tools.skyrim_homestead_plan(FULL)
+    order = result["order"]
+    for room in order:
+        for pre in tools._HOMESTEAD_ROOMS[room]:
+            assert order.index(pre) < order.index(room)
+    assert order.index("Main Hall") < order.index("Entryway")
+
+
+def test_prerequisites_auto_included():
+    result = tools.skyrim_homestead_plan("West_Wing_Bedrooms")
+    assert result["order"][:3] == ["Small House", "Main Hall", "West_Wing"]
+    assert any(a.startswith("West_Wing (") for a in result["auto_included"])
+
+
+def test_built_rooms_skipped():
+    result = tools.skyrim_homestead_plan("Cellar", built="Small House,Main Hall")
+    assert result["order"] == ["Cellar"]
+    assert result["auto_included"] == []
+
+
+def test_totals_match_manifest():
+    locations = "Small House,Main Hall,Main_Hall,Cellar"
+    result = tools.skyrim_homestead_plan(locations)
+    manifest = tools.skyrim_homestead_manifest(locations, 2)
+    # With an empty stockpile, the whole level-2 manifest has to be gathered.
+    assert result["total_gather"] == manifest["materials"]
+    assert result["total_forge_batches"] == {
+        c: info["batches"] for c, info in manifest["batch_info"].items()
+    }
+
+
+def test_stage_gather_sums_to_total():
+    result = tools.skyrim_homestead_plan(FULL, {"sawn_log": 50, "nails": 25})
+    summed: dict = {}
+    for stage in result["stages"]:
+        for k, v in stage["gather"].items():
+            summed[k] = summed.get(k, 0) + v
+    assert summed == result["total_gather"]
+    assert result["batches_saved"] >= 0
+
+
+def test_stockpile_covers_stage():
+    stock = {"sawn_log": 1000, "quarried_stone": 1000, "clay": 100,
+             "iron_ingot": 100, "corundum_ingot": 10}
+    stage = tools.skyrim_homestead_plan("Small House", stock)["stages"][0]
+    assert stage["gather"] == {}
+    assert stage["recommendation"] == "build"
+    assert stage["forge_batches"]
+
+
+def test_steward_vs_gather_recommendation():
+    stages = {s["room"]: s for s in tools.skyrim_homestead_plan("Main Hall,Cellar")["stages"]}
+    # Sawn logs, stone and clay have no price, so the ingot cost alone cannot decide.
+    assert stages["Main Hall"]["recommendation"] == "compare"
+    assert stages["Main Hall"]["steward_gold"] == 3500
+    assert "sawn_log" in stages["Main Hall"]["unpriced"]
+    assert 0 < stages["Main Hall"]["gather_gold"] < 3500
+    # The steward cannot furnish the Cellar.
+    assert stages["Cellar"]["steward_gold"] is None
+    assert stages["Cellar"]["recommendation"] == "gather"
+
+
+def test_steward_only_when_dearer_to_gather():
+    raw = {"sawn_log": 5, "quarried_stone": 0, "clay": 0}
+    [cheap] = tools.skyrim_homestead_plan("Small House", prices=raw)["stages"]
+    assert cheap["unpriced"] == [] and cheap["steward_gold"] == 1000
+    assert cheap["gather_gold"] < 1000 and cheap["recommendation"] == "gather"
+    [dear] = tools.skyrim_homestead_plan("Small House", prices={**raw, "sawn_log": 100})["stages"]
+    assert dear["gather_gold"] > 1000 and dear["recommendation"] == "steward"
+
+
+def test_errors():
+    assert "error" in tools.skyrim_homestead_plan("")
+    assert "error" in tools.skyrim_homestead_plan("Nowhere")
+    assert "error" in tools.skyrim_homestead_plan("West_Wing_Bedrooms,West_Wing_Greenhouse")
+    assert "error" in tools.skyrim_homestead_plan("Cellar", {"unobtainium": 3})
@@ -0,0 +1,122 @@
+"""Tests for morrowind_enchant_optimize in the standalone tools module."""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_mw_optimize")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+def _spec(costs, lo=1):
+    mags = np.arange(lo, lo + len(costs))
+    return {"mags": mags, "costs": np.array(costs), "values": mags.astype(float)}
+
+
+def _brute_force(specs, cap):
+    best = None
+    for mags in itertools.product(*(range(len(s["costs"])) for s in specs)):
+        costs = sorted(int(s["costs"][m]) for s, m in zip(specs, mags))
+        n = len(costs)
+        points = sum((n - k) * c for k, c in enumerate(costs))
+        if points <= cap:
+            value = sum(float(s["values"][m]) for s, m in zip(specs, mags))
+            best = value if best is None else max(best, value)
+    return best
+
+
+# ─── solver ──────────────────────────────────────────────────────────────────
+
+def test_allocate_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        specs = [_spec(np.sort(rng.integers(1, 30, size=6))) for _ in range(3)]
+        cap = int(rng.integers(10, 120))
+        got = tools._mw_allocate(specs, cap, "total")
+        want = _brute_force(specs, cap)
+        assert (got is None) == (want is None)
+        if got:
+            assert got[0] == want
+            assert got[1] <= cap
+
+
+def test_allocate_places_cheapest_first():
+    specs = [_spec([50]), _spec([5])]
+    value, points, placed = tools._mw_allocate(specs, 60, "min_points")
+    assert [c for _, _, c in placed] == [5, 50]
+    assert points == 60
+
+
+# ─── tool ────────────────────────────────────────────────────────────────────
+
+def test_exquisite_shirt_example():
+    # morrowind_enchanting.md: Restore Fatigue 1 first (×2 = 10) + Restore Health 2 (×1 = 50).
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Restore Health", "min_magnitude": 1, "max_magnitude": 5},
+         {"effect": "Restore Fatigue", "min_magnitude": 1, "max_magnitude": 1}],
+        "constant", item="Exquisite Shirt",
+    )
+    assert [e["effect"] for e in r["effects"]] == ["Restore Fatigue", "Restore Health"]
+    assert r["effects"][1]["magnitude"] == 2
+    assert r["points_used"] == 60
+    assert r["soul_required"] == 400
+
+
+def test_category_search_picks_cheapest_host():
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Fortify Attribute", "min_magnitude": 5, "max_magnitude": 20}],
+        "ce", category="clothing", item_type="Ring",
+    )
+    assert r["item"]["item_type"] == "Ring"
+    assert all(h["value"] >= r["item"]["value"] for h in r["other_hosts"])
+
+
+def test_category_search_skips_value_zero_items():
+    # Brallion's Exquisite Ring (value 0, 120 points) is a unique; a priced ring is picked.
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Restore Health"}], "ce", category="clothing", item_type="Ring",
+        objective="min_points",
+    )
+    assert r["item"]["value"] > 0
+    assert r["item"]["name"] != "Brallion's Exquisite Ring"
+
+
+def test_cast_when_strikes_limited_by_soul():
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Fire Damage", "min_magnitude": 1, "max_magnitude": 100}],
+        "cws", item="Ebony Staff", soul_size=30,
+    )
+    assert r["points_used"] <= 30
+    assert r["effects"][0]["range"] == "touch"
+
+
+# ─── negative ────────────────────────────────────────────────────────────────
+
+def test_constant_effect_rejects_small_soul():
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Restore Health"}], "constant", category="clothing", soul_size=200,
+    )
+    assert "at least 400" in r["error"]
+
+
+def test_constant_effect_rejects_target_range():
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Restore Health", "range": "target"}], "constant", category="clothing",
+    )
+    assert "Self-range" in r["error"]
+
+
+def test_effects_too_expensive_for_any_host():
+    r = tools.morrowind_enchant_optimize(
+        [{"effect": "Restore Health", "min_magnitude": 50}], "constant", category="clothing",
+    )
+    assert "No clothing item can" in r["error"]
+
+
+def test_unknown_effect():
+    r = tools.morrowind_enchant_optimize([{"effect": "Nonsense"}], "cwu", category="armor")
+    assert "Unknown Morrowind magic effect" in r["error"]
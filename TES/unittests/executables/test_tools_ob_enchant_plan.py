@@ -0,0 +1,115 @@
+"""Tests for oblivion_enchant_plan / oblivion_enchant_exclusive_effects in the standalone tools module."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_ob_plan")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ─── name mapping ────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("name,generic", [
+    ("Fortify Strength", "Fortify Attribute"),
+    ("Absorb Agility", "Absorb Attribute"),
+    ("Fortify Blade", "Fortify Skill"),
+    ("fortify hand to hand", "Fortify Skill"),
+    ("Fortify Health", "Fortify Health"),
+    ("Fire Damage", "Fire Damage"),
+])
+def test_altar_name(name, generic):
+    assert tools._ob_altar_name(name) == generic
+
+
+# ─── exclusive effects ───────────────────────────────────────────────────────
+
+def test_no_sigil_only_effects():
+    # Every stone effect has an altar equivalent (showcase Q6).
+    result = tools.oblivion_enchant_exclusive_effects()
+    assert result["sigil_only"] == []
+    assert "Fortify Blade" in result["both"]
+    assert "Bound Sword" in result["altar_only"]
+    assert not set(result["altar_only"]) & set(result["both"])
+
+
+def test_sigil_arrays_are_cached_and_dense():
+    arrays = tools._ob_sigil_arrays()
+    assert tools._ob_sigil_arrays() is arrays
+    n = len(arrays["form_id"])
+    assert arrays["weapon_magnitude"].shape == (n, len(tools._SIGIL_LEVELS))
+    # Each stone has exactly one populated level.
+    assert ((~tools.np.isnan(arrays["weapon_magnitude"])).sum(axis=1) == 1).all()
+
+
+# ─── planner ─────────────────────────────────────────────────────────────────
+
+def test_weapon_plan_ranks_by_magnitude():
+    result = tools.oblivion_enchant_plan(["Fire Damage"], "weapon")
+    stones = result["sigil_stones"]
+    assert stones and all(s["effect"] == "Fire Damage" and s["gold"] == 0 for s in stones)
+    mags = [s["magnitude"] for s in stones]
+    assert mags == sorted(mags, reverse=True)
+    assert stones[0]["level"] == "transcendent"
+
+
+def test_weapon_altar_respects_charge_cap():
+    altar = tools.oblivion_enchant_plan(["Fire Damage"], "weapon")["altar"]
+    assert len({r["magnitude"] for r in altar}) == 1
+    for r in altar:
+        assert r["charge_per_use"] <= tools._OB_CHARGE_CAP
+    grand = next(r for r in altar if r["soul"] == "Grand")
+    assert grand["uses"] == 1600 // grand["charge_per_use"]
+    assert grand["gold"] == pytest.approx(0.4 * (grand["charge_per_use"] + 1600), abs=0.01)
+
+
+def test_weapon_fixed_magnitude_over_cap_has_no_altar_rows():
+    result = tools.oblivion_enchant_plan(["Fire Damage"], "weapon", magnitude=500)
+    assert result["altar"] == []
+
+
+def test_apparel_rank_by_gold_and_generic_match():
+    result = tools.oblivion_enchant_plan(["Fortify Strength"], "apparel", rank_by="gold")
+    assert {s["effect"] for s in result["sigil_stones"]} == {"Fortify Strength"}
+    assert all(s["charges"] is None for s in result["sigil_stones"])
+    assert {r["effect"] for r in result["altar"]} == {"Fortify Attribute"}
+    assert [r["soul"] for r in result["altar"]] == list(tools._OB_SOUL_NAMES)
+    assert {r["gold"] for r in result["altar"]} == {None}
+
+
+def test_apparel_altar_magnitude_is_not_soul_power():
+    result = tools.oblivion_enchant_plan(["Fortify Health"], "apparel")
+    grand = next(r for r in result["altar"] if r["soul"] == "Grand")
+    assert grand["magnitude"] is None and grand["gold"] is None
+    assert result["altar_note"] == tools._OB_ALTAR_APPAREL_NOTE
+
+
+def test_no_magnitude_effect_is_flat():
+    result = tools.oblivion_enchant_plan(["Night-Eye"], "apparel")
+    assert {r["magnitude"] for r in result["altar"]} == {5.0}
+    assert all(r["gold"] is not None for r in result["altar"])
+    assert "altar_note" not in result
+
+
+def test_level_filter():
+    stones = tools.oblivion_enchant_plan(["Fire Damage"], level="latent")["sigil_stones"]
+    assert stones and {s["level"] for s in stones} == {"latent"}
+
+
+def test_unavailable_effect_reported():
+    result = tools.oblivion_enchant_plan(["Bogus Effect"])
+    assert result["unavailable"] == ["Bogus Effect"]
+    assert result["sigil_stones"] == [] and result["altar"] == []
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"effects": ["Fire Damage"], "item_type": "shield"},
+    {"effects": ["Fire Damage"], "level": "mega"},
+    {"effects": ["Fire Damage"], "rank_by": "speed"},
+    {"effects": []},
+])
+def test_validation_errors(kwargs):
+    assert "error" in tools.oblivion_enchant_plan(**kwargs)
@@ -0,0 +1,96 @@
+"""Tests for skyrim_salvage_plan in the standalone tools module."""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_salvage_plan")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+DWEMER = {
+    "Solid Dwemer Metal": 2,
+    "Large Dwemer Strut": 3,
+    "Large Decorative Dwemer Strut": 2,
+    "Bent Dwemer Scrap Metal": 4,
+}
+
+
+def test_bounded_knapsack_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(15):
+        weight = rng.integers(1, 7, size=3)
+        value = rng.integers(1, 10, size=3)
+        cap = rng.integers(0, 4, size=3)
+        budget = int(rng.integers(1, 20))
+        f, take = tools._bounded_knapsack(weight, value, cap, budget)
+        best = max(
+            sum(c * v for c, v in zip(counts, value))
+            for counts in itertools.product(*(range(c + 1) for c in cap))
+            if sum(c * w for c, w in zip(counts, weight)) <= budget
+        )
+        assert f[budget] == best
+        counts = take(budget)
+        assert (counts <= cap).all()
+        assert (counts * weight).sum() <= budget
+        assert (counts * value).sum() == best
+
+
+def test_unlimited_dwemer_prefers_light_scrap():
+    result = tools.skyrim_salvage_plan(30, ingot="Dwarven Metal Ingot")
+    assert result["objective"] == "Dwarven Metal Ingot"
+    assert result["ingots"] == {"Dwarven Metal Ingot": 45}
+    assert result["weight"] == 30
+
+
+def test_limited_dwemer_matches_brute_force():
+    rows = {r["Source_Name"]: r for r in tools.skyrim_smelting(ingot="Dwarven Metal Ingot")}
+    for budget in (10, 25, 50, 80, 120):
+        best = 0
+        for counts in itertools.product(*(range(n + 1) for n in DWEMER.values())):
+            picked = dict(zip(DWEMER, counts))
+            if sum(n * rows[s]["Source_Weight"] for s, n in picked.items()) <= budget:
+                best = max(best, sum(n * rows[s]["Ingots_Produced"] for s, n in picked.items()))
+        result = tools.skyrim_salvage_plan(budget, available=DWEMER, ingot="Dwarven Metal Ingot")
+        assert result["ingots"].get("Dwarven Metal Ingot", 0) == best
+        assert result["weight"] <= budget
+        for p in result["pickup"]:
+            assert p["count"] <= DWEMER[p["source"]]
+
+
+def test_steel_competes_for_ore():
+    # 5 Iron + 5 Corundum: two Corundum Ingots, one Steel from the odd Corundum, four Iron.
+    result = tools.skyrim_salvage_plan(10, available={"Iron Ore": 5, "Corundum Ore": 5})
+    assert result["ingots"] == {"Corundum Ingot": 2, "Iron Ingot": 4, "Steel Ingot": 1}
+    assert result["gold"] == 128
+
+
+def test_steel_objective_uses_both_ores():
+    result = tools.skyrim_salvage_plan(11, ingot="steel ingot")
+    assert result["ingots"] == {"Steel Ingot": 5}
+    pickup = {p["source"]: p["count"] for p in result["pickup"]}
+    assert pickup == {"Corundum Ore": 5, "Iron Ore": 5}
+
+
+def test_stalhrim_is_not_smeltable():
+    result = tools.skyrim_salvage_plan(20, available={"Stalhrim": 5})
+    assert result["pickup"] == []
+    assert result["not_smeltable"][0]["source"] == "Stalhrim"
+
+
+def test_large_budget_is_exact():
+    result = tools.skyrim_salvage_plan(5000)
+    assert result["ingots"] == {"Ebony Ingot": 2500}
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"weight_budget": 0},
+    {"weight_budget": 10, "available": {"Unobtainium": 1}},
+    {"weight_budget": 10, "ingot": "Mithril Ingot"},
+])
+def test_errors(kwargs):
+    assert "error" in tools.skyrim_salvage_plan(**kwargs)
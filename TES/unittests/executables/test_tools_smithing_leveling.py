@@ -0,0 +1,83 @@
+"""Tests for skyrim_smithing_leveling in the standalone tools module."""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_smithing_leveling")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+
+# ─── knapsack ────────────────────────────────────────────────────────────────
+
+def _brute_force(xp, cost, need):
+    best = np.inf
+    bound = need // min(xp) + 1
+    for counts in itertools.product(range(bound + 1), repeat=len(xp)):
+        if sum(c * w for c, w in zip(counts, xp)) >= need:
+            best = min(best, sum(c * g for c, g in zip(counts, cost)))
+    return best
+
+
+def test_cover_knapsack_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for _ in range(15):
+        xp = rng.integers(3, 12, size=3)
+        cost = rng.integers(1, 9, size=3).astype(float)
+        need = int(rng.integers(5, 30))
+        total, counts, _ = tools._cover_knapsack(xp, cost, need)
+        assert total == _brute_force(xp, cost, need)
+        assert (counts * xp).sum() >= need
+        assert (counts * cost).sum() == total
+
+
+# ─── tool ────────────────────────────────────────────────────────────────────
+
+def test_full_range_plan():
+    result = tools.skyrim_smithing_leveling(15, 100)
+    levels = np.arange(15, 100)
+    assert result["xp_required"] == int(np.ceil(tools._smithing_xp_to_next(levels).sum()))
+    assert result["plan"][0]["levels"].startswith("15-")
+    assert result["plan"][-1]["levels"].endswith("-100")
+    assert result["gold"] == pytest.approx(sum(b["gold"] for b in result["plan"]))
+    for band in result["plan"]:
+        assert sum(a["xp_each"] * a["count"] for a in band["actions"]) >= band["xp"]
+
+
+def test_actions_respect_skill_thresholds():
+    result = tools.skyrim_smithing_leveling(15, 40)
+    quality = {q["quality"]: q for q in tools.skyrim_smithing_improvement()}
+    for band in result["plan"]:
+        lo = int(band["levels"].split("-")[0])
+        for a in band["actions"]:
+            if a["quality"]:
+                assert quality[a["quality"]]["skill_with_perk"] <= lo
+
+
+def test_no_improve_is_not_cheaper():
+    with_improve = tools.skyrim_smithing_leveling(20, 60)["gold"]
+    craft_only = tools.skyrim_smithing_leveling(20, 60, improve=False)
+    assert craft_only["gold"] >= with_improve
+    assert all(a["quality"] is None for b in craft_only["plan"] for a in b["actions"])
+
+
+def test_free_materials_cost_nothing():
+    prices = {"Dwarven Metal Ingot": 0, "Iron Ingot": 0, "Leather Strips": 0, "Leather": 0}
+    assert tools.skyrim_smithing_leveling(15, 30, prices=prices)["gold"] == 0
+
+
+def test_gold_budget_reached_skill():
+    full = tools.skyrim_smithing_leveling(15, 100)
+    assert tools.skyrim_smithing_leveling(15, 100, gold_budget=full["gold"])["reached_skill"] == 100
+    partial = tools.skyrim_smithing_leveling(15, 100, gold_budget=full["gold"] / 2)
+    assert 15 < partial["reached_skill"] < 100
+
+
+@pytest.mark.parametrize("current,target", [(50, 50), (60, 40), (-1, 10), (15, 101)])
+def test_invalid_range(current, target):
+    assert "error" in tools.skyrim_smithing_leveling(current, target)
@@ -0,0 +1,86 @@
+"""Tests for skyrim_smithing_plan in the standalone tools module."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_smithing_plan")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+GLASS_SET = ["Glass Helmet", "Glass Armor", "Glass Gauntlets", "Glass Boots"]
+
+
+def test_glass_set_matches_showcase():
+    # Showcase Q1: 9 Refined Malachite, 5 Refined Moonstone, 8 Leather Strips.
+    result = tools.skyrim_smithing_plan(GLASS_SET)
+    assert result["materials"]["Refined Malachite"] == 9
+    assert result["materials"]["Refined Moonstone"] == 5
+    assert result["materials"]["Leather Strips"] == 8
+    assert result["raw_materials"]["Malachite Ore"] == 18
+    assert result["raw_materials"]["Moonstone Ore"] == 10
+    # Set-level strip folding: 4 direct + ceil(8 / 4).
+    assert result["raw_materials"]["Leather"] == 4 + 2
+
+
+def test_materials_match_per_piece_tools():
+    pieces = GLASS_SET + ["Glass Sword"]
+    expected: dict = {}
+    for name in pieces:
+        rows = tools.skyrim_smithing_armor(name) or tools.skyrim_smithing_weapons(name)
+        row = next(r for r in rows if r["piece"] == name)
+        for k, v in row["materials"].items():
+            expected[k] = expected.get(k, 0) + v
+    assert tools.skyrim_smithing_plan(pieces)["materials"] == expected
+
+
+def test_repeated_piece_counts_twice():
+    one = tools.skyrim_smithing_plan(["Steel Sword"])["materials"]
+    two = tools.skyrim_smithing_plan(["Steel Sword", "steel sword"])["materials"]
+    assert two == {k: 2 * v for k, v in one.items()}
+
+
+def test_steel_two_ore_rule():
+    raw = tools.skyrim_smithing_plan(["Steel Armor"])["raw_materials"]
+    steel = tools.skyrim_smithing_plan(["Steel Armor"])["materials"]["Steel Ingot"]
+    assert raw["Corundum Ore"] == steel
+    assert raw["Iron Ore"] >= steel
+
+
+def test_tempering_and_skill():
+    result = tools.skyrim_smithing_plan(GLASS_SET + ["Glass Bow"], quality="Epic")
+    assert result["tempering"] == {
+        "quality": "Epic", "quality_number": 5, "materials": {"Refined Malachite": 5},
+    }
+    assert result["skill"] == {
+        "perks": ["Glass Smithing"], "craft": 70,
+        "temper_with_perk": 74, "temper_without_perk": 134,
+    }
+
+
+def test_perk_selects_whole_set():
+    result = tools.skyrim_smithing_plan(perk="Dwarven")
+    names = {p["piece"] for p in result["pieces"]}
+    assert {"Dwarven Armor", "Dwarven Helmet"} <= names
+    assert all(p["material_perk"] == "Dwarven Smithing" for p in result["pieces"])
+    assert "Dwarven Metal Ingot" in result["raw_materials"]
+    assert result["smelting_notes"]
+
+
+def test_ammo_not_tempered():
+    result = tools.skyrim_smithing_plan(["Dragonbone Arrow"])
+    assert result["pieces"][0]["kind"] == "ammo"
+    assert result["tempering"]["materials"] == {}
+
+
+def test_unknown_pieces_reported():
+    result = tools.skyrim_smithing_plan(["Glass Helmet", "Mithril Helmet"])
+    assert result["unknown"] == ["Mithril Helmet"]
+    assert "error" in tools.skyrim_smithing_plan(["Mithril Helmet"])
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"pieces": GLASS_SET, "quality": "Godly"}, {"perk": "Mithril"}])
+def test_errors(kwargs):
+    assert "error" in tools.skyrim_smithing_plan(**kwargs)
@@ -0,0 +1,129 @@
+"""Tests for the soul gem allocation tools in the standalone tools module."""
+import functools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+tools = load_module("TES/executables/src/tools.py", "gt_tools_soul_gem_allocation")
+tools.DB_PATH = REPO_ROOT / "TES/database/gametools.sqlite3"
+
+SKYRIM_SOULS = {"Skeever": 250, "Bear": 500, "Cave Bear": 1000, "Bull Netch": 2000, "Mammoth": 3000, "NPC": 3000}
+SKYRIM_GEMS = ["Petty Soul Gem", "Lesser Soul Gem", "Common Soul Gem", "Greater Soul Gem",
+               "Grand Soul Gem", "Black Soul Gem", "Azura's Star"]
+
+
+def _brute_force(souls, gems):
+    """Best (charge, -waste) over every assignment of soul units to gem units."""
+    types, _ = tools._soul_gem_types("skyrim")
+    info = {g["gem"]: g for g in types}
+    units = [(SKYRIM_SOULS[s], s == "NPC") for s, n in souls.items() for _ in range(n)]
+    gem_units = tuple(g for g, n in gems.items() for _ in range(n))
+
+    @functools.lru_cache(maxsize=None)
+    def best(i, left):
+        if i == len(units):
+            return (0, 0)
+        size, black = units[i]
+        out = best(i + 1, left)
+        for g in set(left):
+            gi = info[g]
+            if gi["capacity"] >= size and (gi["black"] or not black):
+                rest = list(left)
+                rest.remove(g)
+                charge, waste = best(i + 1, tuple(rest))
+                out = max(out, (charge + size, waste - (gi["capacity"] - size)))
+        return out
+
+    return best(0, gem_units)
+
+
+def test_skyrim_matches_brute_force():
+    rng = np.random.default_rng(11)
+    names = list(SKYRIM_SOULS)
+    for _ in range(20):
+        souls = {n: int(c) for n, c in zip(names, rng.integers(0, 3, size=len(names))) if c}
+        gems = {g: int(c) for g, c in zip(SKYRIM_GEMS, rng.integers(0, 3, size=len(SKYRIM_GEMS))) if c}
+        result = tools.skyrim_soul_gem_allocation(souls, gems)
+        charge, neg_waste = _brute_force(souls, gems)
+        assert result["total_charge"] == charge
+        assert result["total_waste"] == -neg_waste
+
+
+def test_skyrim_black_souls_need_black_gems():
+    result = tools.skyrim_soul_gem_allocation({"NPC": 2, "Mammoth": 1}, {"Grand Soul Gem": 1, "Black Soul Gem": 1})
+    by_soul = {a["soul"]: a["gem"] for a in result["assignments"]}
+    assert by_soul == {"NPC": "Black Soul Gem", "Mammoth": "Grand Soul Gem"}
+    assert result["unassigned"] == [{"soul": "NPC", "soul_size": 3000, "count": 1, "reason": "all fitting gems used"}]
+    only_white = tools.skyrim_soul_gem_allocation({"NPC": 1}, {"Azura's Star": 1})
+    assert only_white["unassigned"][0]["reason"].startswith("black soul")
+    assert only_white["unused_gems"] == {"Azura's Star": 1}
+
+
+def test_skyrim_prefers_consumable_over_reusable():
+    result = tools.skyrim_soul_gem_allocation({"Mammoth": 1}, {"Azura's Star": 1, "Grand Soul Gem": 1})
+    assert result["assignments"][0]["gem"] == "Grand Soul Gem"
+    assert result["unused_gems"] == {"Azura's Star": 1}
+
+
+def test_morrowind_large_souls_and_ce():
+    result = tools.morrowind_soul_gem_allocation(
+        {"Golden Saint": 2, "Almalexia": 1, "Grizzly Bear (100)": 1},
+        {"Grand Soul Gem": 2, "Azura's Star": 1, "Common Soul Gem": 1},
+    )
+    gem_of = {a["soul"]: a["gem"] for a in result["assignments"]}
+    assert gem_of["Almalexia"] == "Azura's Star"
+    assert gem_of["Golden Saint"] == "Grand Soul Gem"
+    assert gem_of["Grizzly Bear (100)"] == "Common Soul Gem"
+    assert result["ce_eligible"] == 3
+    assert "unassigned" not in result
+    too_big = tools.morrowind_soul_gem_allocation({"Vivec": 1}, {"Grand Soul Gem": 1})
+    assert too_big["unassigned"][0]["reason"] == "no gem large enough"
+
+
+def test_oblivion_static_gems_and_raw_sizes():
+    result = tools.oblivion_soul_gem_allocation({"Dremora": 1, "800": 2}, {"Black Soul Gem": 1, "Common Soul Gem": 1, "Grand Soul Gem": 1})
+    gems = sorted((a["soul"], a["gem"], a["count"]) for a in result["assignments"])
+    assert gems == [("Dremora", "Black Soul Gem", 1), ("soul 800", "Common Soul Gem", 1), ("soul 800", "Grand Soul Gem", 1)]
+    assert result["total_charge"] == 1600 + 800 * 2
+    assert result["total_waste"] == 800
+
+
+def test_many_souls_one_call():
+    souls = {r["name"]: 3 for r in tools.oblivion_enchant_souls()}
+    gems = {"Petty Soul Gem": 40, "Grand Soul Gem": 40, "Black Soul Gem": 10}
+    result = tools.oblivion_soul_gem_allocation(souls, gems)
+    placed = sum(a["count"] for a in result["assignments"])
+    assert placed + sum(u["count"] for u in result["unassigned"]) == 3 * len(souls)
+    # Every big gem is filled; only surplus Petty gems are left over.
+    assert set(result["unused_gems"]) == {"Petty Soul Gem"}
+    assert placed == 90 - result["unused_gems"]["Petty Soul Gem"]
+
+
+@pytest.mark.parametrize("call", [
+    lambda: tools.morrowind_soul_gem_allocation({"Grizzly Bear": 1}, {"Grand Soul Gem": 1}),
+    lambda: tools.skyrim_soul_gem_allocation({"Unicorn": 1}, {"Grand Soul Gem": 1}),
+    lambda: tools.skyrim_soul_gem_allocation({"Bear": 1}, {"Soul Gem Fragment": 1}),
+    lambda: tools.skyrim_soul_gem_allocation({"Bear": -2}, {"Grand Soul Gem": 1}),
+    lambda: tools.oblivion_soul_gem_allocation({"Imp": 1}, {"Grand Soul Gem": -1}),
+])
+def test_errors(call):
+    assert "error" in call()
+
+
+def test_negative_count_named_and_zero_skipped():
+    assert "Bear: -2" in tools.skyrim_soul_gem_allocation({"Bear": -2}, {"Grand Soul Gem": 3})["error"]
+    result = tools.skyrim_soul_gem_allocation(
+        {"Bear": 0, "Mammoth": 1}, {"Petty Soul Gem": 0, "Grand Soul Gem": 1})
+    assert [a["soul"] for a in result["assignments"]] == ["Mammoth"]
+    assert "unassigned" not in result and result["unused_gems"] == {}
+
+
+def test_recharge_only_gem_rejected():
+    result = tools.skyrim_soul_gem_allocation({"3000": 1}, {"Wylandriah's Soul Gem": 1})
+    assert "Wylandriah's Soul Gem" in result["error"] and "cannot trap souls" in result["error"]
+    assert "Wylandriah" not in tools.skyrim_soul_gem_allocation({"Bear": 1}, {"Moon": 1})["error"]
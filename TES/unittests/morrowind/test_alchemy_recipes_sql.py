@@ -0,0 +1,169 @@
+"""Tests for the materialized Morrowind alchemy recipe index."""
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+_recipes = load_module(
+    "TES/Morrowind/alchemy/recipes_sql/create_or_update_morrowind_alchemy_recipes.py",
+    "mw_alchemy_recipes_sql",
+)
+
+SCRIPT = str(REPO_ROOT / "TES/Morrowind/alchemy/recipes_sql/create_or_update_morrowind_alchemy_recipes.py")
+
+EFFECTS = [
+    ("Ash Yam", "Fortify Intelligence"), ("Ash Yam", "Fortify Strength"),
+    ("Bittergreen", "Restore Intelligence"), ("Bittergreen", "Fortify Strength"),
+    ("Comberry", "Restore Intelligence"), ("Comberry", "Fortify Intelligence"),
+    ("Daedra Skin", "Cure Poison"),
+]
+
+
+def run(args):
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
+
+
+def _make_db(path, rows=EFFECTS):
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {_recipes.EFFECTS_TABLE} (name TEXT, effect TEXT)")
+    conn.executemany(f"INSERT INTO {_recipes.EFFECTS_TABLE} VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def _recipe_set(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        f"SELECT ingredient_1, ingredient_2, ingredient_3 FROM {_recipes.RECIPES_TABLE}"
+    ).fetchall()
+    conn.close()
+    return {tuple(i for i in r if i) for r in rows}
+
+
+# ─── compute_recipes ─────────────────────────────────────────────────────────
+
+def test_compute_recipes_pairs_and_useful_triples():
+    masks = {"A": 0b011, "B": 0b001, "C": 0b010, "D": 0b100}
+    got = {ings: mask for ings, mask in _recipes.compute_recipes(masks)}
+    assert got[("A", "B", None)] == 0b001
+    assert got[("A", "C", None)] == 0b010
+    # A+B+C: each ingredient carries one of the two effects, so all three count.
+    assert ("A", "B", "C") in got
+    assert not any("D" in ings for ings in got)
+
+
+def test_compute_recipes_rejects_passenger_triple():
+    # C shares nothing with A or B, so A+B+C is just the A+B pair.
+    masks = {"A": 0b01, "B": 0b01, "C": 0b10}
+    got = {ings for ings, _ in _recipes.compute_recipes(masks)}
+    assert got == {("A", "B", None)}
+
+
+def test_compute_recipes_only_restricts_output():
+    masks = {"A": 0b1, "B": 0b1, "C": 0b1}
+    got = {ings for ings, _ in _recipes.compute_recipes(masks, only={"C"})}
+    assert got == {("A", "C", None), ("B", "C", None)}
+
+
+# ─── full build / incremental ────────────────────────────────────────────────
+
+def test_full_build_creates_tables(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    _make_db(db)
+    result = run([db, "--json-dir", str(tmp_path)])
+    assert result.returncode == 0, result.stderr
+    recipes = _recipe_set(db)
+    assert ("Ash Yam", "Bittergreen") in recipes
+    assert ("Ash Yam", "Bittergreen", "Comberry") in recipes
+    assert not any("Daedra Skin" in r for r in recipes)
+
+    conn = sqlite3.connect(db)
+    mask, count = conn.execute(
+        f"SELECT effect_mask, effect_count FROM {_recipes.RECIPES_TABLE} "
+        f"WHERE ingredient_3 = 'Comberry'"
+    ).fetchone()
+    children = conn.execute(
+        f"SELECT COUNT(*) FROM {_recipes.RECIPE_EFFECTS_TABLE} e "
+        f"JOIN {_recipes.RECIPES_TABLE} r USING (recipe_id) WHERE r.ingredient_3 = 'Comberry'"
+    ).fetchone()[0]
+    conn.close()
+    assert count == 3 == children
+    assert bin(int(mask, 16)).count("1") == 3
+
+
+def test_no_touched_file_is_noop(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    _make_db(db)
+    run([db, "--json-dir", str(tmp_path)])
+    result = run([db, "--json-dir", str(tmp_path)])
+    assert result.returncode == 0
+    assert "No database changes" in result.stdout
+
+
+def test_incremental_update_from_snapshot(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    _make_db(db)
+    run([db, "--json-dir", str(tmp_path)])
+
+    # Daedra Skin gains Fortify Strength; the diff file names it.
+    (tmp_path / "morrowind_all_effects.upsert.json").write_text(
+        json.dumps([{"name": "Daedra Skin", "effect": "Fortify Strength"}]))
+    touched = str(tmp_path / "touched.json")
+    snap = run([db, "--json-dir", str(tmp_path), "--touched-file", touched, "--snapshot"])
+    assert snap.returncode == 0
+    assert json.loads(Path(touched).read_text()) == ["Daedra Skin"]
+
+    conn = sqlite3.connect(db)
+    conn.execute(f"INSERT INTO {_recipes.EFFECTS_TABLE} VALUES ('Daedra Skin', 'Fortify Strength')")
+    conn.commit()
+    conn.close()
+
+    result = run([db, "--json-dir", str(tmp_path), "--touched-file", touched])
+    assert result.returncode == 0, result.stderr
+    assert not Path(touched).exists()
+    recipes = _recipe_set(db)
+    assert ("Ash Yam", "Daedra Skin") in recipes
+    assert ("Ash Yam", "Bittergreen") in recipes
+
+    # Incremental result matches a clean rebuild.
+    fresh = str(tmp_path / "fresh.sqlite3")
+    _make_db(fresh, EFFECTS + [("Daedra Skin", "Fortify Strength")])
+    run([fresh, "--json-dir", str(tmp_path / "none")])
+    assert recipes == _recipe_set(fresh)
+
+
+def test_effect_bits_are_stable(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    _make_db(db)
+    conn = sqlite3.connect(db)
+    _recipes.rebuild(conn)
+    before = dict(conn.execute(f"SELECT effect, bit FROM {_recipes.BITS_TABLE}").fetchall())
+    conn.execute(f"INSERT INTO {_recipes.EFFECTS_TABLE} VALUES ('Ash Yam', 'Absorb Fatigue')")
+    _recipes.rebuild(conn)
+    after = dict(conn.execute(f"SELECT effect, bit FROM {_recipes.BITS_TABLE}").fetchall())
+    conn.close()
+    assert all(after[e] == b for e, b in before.items())
+    assert after["Absorb Fatigue"] == max(before.values()) + 1
+
+
+# ─── negative ────────────────────────────────────────────────────────────────
+
+def test_missing_effects_table_exits_nonzero(tmp_path):
+    db = str(tmp_path / "empty.sqlite3")
+    sqlite3.connect(db).close()
+    result = run([db, "--json-dir", str(tmp_path)])
+    assert result.returncode == 1
+    assert "Database error" in result.stderr
+
+
+def test_snapshot_without_diff_files_writes_nothing(tmp_path):
+    touched = tmp_path / "touched.json"
+    result = run(["--json-dir", str(tmp_path), "--touched-file", str(touched), "--snapshot"])
+    assert result.returncode == 0
+    assert not touched.exists()
@@ -0,0 +1,49 @@
+"""Tests for the materialized Oblivion alchemy recipe index.
+
+The design is shared with the Morrowind script; see
+morrowind/test_alchemy_recipes_sql.py for the full incremental coverage.
+"""
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from conftest import load_module, REPO_ROOT
+
+_recipes = load_module(
+    "TES/Oblivion/alchemy/recipes_sql/create_or_update_oblivion_alchemy_recipes.py",
+    "ob_alchemy_recipes_sql",
+)
+
+SCRIPT = str(REPO_ROOT / "TES/Oblivion/alchemy/recipes_sql/create_or_update_oblivion_alchemy_recipes.py")
+
+
+def run(args):
+    return subprocess.run([sys.executable, SCRIPT] + args, capture_output=True, text=True)
+
+
+def test_full_build(tmp_path):
+    db = str(tmp_path / "t.sqlite3")
+    conn = sqlite3.connect(db)
+    conn.execute(f"CREATE TABLE {_recipes.EFFECTS_TABLE} (name TEXT, effect TEXT)")
+    conn.executemany(f"INSERT INTO {_recipes.EFFECTS_TABLE} VALUES (?, ?)", [
+        ("A", "Restore Health"), ("B", "Restore Health"), ("C", "Fortify Health"),
+    ])
+    conn.commit()
+    conn.close()
+    result = run([db, "--json-dir", str(tmp_path)])
+    assert result.returncode == 0, result.stderr
+    conn = sqlite3.connect(db)
+    rows = conn.execute(
+        f"SELECT ingredient_1, ingredient_2, ingredient_3, effect_count FROM {_recipes.RECIPES_TABLE}"
+    ).fetchall()
+    conn.close()
+    assert rows == [("A", "B", None, 1)]
+
+
+def test_missing_effects_table_exits_nonzero(tmp_path):
+    db = str(tmp_path / "empty.sqlite3")
+    sqlite3.connect(db).close()
+    result = run([db, "--json-dir", str(tmp_path)])
+    assert result.returncode == 1
@@ -3,7 +3,8 @@
 TES data pipeline driver.
 
 Runs the full update pipeline for all implemented TES game/system combinations:
-  - Morrowind alchemy, Oblivion alchemy, Skyrim alchemy (scrape → JSON → SQL)
+  - Morrowind alchemy, Oblivion alchemy, Skyrim alchemy (scrape → JSON → SQL,
+                    then the materialized 2-/3-ingredient recipe index)
   - Morrowind alchemy apparatus (scrape → JSON → SQL)
   - Oblivion alchemy apparatus (scrape → JSON → SQL)
   - Morrowind enchanting (CSV → JSON → SQL; no web scrape, CSVs are manually maintained)
@@ -14,6 +15,10 @@ Runs the full update pipeline for all implemented TES game/system combinations:
   - Skyrim homestead (scrape → JSON → SQL for build, exclusive exterior, steward cost)
   - Skyrim Creation Club (JSON → SQL for armor, weapons, ammo, homestead, tempering;
                           raw JSON is static/checked-in, no re-scrape on each run)
+  - Cross-game effect graph (rebuilt from the per-game effect tables above)
+  - Per-game effect profiles (one denormalized row per effect, rebuilt the same way)
+  - Precomputed answer tables (Skyrim enchant charge grid, Oblivion potion strength,
+                               Skyrim smithing set totals)
 
 Halts immediately on any subprocess failure.
 """
@@ -66,6 +71,8 @@ def update_alchemy(game: str) -> None:
     parse_dir = game_dir / 'alchemy' / 'ingredients_parse'
     json_dir  = game_dir / 'alchemy' / 'ingredients_json'
     sql_dir   = game_dir / 'alchemy' / 'ingredients_sql'
+    recipes_script = (game_dir / 'alchemy' / 'recipes_sql' /
+                      f'create_or_update_{g}_alchemy_recipes.py')
 
     run_step(
         f'{game} alchemy scrape',
@@ -92,16 +99,21 @@ def update_alchemy(game: str) -> None:
 
     if not has_diff_files(json_dir):
         log.info('[%s alchemy] no changes — database update skipped', game)
-        return
+    else:
+        # The SQL loaders remove the diff files, so record which ingredients
+        # they touch first; the recipes step recomputes only those.
+        run_step(f'{game} alchemy recipes snapshot', [recipes_script, '--snapshot'])
+        run_step(
+            f'{game} alchemy ingredients SQL',
+            [sql_dir / f'create_or_update_{g}_alchemy_ingredients.py'],
+        )
+        run_step(
+            f'{game} alchemy effects SQL',
+            [sql_dir / f'create_or_update_{g}_alchemy_effects.py'],
+        )
 
-    run_step(
-        f'{game} alchemy ingredients SQL',
-        [sql_dir / f'create_or_update_{g}_alchemy_ingredients.py'],
-    )
-    run_step(
-        f'{game} alchemy effects SQL',
-        [sql_dir / f'create_or_update_{g}_alchemy_effects.py'],
-    )
+    # Full build on first run (tables missing); otherwise incremental or no-op.
+    run_step(f'{game} alchemy recipes SQL', [recipes_script])
 
 
 def update_apparatus(game: str) -> None:
@@ -473,6 +485,30 @@ def update_skyrim_alchemy_perks() -> None:
     )
 
 
+def update_effect_graph() -> None:
+    """Rebuild the cross-game effect equivalence graph; runs after every game step."""
+    run_step(
+        'TES effect graph SQL',
+        [_SCRIPT_DIR / 'cross_game' / 'effects_sql' / 'create_or_update_tes_effect_graph.py'],
+    )
+
+
+def update_effect_profiles() -> None:
+    """Rebuild the denormalized <game>_effect_profile tables; runs after every game step."""
+    run_step(
+        'TES effect profiles SQL',
+        [_SCRIPT_DIR / 'cross_game' / 'effects_sql' / 'create_or_update_tes_effect_profiles.py'],
+    )
+
+
+def update_answer_tables() -> None:
+    """Rebuild the precomputed answer tables; runs after every game step."""
+    run_step(
+        'TES answer tables SQL',
+        [_SCRIPT_DIR / 'cross_game' / 'answers_sql' / 'create_or_update_tes_answer_tables.py'],
+    )
+
+
 if __name__ == '__main__':
     log.info('=== TES data pipeline starting ===')
 
@@ -515,4 +551,13 @@ if __name__ == '__main__':
     log.info('--- Skyrim Creation Club ---')
     update_skyrim_cc()
 
+    log.info('--- Cross-game effect graph ---')
+    update_effect_graph()
+
+    log.info('--- Effect profiles ---')
+    update_effect_profiles()
+
+    log.info('--- Answer tables ---')
+    update_answer_tables()
+
     log.info('=== TES data pipeline complete ===')